@@ -0,0 +1,76 @@
+""" Benchmark of the dense and sparse outputs of MyDummyFeatures
+
+Dummifies a preprocessed synthetic House Prices table with pd.get_dummies (former implementation)
+and with MyDummyFeatures in 'dense', 'sparse' and 'csr' output, checks that all outputs have the
+same values (on the first --check-rows rows) and reports time and memory. --levels adds a synthetic high-cardinality column
+(e.g. a street name) to make the output wide.
+
+Usage (from the assignment folder):
+    python benchmarks/bench_dummy_features.py --rows 200000 --levels 2000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_transformers import MyDummyFeatures
+from pipelines import make_preprocessing, make_arithmetic_features
+from synthetic import make_houses
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def memory(result):
+    if isinstance(result, pd.DataFrame):
+        return result.memory_usage(index=False, deep=True).sum() / 2**20
+    return (result.data.nbytes + result.indices.nbytes + result.indptr.nbytes) / 2**20
+
+
+def to_dense(result, n_rows):
+    if isinstance(result, pd.DataFrame):
+        head = result.iloc[:n_rows]
+        return np.column_stack([head[col].to_numpy(dtype=np.float64) for col in head.columns])
+    return result[:n_rows].toarray()
+
+
+def get_dummies(X):
+    return pd.get_dummies(X, drop_first=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--levels', type=int, default=2000)
+    parser.add_argument('--check-rows', type=int, default=10000)
+    args = parser.parse_args()
+
+    data = make_arithmetic_features(copy=False).fit_transform(make_preprocessing().fit_transform(make_houses(args.rows)))
+    if args.levels:
+        rng = np.random.RandomState(289)
+        data['Street'] = pd.Series(['street %d' % i for i in range(args.levels)], dtype=object).iloc[
+            rng.randint(args.levels, size=args.rows)].to_numpy()
+
+    print('rows: %d, input columns: %d' % (args.rows, data.shape[1]))
+    expected, elapsed = timed(get_dummies, data)
+    print('%-22s %8.3f s %10.1f MB  %d columns' % ('pd.get_dummies', elapsed, memory(expected), expected.shape[1]))
+    expected = to_dense(expected, args.check_rows)
+
+    for output in ['dense', 'sparse', 'csr']:
+        dummies = MyDummyFeatures(output=output).fit(data)
+        result, elapsed = timed(dummies.transform, data)
+        print('%-22s %8.3f s %10.1f MB' % ('MyDummyFeatures ' + output, elapsed, memory(result)))
+        assert np.array_equal(to_dense(result, args.check_rows), expected, equal_nan=True)
+        result = None
+
+
+if __name__ == '__main__':
+    main()
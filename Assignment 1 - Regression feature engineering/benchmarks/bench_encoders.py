@@ -0,0 +1,67 @@
+""" Benchmark of MyQualityEncoder and MyOtherOrdinalEncoder
+
+Compares the lookup-table encoding with the former DataFrame.replace + fillna(0) implementation,
+checks that both give the same values and reports time and memory of the encoded columns.
+
+Usage (from the assignment folder):
+    python benchmarks/bench_encoders.py --rows 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_transformers import MyQualityEncoder, MyOtherOrdinalEncoder
+from pipelines import cols_enc_quality, cols_enc_ordinal
+from synthetic import make_houses
+
+
+def replace_transform(X):
+    """ Former replace + fillna implementation of both encoders, kept as the reference """
+    X.loc[:, cols_enc_quality] = X.loc[:, cols_enc_quality].replace(MyQualityEncoder._quality_measures)
+    X.loc[:, cols_enc_quality] = X.loc[:, cols_enc_quality].fillna(0)
+    for col in cols_enc_ordinal:
+        X.loc[:, col] = X.loc[:, col].replace(MyOtherOrdinalEncoder._order_encoder.get(col))
+    X.loc[:, cols_enc_ordinal] = X.loc[:, cols_enc_ordinal].fillna(0)
+    return X
+
+
+def lookup_transform(X):
+    X = MyQualityEncoder(cols_enc_quality, copy=False).fit_transform(X)
+    return MyOtherOrdinalEncoder(cols_enc_ordinal, copy=False).fit_transform(X)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def memory(X):
+    return X.loc[:, cols_enc_quality + cols_enc_ordinal].memory_usage(index=False, deep=True).sum() / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    args = parser.parse_args()
+
+    data = make_houses(args.rows)
+
+    expected, replace_time = timed(replace_transform, data.copy())
+    result, lookup_time = timed(lookup_transform, data.copy())
+    columns = cols_enc_quality + cols_enc_ordinal
+    pd.testing.assert_frame_equal(result.loc[:, columns].astype(float), expected.loc[:, columns].astype(float))
+
+    print('rows: %d' % args.rows)
+    print('replace + fillna: %8.3f s %8.1f MB' % (replace_time, memory(expected)))
+    print('lookup tables:    %8.3f s %8.1f MB' % (lookup_time, memory(result)))
+    print('speedup:          %8.1fx' % (replace_time / lookup_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+""" Benchmark of the arithmetic feature transformers of feature_creation
+
+Times MyValueAddedFeatures, MyQualityFeatures, MyTimeBasedFeatures, MyRoomsFeatures and
+MySpaceBasedFeatures on a preprocessed synthetic House Prices table. The current version runs
+with copy=False by default, which matches the in-place behaviour of versions without the copy parameter.
+
+With --reference, the same benchmark runs on another copy of the assignment folder (e.g. an older
+commit checked out with "git worktree add"), outputs of both versions are compared and the speedup
+is reported. Each version runs in its own process.
+
+Usage (from the assignment folder):
+    python benchmarks/bench_feature_creation.py --rows 1000000 --reference /tmp/old/assignment_folder
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+ASSIGNMENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(package_dir, rows, output_path, copy):
+    sys.path.insert(0, package_dir)
+    from pipelines import make_preprocessing, make_arithmetic_features
+    from synthetic import make_houses
+
+    data = make_preprocessing().fit_transform(make_houses(rows))
+
+    features = make_arithmetic_features(copy)
+    start = time.perf_counter()
+    result = features.fit_transform(data)
+    elapsed = time.perf_counter() - start
+
+    result.to_pickle(output_path)
+    return {'seconds': elapsed}
+
+
+def measure(package_dir, rows, output_path, copy=None):
+    command = [sys.executable, os.path.abspath(__file__), '--rows', str(rows),
+               '--package', package_dir, '--output', output_path]
+    if copy is not None:
+        command += ['--copy', copy]
+    output = subprocess.check_output(command)
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--copy', choices=['true', 'false'], default='false', help='copy parameter of the current version')
+    parser.add_argument('--reference', help='assignment folder of the version to compare with')
+    parser.add_argument('--package', help=argparse.SUPPRESS)
+    parser.add_argument('--output', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.package:
+        copy = None if args.package != ASSIGNMENT_DIR else args.copy == 'true'
+        print(json.dumps(run(args.package, args.rows, args.output, copy)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        current = measure(ASSIGNMENT_DIR, args.rows, os.path.join(tmp, 'current.pkl'), args.copy)
+        print('rows: %d' % args.rows)
+        print('current (copy=%s): %8.3f s' % (args.copy, current['seconds']))
+
+        if args.reference:
+            reference = measure(os.path.abspath(args.reference), args.rows, os.path.join(tmp, 'reference.pkl'))
+            pd.testing.assert_frame_equal(pd.read_pickle(os.path.join(tmp, 'current.pkl')),
+                                          pd.read_pickle(os.path.join(tmp, 'reference.pkl')), check_dtype=False)
+            print('reference:          %8.3f s' % reference['seconds'])
+            print('speedup:            %8.1fx (same values)' % (reference['seconds'] / current['seconds']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+""" Peak memory of the preprocessing + feature_creation pipelines with copy=True and copy=False
+
+Each mode runs in a separate process, so that the peak resident set size (RSS) of one run does
+not hide the other. The RSS after loading the data is reported as the baseline.
+
+Usage (from the assignment folder):
+    python benchmarks/bench_memory.py --rows 200000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipelines import make_preprocessing, make_feature_creation
+from synthetic import make_houses
+
+
+def peak_rss_mb():
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(rows, copy):
+    data = make_houses(rows)
+    data_rss = peak_rss_mb()
+
+    start = time.perf_counter()
+    preprocessing = make_preprocessing(copy)
+    feature_creation = make_feature_creation(copy)
+    result = feature_creation.fit_transform(preprocessing.fit_transform(data))
+    elapsed = time.perf_counter() - start
+
+    return {'copy': copy, 'rows': rows, 'columns': result.shape[1], 'seconds': elapsed,
+            'data_rss_mb': data_rss, 'peak_rss_mb': peak_rss_mb()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--copy', choices=['true', 'false'], help='run a single mode in this process')
+    args = parser.parse_args()
+
+    if args.copy:
+        print(json.dumps(run(args.rows, args.copy == 'true')))
+        return
+
+    print('rows: %d' % args.rows)
+    for copy in ['true', 'false']:
+        output = subprocess.check_output([sys.executable, os.path.abspath(__file__),
+                                          '--rows', str(args.rows), '--copy', copy])
+        stats = json.loads(output.decode().strip().splitlines()[-1])
+        print('copy=%-5s  time: %7.2f s  RSS after load: %7.1f MB  peak RSS: %7.1f MB  peak - load: %7.1f MB'
+              % (copy, stats['seconds'], stats['data_rss_mb'], stats['peak_rss_mb'],
+                 stats['peak_rss_mb'] - stats['data_rss_mb']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+""" Scaling benchmark of parallel_transform on the House Prices preprocessing + feature_creation pipelines
+
+Fits the pipelines of the notebook on data/train.csv, then transforms --rows synthetic rows serially
+and with custom_transformers.parallel.parallel_transform on 1, 2, 4 and 8 workers. Every parallel
+output is checked against the serial one. The speedups are only meaningful with at least as many
+cores as workers: with fewer cores the timings show the overhead of the worker processes.
+
+Usage (from the assignment folder):
+    python benchmarks/bench_parallel.py --rows 1000000 --jobs 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+from joblib import cpu_count
+from sklearn.pipeline import Pipeline
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_transformers.parallel import parallel_transform
+from pipelines import make_preprocessing, make_feature_creation
+from synthetic import DATA_PATH, make_houses
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--jobs', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    pipeline = Pipeline([
+        ('cleaning', make_preprocessing()),
+        ('features', make_feature_creation())
+    ]).fit(pd.read_csv(DATA_PATH).drop(columns='SalePrice'))
+    data = make_houses(args.rows)
+
+    expected, serial_time = timed(pipeline.transform, data)
+    print('rows: %d, cores available: %d' % (args.rows, cpu_count()))
+    if cpu_count() < max(args.jobs):
+        print('fewer cores than workers: the speedups with more than %d workers are not measured' % cpu_count())
+    print('serial:     %8.2f s' % serial_time)
+
+    for n_jobs in args.jobs:
+        result, elapsed = timed(parallel_transform, pipeline, data, n_jobs=n_jobs)
+        pd.testing.assert_frame_equal(result, expected)
+        print('n_jobs=%-3d  %8.2f s  speedup: %5.2fx' % (n_jobs, elapsed, serial_time / elapsed))
+
+
+if __name__ == '__main__':
+    main()
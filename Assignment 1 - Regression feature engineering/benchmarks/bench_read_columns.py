@@ -0,0 +1,90 @@
+""" Reading only the columns a pipeline needs (custom_transformers.columns.read_csv) against reading the whole file
+
+Writes --rows rows of data/train.csv (sampled with make_houses, with SalePrice) to a CSV file, then reads it for
+the two pipelines of the notebook, preprocessing followed by feature_creation (all the features) or by the
+feature selection (MyFeatureSelector): with pd.read_csv (inferred dtypes), with pd.read_csv and DTYPES, and
+with read_csv (usecols planned from the column declarations of the transformers, DTYPES of these columns).
+Reports the columns read, the read time and the memory of the frame, and checks that the pipelines give the
+same output from the planned read as from the whole file, with copy=True and copy=False, and that
+data/train.csv and data/test.csv are planned without error.
+
+Usage (from the assignment folder):
+    python benchmarks/bench_read_columns.py --rows 200000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_transformers import DTYPES, read_csv, required_columns
+from pipelines import make_preprocessing, make_feature_creation, make_feature_selection
+from synthetic import DATA_PATH, make_houses
+
+
+def make_pipeline(features, copy=None):
+    pipeline = Pipeline([('cleaning', make_preprocessing(copy)), ('features', features(copy))])
+    # the dropped columns are not read
+    return pipeline.set_params(cleaning__drop_cols__errors='ignore')
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200000)
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+
+    pipelines = [('all features', make_feature_creation), ('feature selection', make_feature_selection)]
+    for path in [DATA_PATH, os.path.join(os.path.dirname(DATA_PATH), 'test.csv')]:
+        for _, features in pipelines:
+            read_csv(path, make_pipeline(features), dtype=DTYPES, keep=['SalePrice'])
+
+    data = make_houses(args.rows)
+    data['SalePrice'] = pd.read_csv(DATA_PATH, usecols=['SalePrice']).SalePrice.sample(
+        args.rows, replace=True, random_state=289).to_numpy()
+    header = list(data.columns)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'train.csv')
+        data.to_csv(path, index=False)
+        del data
+
+        print('%d rows, %d columns' % (args.rows, len(header)))
+        print('%-20s %-26s %8s %10s %12s' % ('pipeline', 'read', 'columns', 'seconds', 'memory (MB)'))
+        for label, features in pipelines:
+            reads = [('pd.read_csv', lambda: pd.read_csv(path)),
+                     ('pd.read_csv, DTYPES', lambda: pd.read_csv(path, dtype=DTYPES)),
+                     ('read_csv, DTYPES', lambda: read_csv(path, make_pipeline(features), dtype=DTYPES,
+                                                           keep=['SalePrice']))]
+            frames = {}
+            for read_label, read in reads:
+                frames[read_label], seconds = timed(read)
+                print('%-20s %-26s %8d %10.2f %12.1f' % (label, read_label, frames[read_label].shape[1], seconds,
+                                                         frames[read_label].memory_usage(deep=True).sum() / 2**20))
+
+            planned = frames['read_csv, DTYPES']
+            assert list(planned.columns) == required_columns(make_pipeline(features), header, keep=['SalePrice'])
+            whole = frames['pd.read_csv, DTYPES']
+            for copy in [True, False]:
+                X, y = whole.drop(columns='SalePrice'), np.log(whole.SalePrice)
+                expected = make_pipeline(features, copy).fit_transform(X, y)
+                X, y = planned.drop(columns='SalePrice'), np.log(planned.SalePrice)
+                pd.testing.assert_frame_equal(make_pipeline(features, copy).fit_transform(X, y), expected)
+    print('same outputs from the planned reads as from the whole file (copy=True and copy=False)')
+
+
+if __name__ == '__main__':
+    main()
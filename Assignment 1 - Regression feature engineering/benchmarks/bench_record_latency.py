@@ -0,0 +1,85 @@
+""" Latency benchmark of the record mode (RecordPipeline) against the DataFrame pipelines
+
+Fits the preprocessing and feature_creation pipelines of the notebook on data/train.csv and scores the
+houses of data/test.csv as an API would receive them (dicts): one record at a time and by micro-batches,
+through a DataFrame built from the records and the pipelines, and through the compiled record mode.
+Reports p50 / p99 latencies and checks that both give the same values.
+
+Usage (from the assignment folder):
+    python benchmarks/bench_record_latency.py --records 1000 --batch-size 32
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_transformers import RecordPipeline
+from pipelines import make_preprocessing, make_feature_creation
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+
+def latencies_ms(func, items):
+    times = []
+    for item in items:
+        start = time.perf_counter()
+        func(item)
+        times.append(time.perf_counter() - start)
+    return 1000 * np.array(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--records', type=int, default=1000, help='number of single records scored')
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--batches', type=int, default=200)
+    parser.add_argument('--pandas-records', type=int, default=200,
+                        help='number of single records / batches scored through the DataFrame pipelines')
+    args = parser.parse_args()
+
+    train = pd.read_csv(os.path.join(DATA_DIR, 'train.csv')).drop(columns='SalePrice')
+    test = pd.read_csv(os.path.join(DATA_DIR, 'test.csv'))
+
+    preprocessing = make_preprocessing()
+    feature_creation = make_feature_creation()
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        feature_creation.fit(preprocessing.fit_transform(train))
+        expected = feature_creation.transform(preprocessing.transform(test))
+
+    scorer = RecordPipeline(preprocessing, feature_creation)
+    records = test.to_dict('records')
+    assert list(scorer.columns) == list(expected.columns)
+    np.testing.assert_allclose(scorer.transform_records(records), expected.to_numpy(dtype=np.float64), rtol=1e-12)
+    print('%d test records: record mode output equal to the DataFrame pipelines (%d columns)'
+          % (len(records), len(scorer.columns)))
+
+    def pandas_score(batch):
+        return feature_creation.transform(preprocessing.transform(pd.DataFrame(batch)))
+
+    rng = np.random.RandomState(289)
+    singles = [records[i] for i in rng.randint(len(records), size=args.records)]
+    batches = [[records[i] for i in rng.randint(len(records), size=args.batch_size)] for _ in range(args.batches)]
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        results = [
+            ('DataFrame, 1 record', latencies_ms(lambda record: pandas_score([record]), singles[:args.pandas_records])),
+            ('record mode, 1 record', latencies_ms(scorer.transform_record, singles)),
+            ('DataFrame, %d records' % args.batch_size, latencies_ms(pandas_score, batches[:args.pandas_records])),
+            ('record mode, %d records' % args.batch_size, latencies_ms(scorer.transform_records, batches)),
+        ]
+
+    print('%-26s %9s %9s %9s' % ('latency (ms)', 'p50', 'p99', 'samples'))
+    for label, times in results:
+        print('%-26s %9.3f %9.3f %9d' % (label, np.percentile(times, 50), np.percentile(times, 99), len(times)))
+
+
+if __name__ == '__main__':
+    main()
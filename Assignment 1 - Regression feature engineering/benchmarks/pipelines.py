@@ -0,0 +1,71 @@
+from sklearn.pipeline import Pipeline
+
+from custom_transformers import MyDropColumns, MyQualityEncoder, MyOtherOrdinalEncoder, MyBinaryEncoder, MySimpleImputer
+from custom_transformers import MyValueAddedFeatures, MyTimeBasedFeatures, MyQualityFeatures, MyRoomsFeatures
+from custom_transformers import MySpaceBasedFeatures, MyLog1pTransformer, MyDummyFeatures, MyFeatureSelector
+
+# column lists and pipelines of regression_Kaggle_AdvancedHousing.ipynb
+cols_to_drop = ['MSSubClass', 'Id', 'Utilities', 'Street', 'MasVnrArea', 'Condition1', 'Condition2',
+                'Alley', 'BldgType', 'Fence', 'LandContour', 'LotConfig', 'RoofStyle', 'RoofMatl',
+                'Exterior1st', 'Exterior2nd', 'Foundation', 'Heating', 'GarageType']
+cols_enc_quality = ['BsmtCond', 'BsmtQual', 'ExterCond', 'ExterQual', 'FireplaceQu',
+                    'GarageCond', 'GarageQual', 'HeatingQC', 'KitchenQual', 'PoolQC']
+cols_enc_ordinal = ['BsmtExposure', 'BsmtFinType1', 'BsmtFinType2', 'GarageFinish',
+                    'LotShape', 'PavedDrive', 'Electrical', 'Functional', 'HouseStyle', 'LandSlope']
+features = ['OverallQual', 'GrLivArea', 'TotBath', 'GarageCars',
+            'ExterQual', 'BsmtQual', 'KitchenQual', 'FullBath',
+            'GarageFinish', 'OverallEval_sum', 'TotalBsmtSF', 'YrsSinceRemod',
+            'YrsSinceBuilt', 'FireplaceQu', 'Bedrooms_vs_LivArea', 'Rooms_vs_LivArea',
+            'MSZoning', 'Neighborhood', 'SaleType', 'SaleCondition']
+
+
+def _kwargs(copy):
+    # copy=None builds the transformers with their defaults, e.g. for older versions of the package
+    return {} if copy is None else {'copy': copy}
+
+
+def make_preprocessing(copy=None):
+    kwargs = _kwargs(copy)
+    return Pipeline([
+        ('drop_cols', MyDropColumns(cols_to_drop, **kwargs)),
+        ('quality_encoder', MyQualityEncoder(cols_enc_quality, **kwargs)),
+        ('order_encoder', MyOtherOrdinalEncoder(cols_enc_ordinal, **kwargs)),
+        ('binary_encoder', MyBinaryEncoder(**kwargs)),
+        ('imputer', MySimpleImputer(**kwargs))
+    ])
+
+
+def make_arithmetic_features(copy=None):
+    kwargs = _kwargs(copy)
+    return Pipeline([
+        ('value', MyValueAddedFeatures(**kwargs)),
+        ('quality', MyQualityFeatures(**kwargs)),
+        ('time', MyTimeBasedFeatures(**kwargs)),
+        ('rooms', MyRoomsFeatures(**kwargs)),
+        ('space', MySpaceBasedFeatures(**kwargs))
+    ])
+
+
+def make_feature_creation(copy=None):
+    kwargs = _kwargs(copy)
+    return Pipeline(make_arithmetic_features(copy).steps + [
+        ('new_log_transformer', MyLog1pTransformer(**kwargs)),
+        ('onehot', MyDummyFeatures(**kwargs))
+    ])
+
+
+def make_feature_selection(copy=None):
+    kwargs = _kwargs(copy)
+    return Pipeline([
+        ('value', MyValueAddedFeatures(pool=False, kitchen=False, garage=False,
+                                       fireplace=False, basement=False, basement_adv=False, **kwargs)),
+        ('quality', MyQualityFeatures(high_quality_sf=False, overall_mult=False,
+                                      external_mult=False, external_sum=False, garage_mult=False,
+                                      garage_sum=False, basement_mult=False, basement_sum=False, **kwargs)),
+        ('time', MyTimeBasedFeatures(season=False, since_garage_built=False, isRemodeled=False, **kwargs)),
+        ('rooms', MyRoomsFeatures(bath_vs_bedrooms=False, bedrooms_vs_rooms=False, **kwargs)),
+        ('space', MySpaceBasedFeatures(bsmt_finished_percent=False, bsmt_vs_living=False,
+                                       porch=False, lot_left_percent=False, bsmt_vs_lot=False, **kwargs)),
+        ('feature_selector', MyFeatureSelector(features, **kwargs)),
+        ('onehot', MyDummyFeatures(**kwargs))
+    ])
@@ -0,0 +1,51 @@
+""" Benchmark suite of custom_transformers (House Prices)
+
+Times fit and transform of each step of the preprocessing and feature_creation pipelines of the
+notebook, of both pipelines, of the feature selection and of the record mode, and traces their peak
+memory. The data are rows of data/train.csv sampled with replacement (make_houses), so they have the
+schema and null rates of the real data at any size. Results are saved in benchmarks/results (see
+benchmarks/harness.py) and can be compared with a former run to catch regressions.
+
+Usage (from the assignment folder):
+    python benchmarks/suite.py --sizes 10k,100k,1M,10M
+    python benchmarks/suite.py --sizes 100k --filter feature_creation --compare last
+"""
+import os
+import sys
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_transformers import MyFeatureSelector, RecordPipeline
+from harness import Case, main, pipeline_cases
+from pipelines import make_preprocessing, make_feature_creation
+from synthetic import make_houses
+
+# record mode: number of records scored one at a time
+N_RECORDS = 1000
+
+
+def suite(n_rows):
+    data = make_houses(n_rows)
+
+    for case in pipeline_cases('preprocessing', make_preprocessing(), data):
+        yield case
+
+    preprocessing = make_preprocessing().fit(data)
+    preprocessed = preprocessing.transform(data)
+    for case in pipeline_cases('feature_creation', make_feature_creation(), preprocessed):
+        yield case
+
+    feature_creation = make_feature_creation().fit(preprocessed)
+    features = feature_creation.transform(preprocessed)
+    selector = MyFeatureSelector(list(features.columns[::2]))
+    yield Case('feature_selector.transform', selector.transform, lambda: (features,))
+
+    scorer = RecordPipeline(preprocessing, feature_creation)
+    records = data.iloc[:N_RECORDS].to_dict('records')
+    yield Case('record_mode.%d_records' % N_RECORDS, lambda: [scorer.transform_record(record) for record in records])
+
+
+if __name__ == '__main__':
+    warnings.simplefilter('ignore')
+    sys.exit(main(suite, __doc__))
@@ -0,0 +1,22 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'train.csv')
+
+
+def make_houses(n_rows, seed=289):
+    """ Builds a House Prices frame of the requested size by sampling rows of data/train.csv
+
+    Args:
+        n_rows (int): number of rows to generate
+        seed (int): random seed
+
+    Returns:
+        pd.DataFrame: House Prices features (without SalePrice)
+    """
+    train = pd.read_csv(DATA_PATH).drop(columns='SalePrice')
+    rows = np.random.RandomState(seed).randint(len(train), size=n_rows)
+
+    return train.iloc[rows].reset_index(drop=True)
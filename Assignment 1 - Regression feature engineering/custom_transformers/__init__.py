@@ -11,4 +11,10 @@ from custom_transformers.my_quality_features import MyQualityFeatures
 from custom_transformers.my_rooms_features import MyRoomsFeatures
 from custom_transformers.my_space_based_features import MySpaceBasedFeatures
 from custom_transformers.my_dummy_features import MyDummyFeatures
-from custom_transformers.my_feature_selector import MyFeatureSelector
\ No newline at end of file
+from custom_transformers.my_feature_selector import MyFeatureSelector
+from custom_transformers.parallel import ParallelTransformer
+from custom_transformers.artifacts import save_pipeline, load_pipeline
+from custom_transformers.record import RecordPipeline
+from custom_transformers.profiling import InstrumentedPipeline
+from custom_transformers.columns import required_columns, plan_read, read_csv
+from custom_transformers.schema import DTYPES
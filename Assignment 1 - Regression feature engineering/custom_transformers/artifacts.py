@@ -0,0 +1,143 @@
+import importlib
+import json
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.pipeline import Pipeline
+
+FORMAT = 'custom_transformers.pipeline'
+VERSION = 1
+MANIFEST = 'manifest.json'
+
+
+def _json_default(value):
+    """ JSON encoding of the NumPy values found in parameters and states """
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.dtype) or (isinstance(value, type) and issubclass(value, np.generic)):
+        return {'__dtype__': np.dtype(value).str}
+    if isinstance(value, (np.ndarray, pd.Index)):
+        return list(value)
+    raise TypeError('%r is not JSON serializable' % type(value))
+
+
+def _json_object_hook(value):
+    if set(value) == {'__dtype__'}:
+        return np.dtype(value['__dtype__'])
+    return value
+
+
+def _class_path(obj):
+    return '%s.%s' % (type(obj).__module__, type(obj).__name__)
+
+
+def _import_class(path):
+    module, name = path.rsplit('.', 1)
+    return getattr(importlib.import_module(module), name)
+
+
+def _save_step(step, prefix, path):
+    """ Manifest entry of a step: parameters, JSON state and .npy files, or a pickle if the step has no state hooks """
+    entry = {'class': _class_path(step)}
+
+    state = step._get_state() if hasattr(step, '_get_state') else None
+    if state is not None:
+        try:
+            params = json.loads(json.dumps(step.get_params(deep=False), default=_json_default))
+        except TypeError:
+            # parameters that are not JSON serializable (e.g. a DataFrame): the step is pickled
+            state = None
+
+    if state is None:
+        entry['pickle'] = prefix + '.pkl'
+        with open(os.path.join(path, entry['pickle']), 'wb') as f:
+            pickle.dump(step, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return entry
+
+    entry['params'] = params
+    entry['state'] = {}
+    entry['arrays'] = {}
+    for name, value in state.items():
+        if isinstance(value, np.ndarray) and value.dtype != object:
+            entry['arrays'][name] = '%s.%s.npy' % (prefix, name)
+            np.save(os.path.join(path, entry['arrays'][name]), np.ascontiguousarray(value), allow_pickle=False)
+        else:
+            entry['state'][name] = value
+    return entry
+
+
+def _load_step(entry, path, mmap_mode):
+    if 'pickle' in entry:
+        with open(os.path.join(path, entry['pickle']), 'rb') as f:
+            return pickle.load(f)
+
+    step = _import_class(entry['class'])(**entry['params'])
+    state = dict(entry['state'])
+    for name, file_name in entry['arrays'].items():
+        state[name] = np.load(os.path.join(path, file_name), mmap_mode=mmap_mode, allow_pickle=False)
+    step._set_state(state)
+    return step
+
+
+def save_pipeline(pipeline, path):
+    """ Saves a fitted pipeline (or transformer) into the directory path
+
+    The directory holds manifest.json (format, version, library versions, steps with their parameters and
+    JSON state) and one .npy file per numeric array of the fitted state. Transformers without state hooks
+    (_get_state / _set_state) are pickled.
+
+    Args:
+        pipeline (sklearn.pipeline.Pipeline or transformer): fitted pipeline
+        path (str): directory, created if needed
+    """
+    os.makedirs(path, exist_ok=True)
+
+    is_pipeline = isinstance(pipeline, Pipeline)
+    steps = pipeline.steps if is_pipeline else [('transformer', pipeline)]
+
+    manifest = {
+        'format': FORMAT,
+        'version': VERSION,
+        'libraries': {'numpy': np.__version__, 'pandas': pd.__version__, 'sklearn': sklearn.__version__},
+        'pipeline': is_pipeline,
+        'steps': [],
+    }
+    for i, (name, step) in enumerate(steps):
+        entry = _save_step(step, '%02d_%s' % (i, name), path)
+        entry['name'] = name
+        manifest['steps'].append(entry)
+
+    with open(os.path.join(path, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=1, default=_json_default)
+
+
+def load_pipeline(path, mmap_mode='r'):
+    """ Loads a pipeline saved by save_pipeline
+
+    With mmap_mode='r' (default) the arrays are read-only memory maps: loading does not read them, and
+    processes forked from the same worker (or loading the same files) share their pages.
+
+    Args:
+        path (str): directory written by save_pipeline
+        mmap_mode (str): mode of np.load, None to read the arrays into memory, default 'r'
+
+    Returns:
+        sklearn.pipeline.Pipeline or transformer: fitted pipeline
+    """
+    with open(os.path.join(path, MANIFEST)) as f:
+        manifest = json.load(f, object_hook=_json_object_hook)
+
+    if manifest.get('format') != FORMAT:
+        raise ValueError('[Artifacts] %s is not a custom_transformers pipeline' % path)
+    if manifest['version'] > VERSION:
+        raise ValueError('[Artifacts] %s has version %d, this version of custom_transformers reads up to %d'
+                         % (path, manifest['version'], VERSION))
+
+    steps = [(entry['name'], _load_step(entry, path, mmap_mode)) for entry in manifest['steps']]
+
+    if manifest['pipeline']:
+        return Pipeline(steps)
+    return steps[0][1]
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+
+class CategoryLookup(object):
+    """ Encodes values of a column through a fixed {level: value} mapping
+
+    Values are converted to pd.Categorical codes over the known levels, which are then used as indices
+    into a NumPy value table. The last entry of the table holds the value for missing data, so code -1
+    (missing or unknown level) maps to it without a separate fillna.
+
+    Args:
+        mapping (dict): level -> encoded value
+        missing_value (numeric): value for missing data
+        handle_unknown (str): 'zero' to encode levels not in mapping as 0, 'nan' to encode them as NaN,
+            'error' to raise ValueError
+        dtype (np.dtype): dtype of the encoded values
+    """
+
+    def __init__(self, mapping, missing_value=0, handle_unknown='zero', dtype=np.float32):
+        if handle_unknown not in ('zero', 'nan', 'error'):
+            raise ValueError('handle_unknown should be either "zero", "nan" or "error", got %r' % handle_unknown)
+        if handle_unknown == 'nan' and not np.issubdtype(dtype, np.floating):
+            raise ValueError('handle_unknown="nan" requires a floating dtype, got %s' % np.dtype(dtype))
+
+        self.levels = pd.Index(list(mapping.keys()))
+        self.positions = {level: i for i, level in enumerate(mapping)}
+        self.table = np.array(list(mapping.values()) + [missing_value], dtype=dtype)
+        self.missing_value = missing_value
+        self.handle_unknown = handle_unknown
+
+    def encode(self, values):
+        """ Encodes a pd.Series, returns np.ndarray """
+        codes = pd.Categorical(values, categories=self.levels).codes
+        encoded = self.table[codes]
+
+        if self.handle_unknown == 'zero' and self.missing_value == 0:
+            return encoded
+
+        unknown = (codes == -1) & values.notnull().to_numpy()
+        if not unknown.any():
+            return encoded
+
+        if self.handle_unknown == 'error':
+            raise ValueError('[%s] unknown levels: %s' % (values.name, list(pd.unique(values[unknown]))))
+        encoded[unknown] = 0 if self.handle_unknown == 'zero' else np.nan
+        return encoded
+
+    def encode_value(self, value, name=None):
+        """ Encodes a single value (record mode), same result as encode """
+        position = self.positions.get(value)
+        if position is not None:
+            return self.table[position]
+        if value is None or value != value:
+            return self.table[-1]
+
+        if self.handle_unknown == 'error':
+            raise ValueError('[%s] unknown levels: %s' % (name, [value]))
+        return self.table.dtype.type(0 if self.handle_unknown == 'zero' else np.nan)
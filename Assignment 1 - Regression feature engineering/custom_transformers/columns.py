@@ -0,0 +1,115 @@
+import pandas as pd
+from sklearn.pipeline import Pipeline
+
+
+def _steps(step):
+    """ Transformers of a pipeline in order: nested pipelines flattened, wrappers (ParallelTransformer,
+    InstrumentedPipeline: pipeline, CachedTransformer: transformer) replaced by what they wrap """
+    if step is None or step == 'passthrough':
+        return
+    if isinstance(step, Pipeline):
+        for _, sub_step in step.steps:
+            for item in _steps(sub_step):
+                yield item
+        return
+    for attr in ['pipeline', 'transformer']:
+        wrapped = getattr(step, attr, None)
+        if wrapped is not None and hasattr(wrapped, 'fit'):
+            for item in _steps(wrapped):
+                yield item
+            return
+    yield step
+
+
+def _declared(step, method, *args):
+    # steps which are not custom transformers (e.g. scikit-learn ones) declare nothing: unknown
+    declare = getattr(step, method, None)
+    return None if declare is None else declare(*args)
+
+
+def required_columns(pipeline, columns, keep=None):
+    """ Columns of the input that a pipeline needs, out of columns (e.g. the header of a CSV file)
+
+    Follows the columns through the steps with the declarations of the transformers (_required_columns,
+    _produced_columns, _dropped_columns of BaseTransformer). A column of the input is needed if a step reads
+    it, or if it is still in the output. It is not needed if it is dropped (DropColumns with errors='ignore',
+    a feature selection) before any step reads it. After a step that does not declare the columns it reads
+    (e.g. a scikit-learn transformer or estimator), all the remaining columns are needed.
+
+    Args:
+        pipeline (sklearn.pipeline.Pipeline): pipeline (or transformer), fitted or not
+        columns (List): columns of the input, in order
+        keep (List): columns needed besides the input of the pipeline, e.g. the target, default None
+
+    Returns:
+        List: needed columns, in the order of columns
+    """
+    keep = set(keep or []) & set(columns)
+    current = [col for col in columns if col not in keep]
+    # columns still holding the input values
+    raw = set(current)
+    needed = set(keep)
+
+    for step in _steps(pipeline):
+        required = _declared(step, '_required_columns')
+        if required is None:
+            break
+        needed |= set(required) & raw
+        # the position of a replaced input column in the output depends on it, it is read
+        produced = _declared(step, '_produced_columns')
+        needed |= set(produced) & raw
+        raw -= set(produced)
+        dropped = set(_declared(step, '_dropped_columns', current))
+        raw -= dropped
+        current = [col for col in current if col not in dropped]
+        current += [col for col in produced if col not in current]
+
+    needed |= raw
+    return [col for col in columns if col in needed]
+
+
+def plan_read(path, pipeline, dtype=None, keep=None):
+    """ usecols and dtype arguments of pd.read_csv (or read_chunks) which read only the columns of a CSV file
+    needed by pipeline (required_columns, from the header of the file)
+
+    Args:
+        path (str): path of the CSV file
+        pipeline (sklearn.pipeline.Pipeline): pipeline which transforms the content of the file
+        dtype (dict): column -> dtype of the columns of the file, e.g. DTYPES, only the needed ones are
+            passed, default None (inferred by pandas)
+        keep (List): columns to read besides the input of the pipeline (if in the file), e.g. the target,
+            default None
+
+    Returns:
+        dict: usecols, and dtype if given
+    """
+    header = list(pd.read_csv(path, nrows=0).columns)
+    usecols = required_columns(pipeline, header, keep)
+    kwargs = {'usecols': usecols}
+    if dtype is not None:
+        kwargs['dtype'] = {col: dtype[col] for col in usecols if col in dtype}
+    return kwargs
+
+
+def read_csv(path, pipeline, dtype=None, keep=None, **read_csv_kwargs):
+    """ Reads the columns of a CSV file needed by pipeline (see required_columns)
+
+    Args:
+        path (str): path of the CSV file
+        pipeline (sklearn.pipeline.Pipeline): pipeline which transforms the content of the file
+        dtype (dict): column -> dtype of the columns of the file, default None (inferred by pandas)
+        keep (List): columns to read besides the input of the pipeline (if in the file), e.g. the target,
+            default None
+        read_csv_kwargs: other arguments of pd.read_csv
+
+    Returns:
+        pd.DataFrame: needed columns of the file, in the order of the file
+
+    Example:
+        # the dropped columns are not read, the drop step has to skip them
+        pipeline.set_params(drop_cols__errors='ignore')
+        train = read_csv('data/train.csv', pipeline, dtype=DTYPES, keep=['target'])
+    """
+    kwargs = plan_read(path, pipeline, dtype, keep)
+    kwargs.update(read_csv_kwargs)
+    return pd.read_csv(path, **kwargs)
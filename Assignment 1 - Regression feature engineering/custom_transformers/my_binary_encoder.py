@@ -1,42 +1,69 @@
 import pandas as pd
 import numpy as np
-from sklearn.base import BaseEstimator, TransformerMixin
+from custom_transformers.base import BaseTransformer
+from custom_transformers.record import is_missing, missing_columns
 
 
-class MyBinaryEncoder(BaseEstimator, TransformerMixin):
+class MyBinaryEncoder(BaseTransformer):
     """ Transforms 3 columns with categorical or continuous values into binary 
     
     MiscFeature: 1 if not null, 0 otherwise
     MasVnrType: 1 if MasVnrType is Stone, else 0
     CentralAir: 1 if Y, 0 if N
+    
+    Args:
+        copy (bool): if True (default) the input DataFrame is left untouched, otherwise it is transformed in place
         
     Returns: 
         pd.DataFrame: transformed pandas DataFrame.
     
     """
     
-    def __init__(self):
-        pass
+    def __init__(self, copy=True):
+        self.copy = copy
         
     def fit(self, X, y=None):
         return self
     
+    def _required_columns(self):
+        return ['MiscFeature', 'CentralAir', 'MasVnrType']
+    
+    def _produced_columns(self):
+        return ['hasMiscFeature', 'MasVnrStone']
+    
+    def _dropped_columns(self, columns):
+        return [col for col in ['MiscFeature', 'MasVnrType'] if col in columns]
+    
+    def _compile_record(self):
+        central_air = {'Y': 1, 'N': 0}
+        
+        def transform_record(record):
+            try:
+                record['hasMiscFeature'] = int(not is_missing(record.pop('MiscFeature')))
+                record['CentralAir'] = central_air.get(record['CentralAir'], record['CentralAir'])
+                record['MasVnrStone'] = int(record.pop('MasVnrType') == 'Stone')
+                return record
+            except KeyError:
+                cols_error = missing_columns(record, ['MiscFeature', 'CentralAir', 'MasVnrType'])
+                raise KeyError('[BinaryEnc] record does not include the columns:', cols_error)
+        return transform_record
+    
     def transform(self, X):
         
-        assert isinstance(X, pd.DataFrame)
+        X = self._check_input(X)
         
         try:
             
             # MiscFeature
             X.loc[:, 'MiscFeature'] = X.loc[:, 'MiscFeature'].notnull().astype(int)
-            X = X.rename(columns={'MiscFeature': 'hasMiscFeature'})
+            X.rename(columns={'MiscFeature': 'hasMiscFeature'}, inplace=True)
             
             # CentralAir
             X.loc[:, 'CentralAir'] = X.loc[:, 'CentralAir'].replace({'Y':1, 'N':0})
             
             # MasVnrType
             X.loc[:, 'MasVnrType'] = (X.loc[:, 'MasVnrType']=='Stone').astype(int)
-            X = X.rename(columns={'MasVnrType': 'MasVnrStone'})
+            X.rename(columns={'MasVnrType': 'MasVnrStone'}, inplace=True)
                     
             return X
             
@@ -1,26 +1,169 @@
 import pandas as pd
 import numpy as np
-from sklearn.base import BaseEstimator, TransformerMixin
+from scipy import sparse
+from custom_transformers.base import BaseTransformer
+from custom_transformers.record import is_missing, missing_columns
 
-class MyDummyFeatures(BaseEstimator, TransformerMixin):
+class MyDummyFeatures(BaseTransformer):
     """Dummification of categorical features
-    
-    Returns: 
-        pd.DataFrame: transformed pandas DataFrame.
+
+    Levels of each categorical column are recorded at fit, so transform always gives the same column layout
+    as pd.get_dummies(X, drop_first=True) on the training data: other columns first, then one column per level
+    except the first one, named column_level. Levels not seen at fit and NAs give 0 in all dummy columns.
+
+    Builds a new DataFrame (or matrix), the input DataFrame is never modified.
+
+    Args:
+        columns (List): list of categorical column names to dummify if given, else all object, string and category
+            columns
+        output (str): 'dense' (default) for a DataFrame, 'sparse' for a DataFrame with pandas sparse dummy columns,
+            'csr' for a scipy.sparse CSR matrix of all columns (float64, ValueError is raised if a column that is not
+            dummified is not numeric)
+        dtype (np.dtype): dtype of the dummy columns, default np.uint8
+        handle_unknown (str): 'ignore' (default) to encode levels not seen at fit as 0, 'error' to raise ValueError
+        copy (bool): kept for a uniform interface, the input DataFrame is never modified
+
+    Returns:
+        pd.DataFrame or scipy.sparse.csr_matrix: transformed data.
     """
-    
-    def __init__(self):
-        pass
-    
+
+    _inplace_safe = False
+
+    _fitted_attributes = ('categories_', 'dummy_columns_', 'other_columns_')
+
+    def __init__(self, columns=None, output='dense', dtype=np.uint8, handle_unknown='ignore', copy=True):
+        self.columns = columns
+        self.output = output
+        self.dtype = dtype
+        self.handle_unknown = handle_unknown
+        self.copy = copy
+
     def fit(self, X, y=None):
+        assert isinstance(X, pd.DataFrame)
+
+        if self.output not in ('dense', 'sparse', 'csr'):
+            raise ValueError('output should be either "dense", "sparse" or "csr", got %r' % self.output)
+        if self.handle_unknown not in ('ignore', 'error'):
+            raise ValueError('handle_unknown should be either "ignore" or "error", got %r' % self.handle_unknown)
+
+        if self.columns is not None:
+            cat_cols = list(self.columns)
+        else:
+            cat_cols = list(X.select_dtypes(include=['object', 'string', 'category']).columns)
+
+        try:
+            # same (sorted) order of levels as pd.get_dummies
+            self.categories_ = {col: pd.Categorical(X.loc[:, col]).categories for col in cat_cols}
+        except KeyError:
+            cols_error = list(set(cat_cols) - set(X.columns))
+            raise KeyError('[DummyFeatures] DataFrame does not include the columns:', cols_error)
+
+        self.other_columns_ = [col for col in X.columns if col not in self.categories_]
+
+        self.dummy_columns_ = []
+        for col, categories in self.categories_.items():
+            self.dummy_columns_ += ['%s_%s' % (col, level) for level in categories[1:]]
+
         return self
+
+    def get_feature_names_out(self, input_features=None):
+        return np.array(self.other_columns_ + self.dummy_columns_, dtype=object)
+
+    def _required_columns(self):
+        # without columns, all the object, string and category columns are dummified
+        return None if self.columns is None else list(self.columns)
     
-    def transform(self, X):
-        
-        assert isinstance(X, pd.DataFrame)
-        
-        return pd.get_dummies(X, drop_first=True)
-            
+    def _dropped_columns(self, columns):
+        return [col for col in columns if col in (self.columns or [])]
+    
+    def _compile_record(self):
+        """ Record mode: builds the dense output row (float64) directly, so this is the last step """
+        n_other = len(self.other_columns_)
+        n_columns = n_other + len(self.dummy_columns_)
         
+        # level -> position of its dummy column in the output row, -1 for the dropped first level
+        positions = []
+        offset = n_other
+        for col, categories in self.categories_.items():
+            levels = {level: offset + i - 1 for i, level in enumerate(categories.tolist())}
+            if len(categories):
+                levels[categories[0]] = -1
+            positions.append((col, levels))
+            offset += len(categories) - 1
         
-        
\ No newline at end of file
+        def transform_record(record):
+            row = np.zeros(n_columns, dtype=np.float64)
+            try:
+                row[:n_other] = [record[col] for col in self.other_columns_]
+                for col, levels in positions:
+                    value = record[col]
+                    position = levels.get(value)
+                    if position is None:
+                        if self.handle_unknown == 'error' and not is_missing(value):
+                            raise ValueError('[DummyFeatures] %s: unknown levels %s' % (col, [value]))
+                    elif position >= 0:
+                        row[position] = 1
+            except KeyError:
+                cols_related = list(self.categories_) + self.other_columns_
+                raise KeyError('[DummyFeatures] record does not include the columns:', missing_columns(record, cols_related))
+            return row
+        return transform_record
+    
+    def _dummy_positions(self, X):
+        """ Returns row and column positions of the ones of the dummy columns """
+        rows = []
+        cols = []
+        offset = 0
+        for col, categories in self.categories_.items():
+            codes = pd.Categorical(X.loc[:, col], categories=categories).codes
+
+            if self.handle_unknown == 'error':
+                unknown = (codes == -1) & X.loc[:, col].notnull().to_numpy()
+                if unknown.any():
+                    raise ValueError('[DummyFeatures] %s: unknown levels %s'
+                                     % (col, list(pd.unique(X.loc[unknown, col]))))
+
+            # code 0 is the dropped first level, -1 is NA or unknown level
+            present = np.flatnonzero(codes > 0)
+            rows.append(present)
+            cols.append(offset + codes[present].astype(np.int64) - 1)
+            offset += len(categories) - 1
+
+        if not rows:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+        return np.concatenate(rows), np.concatenate(cols)
+
+    def transform(self, X):
+
+        X = self._check_input(X)
+
+        try:
+            rows, cols = self._dummy_positions(X)
+            other = X.loc[:, self.other_columns_]
+
+        except KeyError:
+            cols_related = list(self.categories_) + self.other_columns_
+            cols_error = list(set(cols_related) - set(X.columns))
+            raise KeyError('[DummyFeatures] DataFrame does not include the columns:', cols_error)
+
+        shape = (len(X), len(self.dummy_columns_))
+
+        if self.output == 'dense':
+            # one row per dummy column, the transposed array has the memory layout of a pandas block
+            dummies = np.zeros(shape[::-1], dtype=self.dtype)
+            dummies[cols, rows] = 1
+            dummies = pd.DataFrame(dummies.T, index=X.index, columns=self.dummy_columns_)
+            return pd.concat([other, dummies], axis=1)
+
+        dummies = sparse.csr_matrix((np.ones(len(rows), dtype=self.dtype), (rows, cols)), shape=shape)
+
+        if self.output == 'sparse':
+            dummies = pd.DataFrame.sparse.from_spmatrix(dummies, index=X.index, columns=self.dummy_columns_)
+            return pd.concat([other, dummies], axis=1)
+
+        non_numeric = [col for col in self.other_columns_ if not pd.api.types.is_numeric_dtype(other[col])]
+        if non_numeric:
+            raise ValueError('[DummyFeatures] output="csr" needs numeric columns, these columns are not numeric and '
+                             'not dummified: %s' % non_numeric)
+        other = sparse.csr_matrix(other.to_numpy(dtype=np.float64))
+        return sparse.hstack([other, dummies.astype(np.float64)], format='csr')
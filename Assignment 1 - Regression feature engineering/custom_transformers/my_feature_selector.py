@@ -1,26 +1,48 @@
 import pandas as pd
 import numpy as np
-from sklearn.base import BaseEstimator, TransformerMixin
+from custom_transformers.base import BaseTransformer
+from custom_transformers.record import missing_columns
 
-class MyFeatureSelector(BaseEstimator, TransformerMixin):
+class MyFeatureSelector(BaseTransformer):
     """ Selects final columns and returns transformed DataFrame
     
     Args:
-        columns (List): list of column names to drop
+        columns (List): list of column names to select
+        copy (bool): kept for a uniform interface, the selection is a new DataFrame and the input DataFrame is never modified
         
     Returns: 
         pd.DataFrame: transformed pandas DataFrame.
         
     """ 
     
-    def __init__(self, columns):
+    _inplace_safe = False
+    
+    def __init__(self, columns, copy=True):
         self.columns = columns
+        self.copy = copy
 
     def fit(self, X, y=None):
         return self
+    
+    def _required_columns(self):
+        return list(self.columns)
+    
+    def _dropped_columns(self, columns):
+        return [col for col in columns if col not in self.columns]
+    
+    def get_feature_names_out(self, input_features=None):
+        return np.array(self.columns, dtype=object)
+    
+    def _compile_record(self):
+        def transform_record(record):
+            try:
+                return {col: record[col] for col in self.columns}
+            except KeyError:
+                raise KeyError('[FeatureSelector] record does not include the columns:', missing_columns(record, self.columns))
+        return transform_record
 
     def transform(self, X):
-        assert isinstance(X, pd.DataFrame)
+        X = self._check_input(X)
 
         try:
             return X.loc[:, self.columns]
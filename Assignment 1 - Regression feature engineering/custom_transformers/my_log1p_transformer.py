@@ -1,41 +1,220 @@
 import pandas as pd
 import numpy as np
-from sklearn.base import BaseEstimator, TransformerMixin
+from custom_transformers.base import BaseTransformer
+from custom_transformers.record import missing_columns
 
 
-class MyLog1pTransformer(BaseEstimator, TransformerMixin):
+def numeric_columns(X):
+    """ Columns of X on which skewness is defined: numeric and boolean columns (the ones X.skew kept on
+    pandas < 2, which fails on the string columns from pandas 2) """
+    # dtypes instead of select_dtypes, which consolidates the blocks of X
+    return [col for col, dtype in X.dtypes.items() if pd.api.types.is_numeric_dtype(dtype)]
+
+
+def _column_values(X, columns, dtype):
+    """ Values of each column as a 1-D array of dtype (no copy for the columns already in dtype),
+    missing values as NaN """
+    cols_error = list(set(columns) - set(X.columns))
+    if cols_error:
+        raise KeyError('[LogTransf] DataFrame does not include the columns:', cols_error)
+    for col in columns:
+        yield X[col].to_numpy(dtype=dtype, na_value=np.nan)
+
+
+class SkewMoments(object):
+    """ Mergeable count, mean and central moments (sums of squared and cubed deviations) of columns
+
+    Each update computes the moments of a chunk in two passes and merges them with the current ones
+    (pairwise formulas of Chan et al. / Pebay), so moments of chunks or of parallel workers can be combined
+    with merge and give the skewness of the whole data. Missing values are skipped, like in X.skew.
+
+    Args:
+        columns (List): column names
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.count = np.zeros(len(self.columns))
+        self.mean = np.zeros(len(self.columns))
+        self.m2 = np.zeros(len(self.columns))
+        self.m3 = np.zeros(len(self.columns))
+
+    @classmethod
+    def from_frame(cls, X, columns):
+        """ Moments of the columns of a DataFrame (or of a chunk) """
+        moments = cls(columns)
+        for i, values in enumerate(_column_values(X, moments.columns, np.float64)):
+            missing = np.isnan(values)
+            if missing.any():
+                values = values[~missing]
+            if len(values):
+                moments.count[i] = len(values)
+                moments.mean[i] = values.mean()
+                deviations = values - moments.mean[i]
+                squared = deviations * deviations
+                moments.m2[i] = squared.sum()
+                moments.m3[i] = squared @ deviations
+        return moments
+
+    def merge(self, other):
+        """ Merges the moments of other (same columns) into these ones
+
+        Returns:
+            SkewMoments: self
+        """
+        if other.columns != self.columns:
+            raise ValueError('[LogTransf] moments of different columns can not be merged')
+
+        count = self.count + other.count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = other.mean - self.mean
+            weight = np.where(count > 0, self.count * other.count / count, 0)
+            mean = self.mean + np.where(count > 0, delta * other.count / count, 0)
+            m2 = self.m2 + other.m2 + delta ** 2 * weight
+            m3 = self.m3 + other.m3 + np.where(
+                count > 0,
+                delta ** 3 * weight * (self.count - other.count) / count
+                + 3 * delta * (self.count * other.m2 - other.count * self.m2) / count,
+                0)
+
+        self.count, self.mean, self.m2, self.m3 = count, mean, m2, m3
+        return self
+
+    def skew(self):
+        """ Unbiased skewness of each column, as X.skew: 0 for constant columns, NaN below 3 values
+
+        Returns:
+            pd.Series: skewness indexed by column name
+        """
+        n = self.count
+        # sums below 1e-14 are rounding errors (as in pandas), the column is constant
+        m2 = np.where(np.abs(self.m2) < 1e-14, 0, self.m2)
+        m3 = np.where(np.abs(self.m3) < 1e-14, 0, self.m3)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            skew = n * np.sqrt(n - 1) / (n - 2) * m3 / m2 ** 1.5
+        skew = np.where(m2 == 0, 0, skew)
+        skew[n < 3] = np.nan
+        return pd.Series(skew, index=self.columns)
+
+    def get_state(self):
+        return {'moments_columns': self.columns, 'moments': np.vstack([self.count, self.mean, self.m2, self.m3])}
+
+    @classmethod
+    def from_state(cls, state):
+        moments = cls(state['moments_columns'])
+        moments.count, moments.mean, moments.m2, moments.m3 = np.array(state['moments'], dtype=np.float64)
+        return moments
+
+
+class MyLog1pTransformer(BaseTransformer):
     """ Apply np.log1p on columns and save it as separate column
-    
+
+    Unless columns are given, the columns are the numeric ones with skewness > threshold. The skewness
+    is computed from mergeable moments (SkewMoments), so the transformer can also be fit by chunks
+    with partial_fit.
+
     Args:
-        columns (List): list of column names to transform if given, else all columns
-        
-    Returns: 
+        columns (List): list of column names to transform if given, else the skewed numeric columns
+        threshold (float): skewness above which a column is transformed, default 0.75
+        dtype: dtype of the log columns, default np.float64 (np.float32 halves their memory)
+        copy (bool): if True (default) the input DataFrame is left untouched, otherwise it is transformed in place
+
+    Returns:
         pd.DataFrame: transformed pandas DataFrame.
-    
+
     """
-    
-    def __init__(self, columns=None):
+
+    _fitted_attributes = ('skewed_cols',)
+
+    def __init__(self, columns=None, threshold=0.75, dtype=np.float64, copy=True):
         self.columns = columns
-        
+        self.threshold = threshold
+        self.dtype = dtype
+        self.copy = copy
+
     def fit(self, X, y=None):
         if self.columns:
             self.skewed_cols = self.columns
-        else:
-            self.skewed_cols = X.skew(axis=0)[X.skew(axis=0)>0.75].index
+            return self
+
+        self.moments_ = SkewMoments.from_frame(X, numeric_columns(X))
+        self._select_columns()
+        return self
+
+    def partial_fit(self, X, y=None):
+        """ Updates the moments with a chunk of rows, the numeric columns are the ones of the first chunk """
+        if self.columns or not hasattr(self, 'moments_'):
+            return self.fit(X, y)
+
+        self.moments_.merge(SkewMoments.from_frame(X, self.moments_.columns))
+        self._select_columns()
+        return self
+
+    def merge(self, other):
+        """ Merges the moments of another MyLog1pTransformer fit on other rows (e.g. by a parallel worker)
+
+        With columns given nothing is merged: the columns do not depend on the data """
+        if self.columns:
+            self.skewed_cols = self.columns
+            return self
+        if not hasattr(other, 'moments_'):
+            raise ValueError('[LogTransf] the other transformer has no moments to merge (not fit, or fit with columns)')
+        if not hasattr(self, 'moments_'):
+            self.moments_ = SkewMoments(other.moments_.columns)
+        self.moments_.merge(other.moments_)
+        self._select_columns()
         return self
-    
+
+    def _select_columns(self):
+        skew = self.moments_.skew()
+        self.skewed_cols = list(skew[skew > self.threshold].index)
+
+    def _get_state(self):
+        state = {'skewed_cols': list(self.skewed_cols)}
+        if hasattr(self, 'moments_'):
+            state.update(self.moments_.get_state())
+        return state
+
+    def _set_state(self, state):
+        self.skewed_cols = state['skewed_cols']
+        if 'moments' in state:
+            self.moments_ = SkewMoments.from_state(state)
+
+    def _log_columns(self):
+        return ['_'.join([col, 'log']) for col in self.skewed_cols]
+
+    def _required_columns(self):
+        # without columns, the skewed ones are selected at fit among all the numeric columns
+        return list(self.columns) if self.columns else None
+
+    def _produced_columns(self):
+        return ['_'.join([col, 'log']) for col in self.columns] if self.columns else []
+
+    def _compile_record(self):
+        columns = list(self.skewed_cols)
+        log_columns = self._log_columns()
+        dtype = self.dtype
+
+        def transform_record(record):
+            try:
+                values = np.array([record[col] for col in columns], dtype=dtype)
+            except KeyError:
+                raise KeyError('[LogTransf] record does not include the columns:', missing_columns(record, columns))
+            record.update(zip(log_columns, np.log1p(values)))
+            return record
+        return transform_record
+
     def transform(self, X):
         
         assert isinstance(X, pd.DataFrame)
+        self._check_fitted()
         
-        try:
-            
-            for col in self.skewed_cols:
-                X.loc[:, '_'.join([col, 'log'])] = np.log1p(X.loc[:, col])
+        # the columns are gathered into one 2-D block in the output dtype (np.log1p would return float16 for
+        # the int8 encoded columns), then a single np.log1p runs over the block, in place. Fortran order makes
+        # each column contiguous, and is the layout of the block of the frame: concat does not transpose it
+        values = np.empty((len(X), len(self.skewed_cols)), dtype=self.dtype, order='F')
+        for i, column in enumerate(_column_values(X, self.skewed_cols, self.dtype)):
+            values[:, i] = column
+        np.log1p(values, out=values)
         
-                
-            return X
-            
-        except KeyError:
-            cols_error = list(set(self.skewed_cols) - set(X.columns))
-            raise KeyError('[LogTransf] DataFrame does not include the columns:', cols_error)
\ No newline at end of file
+        return self._add_columns(X, pd.DataFrame(values, index=X.index, columns=self._log_columns()))
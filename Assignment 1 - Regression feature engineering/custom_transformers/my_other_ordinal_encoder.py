@@ -1,9 +1,11 @@
 import pandas as pd
 import numpy as np
-from sklearn.base import BaseEstimator, TransformerMixin
+from custom_transformers.base import BaseTransformer
+from custom_transformers.category_lookup import CategoryLookup
+from custom_transformers.record import missing_columns
             
             
-class MyOtherOrdinalEncoder(BaseEstimator, TransformerMixin):
+class MyOtherOrdinalEncoder(BaseTransformer):
     """ Custom transformer to encode categorical values with ordinal meaning into integers. Works only on specific columns, as the encoding is hard-coded as shown below (NAs are replaced by 0): 
     
     _order_encoder = {
@@ -19,9 +21,15 @@ class MyOtherOrdinalEncoder(BaseEstimator, TransformerMixin):
         'HouseStyle': {'1Story': 1, '1.5Fin': 1.5, '1.5Unf': 1.25, '2Story': 2, '2.5Fin': 2.5, '2.5Unf': 2.25, 'SFoyer': 2, 'SLvl': 2}
     }
     
+    Lookup tables are built at fit, values are encoded through pd.Categorical codes into compact columns.
+    The encoded columns are numeric with pandas 1 and 2: with pandas 2 the former replace + fillna left them
+    as object columns, which MyDummyFeatures then one-hot encoded (and MyLog1pTransformer did not consider).
     
     Args:
         columns (List): list of column names to transform
+        handle_unknown (str): 'zero' (default) to encode values not listed above as 0, 'nan' to encode them as NaN, 'error' to raise ValueError
+        dtype (np.dtype): dtype of the encoded columns, default np.float32
+        copy (bool): if True (default) the input DataFrame is left untouched, otherwise it is transformed in place
         
     Returns: 
         pd.DataFrame: transformed pandas DataFrame.
@@ -40,23 +48,48 @@ class MyOtherOrdinalEncoder(BaseEstimator, TransformerMixin):
         'HouseStyle': {'1Story': 1, '1.5Fin': 1.5, '1.5Unf': 1.25, '2Story': 2, '2.5Fin': 2.5, '2.5Unf': 2.25, 'SFoyer': 2, 'SLvl': 2}
     }
 
-    def __init__(self, columns):
+    _fitted_attributes = ('lookup_',)
+
+    def __init__(self, columns, handle_unknown='zero', dtype=np.float32, copy=True):
         self.columns = columns
+        self.handle_unknown = handle_unknown
+        self.dtype = dtype
+        self.copy = copy
     
     def fit(self, X,y=None):
+        cols_error = list(set(self.columns) - set(self._order_encoder))
+        if cols_error:
+            raise KeyError('[OrdEnc] No encoding defined for the columns:', cols_error)
+        
+        # NAs are replaced with 0 since NAs indicate absence of the feature
+        self.lookup_ = {col: CategoryLookup(self._order_encoder[col], missing_value=0, 
+                                            handle_unknown=self.handle_unknown, dtype=self.dtype)
+                        for col in self.columns}
         return self
     
+    def _required_columns(self):
+        return list(self.columns)
+    
+    def _compile_record(self):
+        lookups = [(col, self.lookup_[col]) for col in self.columns]
+        
+        def transform_record(record):
+            try:
+                for col, lookup in lookups:
+                    record[col] = lookup.encode_value(record[col], col)
+                return record
+            except KeyError:
+                raise KeyError('[OrdEnc] record does not include the columns:', missing_columns(record, self.columns))
+        return transform_record
+    
     def transform(self, X):
         
-        assert isinstance(X, pd.DataFrame)
+        X = self._check_input(X)
         
         try:
             
             for col in self.columns:
-                X.loc[:, col] = X.loc[:, col].replace(self._order_encoder.get(col))
-            
-            # replace NAs with 0 since NAs indicate absence of the feature
-            X.loc[:, self.columns] = X.loc[:, self.columns].fillna(0)
+                X[col] = self.lookup_[col].encode(X[col])
                 
             return X 
             
@@ -1,8 +1,10 @@
 import pandas as pd
 import numpy as np
-from sklearn.base import BaseEstimator, TransformerMixin
+from custom_transformers.base import BaseTransformer
+from custom_transformers.category_lookup import CategoryLookup
+from custom_transformers.record import missing_columns
 
-class MyQualityEncoder(BaseEstimator, TransformerMixin):
+class MyQualityEncoder(BaseTransformer):
     """Custom transformer to encode categorical values with quality information into integers. Works on those  columns, whose values are encoded as shown below (NAs are replaced by 0): 
     
     quality_measures = {'Ex': 5, 'Gd': 4, 'TA': 3, 'Fa': 2, 'Po': 1}
@@ -12,8 +14,15 @@ class MyQualityEncoder(BaseEstimator, TransformerMixin):
     Fa: Fair
     Po: Poor
     
+    Lookup tables are built at fit, values are encoded through pd.Categorical codes into compact columns.
+    The encoded columns are numeric with pandas 1 and 2: with pandas 2 the former replace + fillna left them
+    as object columns, which MyDummyFeatures then one-hot encoded (and MyLog1pTransformer did not consider).
+    
     Args:
         columns (List): list of column names to transform
+        handle_unknown (str): 'zero' (default) to encode values not listed above as 0, 'nan' to encode them as NaN, 'error' to raise ValueError
+        dtype (np.dtype): dtype of the encoded columns, default np.int8 (requires a floating dtype for handle_unknown='nan')
+        copy (bool): if True (default) the input DataFrame is left untouched, otherwise it is transformed in place
         
     Returns: 
         pd.DataFrame: transformed pandas DataFrame.
@@ -21,20 +30,42 @@ class MyQualityEncoder(BaseEstimator, TransformerMixin):
     
     _quality_measures = {'Ex':5,'Gd':4,'TA':3,'Fa':2,'Po':1}
     
-    def __init__(self, columns):
+    _fitted_attributes = ('lookup_',)
+    
+    def __init__(self, columns, handle_unknown='zero', dtype=np.int8, copy=True):
         self.columns=columns
+        self.handle_unknown = handle_unknown
+        self.dtype = dtype
+        self.copy = copy
         
     def fit(self, X, y=None):
+        # NAs are replaced with 0 since NAs indicate absence of the feature
+        lookup = CategoryLookup(self._quality_measures, missing_value=0, 
+                                handle_unknown=self.handle_unknown, dtype=self.dtype)
+        self.lookup_ = {col: lookup for col in self.columns}
         return self
     
+    def _required_columns(self):
+        return list(self.columns)
+    
+    def _compile_record(self):
+        lookups = [(col, self.lookup_[col]) for col in self.columns]
+        
+        def transform_record(record):
+            try:
+                for col, lookup in lookups:
+                    record[col] = lookup.encode_value(record[col], col)
+                return record
+            except KeyError:
+                raise KeyError('[QualEnc] record does not include the columns:', missing_columns(record, self.columns))
+        return transform_record
+    
     def transform(self,X): 
-        assert isinstance(X, pd.DataFrame)
+        X = self._check_input(X)
         
         try:
-            X.loc[:, self.columns] = X.loc[:, self.columns].replace(self._quality_measures)
-            
-            # replace NAs with 0 since NAs indicate absence of the feature
-            X.loc[:, self.columns] = X.loc[:, self.columns].fillna(0) 
+            for col in self.columns:
+                X[col] = self.lookup_[col].encode(X[col])
             
             return X 
             
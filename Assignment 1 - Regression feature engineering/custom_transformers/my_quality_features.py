@@ -1,8 +1,10 @@
 import pandas as pd
 import numpy as np
-from sklearn.base import BaseEstimator, TransformerMixin
+from custom_transformers.base import BaseTransformer
+from custom_transformers.record import missing_columns
+from custom_transformers.feature_expressions import FeatureExpressions, col, safe_div
 
-class MyQualityFeatures(BaseEstimator, TransformerMixin):
+class MyQualityFeatures(BaseTransformer):
     """Adds features based on quality / conditions
         
     Args: 
@@ -15,6 +17,7 @@ class MyQualityFeatures(BaseEstimator, TransformerMixin):
         garage_sum (Bool): True (default) to include feature equal to a sum of GarageQual and GarageCond, False otherwise,
         basement_mult (Bool): True (default) to include feature equal to a multiplication of BsmtQual and BsmtCond, False otherwise
         basement_sum (Bool): True (default) to include feature equal to a sum of BsmtQual and BsmtCond, False otherwise
+        copy (Bool): True (default) to leave the input DataFrame untouched, False to add the features in place
         
     Returns: 
         pd.DataFrame: transformed pandas DataFrame with new features
@@ -22,7 +25,7 @@ class MyQualityFeatures(BaseEstimator, TransformerMixin):
     
     def __init__(self, high_quality_sf=True, overall_mult=True, overall_sum=True, 
                  external_mult=True, external_sum=True, garage_mult=True, garage_sum=True,
-                basement_mult=True, basement_sum=True):
+                basement_mult=True, basement_sum=True, copy=True):
         self.high_quality_sf = high_quality_sf
         self.overall_mult = overall_mult
         self.overall_sum = overall_sum
@@ -32,46 +35,68 @@ class MyQualityFeatures(BaseEstimator, TransformerMixin):
         self.garage_sum = garage_sum
         self.basement_mult = basement_mult
         self.basement_sum = basement_sum
+        self.copy = copy
     
     def fit(self, X, y=None):
         return self
     
-    def transform(self, X):
+    def _features(self):
+        features = []
         
-        assert isinstance(X, pd.DataFrame)
+        if self.high_quality_sf:
+            features.append(('HighQualSF_percent', safe_div(1 - col('LowQualFinSF'), col('GrLivArea'))))
         
-        try:
+        if self.overall_mult: 
+            features.append(('OverallEval_mult', col('OverallQual') * col('OverallCond')))
             
-            if self.high_quality_sf:
-                X.loc[X['GrLivArea']==0, 'HighQualSF_percent'] = 0
-                X.loc[X['GrLivArea']>0, 'HighQualSF_percent'] = (1-X.loc[:, 'LowQualFinSF']) / X.loc[:, 'GrLivArea']
+        if self.overall_sum:
+            features.append(('OverallEval_sum', col('OverallQual') + col('OverallCond')))
+            
+        if self.external_mult:
+            features.append(('ExterEval_mult', col('ExterQual') * col('ExterCond')))
+        
+        if self.external_sum:
+            features.append(('ExterEval_sum', col('ExterQual') + col('ExterCond')))
             
-            if self.overall_mult: 
-                X.loc[:, 'OverallEval_mult'] = X.loc[:, 'OverallQual'] * X.loc[:, 'OverallCond']
-                
-            if self.overall_sum:
-                X.loc[:, 'OverallEval_sum'] = X.loc[:, 'OverallQual'] + X.loc[:, 'OverallCond']
-                
-            if self.external_mult:
-                X.loc[:, 'ExterEval_mult'] = X.loc[:, 'ExterQual'] * X.loc[:, 'ExterCond']
+        if self.garage_mult:
+            features.append(('GarageEval_mult', col('GarageQual') * col('GarageCond')))
             
-            if self.external_sum:
-                X.loc[:, 'ExterEval_sum'] = X.loc[:, 'ExterQual'] + X.loc[:, 'ExterCond']
-                
-            if self.garage_mult:
-                X.loc[:, 'GarageEval_mult'] = X.loc[:, 'GarageQual'] * X.loc[:, 'GarageCond']
-                
-            if self.garage_sum:
-                X.loc[:, 'GarageEval_sum'] = X.loc[:, 'GarageQual'] + X.loc[:, 'GarageCond']
-                
-            if self.basement_mult:
-                X.loc[:, 'BsmtEval_mult'] = X.loc[:, 'BsmtQual'] * X.loc[:, 'BsmtCond']
+        if self.garage_sum:
+            features.append(('GarageEval_sum', col('GarageQual') + col('GarageCond')))
+            
+        if self.basement_mult:
+            features.append(('BsmtEval_mult', col('BsmtQual') * col('BsmtCond')))
+        
+        if self.basement_sum:
+            features.append(('BsmtEval_sum', col('BsmtQual') + col('BsmtCond')))
+            
+        return FeatureExpressions(features)
+    
+    def _required_columns(self):
+        return self._features().columns
+    
+    def _produced_columns(self):
+        return [name for name, _ in self._features().features]
+    
+    def _compile_record(self):
+        features = self._features()
+        evaluate = features.compile_record()
+        
+        def transform_record(record):
+            try:
+                record.update(evaluate(record))
+                return record
+            except KeyError:
+                raise KeyError('[QualFeature] record does not include the columns:', missing_columns(record, features.columns))
+        return transform_record
+    
+    def transform(self, X):
+        
+        assert isinstance(X, pd.DataFrame)
+        
+        try:
             
-            if self.basement_sum:
-                X.loc[:, 'BsmtEval_sum'] = X.loc[:, 'BsmtQual'] + X.loc[:, 'BsmtCond']
-                
-                    
-            return X
+            return self._add_columns(X, self._features().evaluate(X))
             
         except KeyError:
             cols_related = ['LowQualFinSF', 'OverallQual', 'OverallCond',
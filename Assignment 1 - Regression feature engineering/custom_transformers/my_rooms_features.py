@@ -1,8 +1,10 @@
 import pandas as pd
 import numpy as np
-from sklearn.base import BaseEstimator, TransformerMixin
+from custom_transformers.base import BaseTransformer
+from custom_transformers.record import missing_columns
+from custom_transformers.feature_expressions import FeatureExpressions, col, safe_div
 
-class MyRoomsFeatures(BaseEstimator, TransformerMixin):
+class MyRoomsFeatures(BaseTransformer):
     """Add rooms-based features, taking into account Bathrooms, Bedrooms and space
         
     Args: 
@@ -11,50 +13,70 @@ class MyRoomsFeatures(BaseEstimator, TransformerMixin):
         bedrooms_vs_area: True (default) to include feature indicating number of bedrooms per square feet
         bedrooms_vs_rooms: True (default) to include feature indicating share of bedrooms per all rooms
         rooms_vs_area: True (default) to include feature indicating number of rooms per square feet
+        copy (Bool): True (default) to leave the input DataFrame untouched, False to add the features in place
         
     Returns: 
         pd.DataFrame: transformed pandas DataFrame with new features
     """
     
-    def __init__(self, tot_bath=True, bath_vs_bedrooms=True, bedrooms_vs_area=True, bedrooms_vs_rooms=True, rooms_vs_area=True):
+    def __init__(self, tot_bath=True, bath_vs_bedrooms=True, bedrooms_vs_area=True, bedrooms_vs_rooms=True, rooms_vs_area=True, copy=True):
         self.tot_bath=tot_bath
         self.bath_vs_bedrooms = bath_vs_bedrooms
         self.bedrooms_vs_area = bedrooms_vs_area
         self.bedrooms_vs_rooms = bedrooms_vs_rooms
         self.rooms_vs_area = rooms_vs_area
+        self.copy = copy
        
 
     def fit(self, X, y=None):
         return self
     
+    def _features(self):
+        total_baths = col('FullBath') + 0.5*col('HalfBath') + col('BsmtFullBath') + 0.5*col('BsmtHalfBath')
+        features = []
+        
+        if self.tot_bath:
+            features.append(('TotBath', total_baths))
+                
+        if self.bath_vs_bedrooms:
+            features.append(('Bath_vs_Bedrooms', safe_div(total_baths, col('BedroomAbvGr'))))
+            
+        if self.bedrooms_vs_area:
+            features.append(('Bedrooms_vs_LivArea', safe_div(col('BedroomAbvGr'), col('GrLivArea'))))
+        
+        if self.bedrooms_vs_rooms:
+            features.append(('Bedrooms_vs_Rooms', safe_div(col('BedroomAbvGr'), col('TotRmsAbvGrd'))))
+            
+        if self.rooms_vs_area:
+            features.append(('Rooms_vs_LivArea', safe_div(col('TotRmsAbvGrd'), col('GrLivArea'))))
+            
+        return FeatureExpressions(features)
+    
+    def _required_columns(self):
+        return self._features().columns
+    
+    def _produced_columns(self):
+        return [name for name, _ in self._features().features]
+    
+    def _compile_record(self):
+        features = self._features()
+        evaluate = features.compile_record()
+        
+        def transform_record(record):
+            try:
+                record.update(evaluate(record))
+                return record
+            except KeyError:
+                raise KeyError('[RoomsFeature] record does not include the columns:', missing_columns(record, features.columns))
+        return transform_record
+    
     def transform(self, X):
                 
         assert isinstance(X, pd.DataFrame)
         
         try:
             
-            if self.tot_bath:
-                X.loc[:, 'TotBath'] = X.loc[:, 'FullBath'] + 0.5*X.loc[:,'HalfBath'] + X.loc[:,'BsmtFullBath'] + 0.5*X.loc[:,'BsmtHalfBath']
-                    
-            if self.bath_vs_bedrooms:
-                X.loc[X['BedroomAbvGr']==0,'Bath_vs_Bedrooms'] = 0
-                total_baths = X.loc[:, 'FullBath'] + 0.5*X.loc[:,'HalfBath'] + X.loc[:,'BsmtFullBath'] + 0.5*X.loc[:,'BsmtHalfBath']
-                X.loc[X['BedroomAbvGr']>0, 'Bath_vs_Bedrooms'] = total_baths / X.loc[:, 'BedroomAbvGr']
-                
-            if self.bedrooms_vs_area:
-                X.loc[X['GrLivArea']==0, 'Bedrooms_vs_LivArea'] = 0
-                X.loc[X['GrLivArea']>0, 'Bedrooms_vs_LivArea'] = X.loc[:, 'BedroomAbvGr'] / X.loc[:, 'GrLivArea']
-            
-            if self.bedrooms_vs_rooms:
-                X.loc[X['TotRmsAbvGrd']==0, 'Bedrooms_vs_Rooms'] = 0
-                X.loc[X['TotRmsAbvGrd']>0, 'Bedrooms_vs_Rooms'] = X.loc[:, 'BedroomAbvGr'] / X.loc[:, 'TotRmsAbvGrd']
-                
-            if self.rooms_vs_area:
-                X.loc[X['GrLivArea']==0, 'Rooms_vs_LivArea'] = 0
-                X.loc[X['GrLivArea']>0, 'Rooms_vs_LivArea'] = X.loc[:, 'TotRmsAbvGrd'] / X.loc[:, 'GrLivArea']
-                
-                
-            return X
+            return self._add_columns(X, self._features().evaluate(X))
             
         except KeyError:
             cols_related = ['BedroomAbvGr', 'GrLivArea','TotRmsAbvGrd', 
@@ -1,8 +1,9 @@
 import pandas as pd
 import numpy as np
-from sklearn.base import BaseEstimator, TransformerMixin
+from custom_transformers.base import BaseTransformer
+from custom_transformers.record import is_missing, missing_columns
 
-class MySimpleImputer(BaseEstimator, TransformerMixin):
+class MySimpleImputer(BaseTransformer):
     """Simple missing value imputer for columns: Lot Frontage, GarageType, GarageYrBlt
     
     Here are the imputations:
@@ -11,6 +12,9 @@ class MySimpleImputer(BaseEstimator, TransformerMixin):
     BsmtFinSF1, BsmtFinSF2, BsmtUnfSF, TotalBsmtSF, BsmtFullBath, BsmtHalfBath: 0, indicating no basement
     GarageCars, GarageArea: 0
     
+    Args:
+        copy (bool): if True (default) the input DataFrame is left untouched, otherwise it is transformed in place
+    
     Returns: 
         pd.DataFrame: transformed pandas DataFrame.
     """
@@ -28,15 +32,32 @@ class MySimpleImputer(BaseEstimator, TransformerMixin):
         'GarageArea': 0
     }
     
-    def __init__(self):
-        pass
+    def __init__(self, copy=True):
+        self.copy = copy
     
     def fit(self, X, y=None):
         return self
     
+    def _required_columns(self):
+        return list(self._impute_values)
+    
+    def _compile_record(self):
+        impute_values = list(self._impute_values.items())
+        
+        def transform_record(record):
+            try:
+                for col, value in impute_values:
+                    if is_missing(record[col]):
+                        record[col] = value
+                return record
+            except KeyError:
+                cols_error = missing_columns(record, self._impute_values.keys())
+                raise KeyError('[Imputer] record does not include the columns:', cols_error)
+        return transform_record
+    
     def transform(self, X):
         
-        assert isinstance(X, pd.DataFrame)
+        X = self._check_input(X)
         
         try:
             
@@ -1,8 +1,10 @@
 import pandas as pd
 import numpy as np
-from sklearn.base import BaseEstimator, TransformerMixin
+from custom_transformers.base import BaseTransformer
+from custom_transformers.record import missing_columns
+from custom_transformers.feature_expressions import FeatureExpressions, col, safe_div
 
-class MySpaceBasedFeatures(BaseEstimator, TransformerMixin):
+class MySpaceBasedFeatures(BaseTransformer):
     """Adds features based on space / area in square feet
     
         
@@ -12,55 +14,73 @@ class MySpaceBasedFeatures(BaseEstimator, TransformerMixin):
         porch (Bool): True (default) to include feature indicating total porch area in sq.feet
         lot_left_percent (Bool): True (default) to include feature indicating percentage of lot space left
         bsmt_vs_lot (Bool): True (default) to include feature indicating ratio of total basement area to total lot area
+        copy (Bool): True (default) to leave the input DataFrame untouched, False to add the features in place
         
         
     Returns: 
         pd.DataFrame: transformed pandas DataFrame with new features
     """
     
-    def __init__(self, bsmt_finished_percent=True, bsmt_vs_living=True, porch=True, lot_left_percent=True, bsmt_vs_lot=True):
+    def __init__(self, bsmt_finished_percent=True, bsmt_vs_living=True, porch=True, lot_left_percent=True, bsmt_vs_lot=True, copy=True):
         self.bsmt_finished_percent=bsmt_finished_percent
         self.bsmt_vs_living = bsmt_vs_living
         self.porch = porch
         self.lot_left_percent = lot_left_percent
         self.bsmt_vs_lot = bsmt_vs_lot
+        self.copy = copy
     
     def fit(self, X, y=None):
         return self
     
+    def _features(self):
+        total_porch = col('WoodDeckSF') + col('OpenPorchSF') + col('EnclosedPorch') \
+                      + col('3SsnPorch') + col('ScreenPorch')
+        features = []
+        
+        if self.bsmt_finished_percent:
+            features.append(('BsmtFinPercent', safe_div(1 - col('BsmtUnfSF'), col('TotalBsmtSF'))))
+        
+        if self.bsmt_vs_living:
+            features.append(('Bsmt_vs_LivArea', safe_div(col('TotalBsmtSF'), col('GrLivArea'))))
+            
+        if self.porch:
+            features.append(('TotalPorch', total_porch))
+        
+        if self.lot_left_percent:
+            lot_left = col('LotArea') - col('TotalBsmtSF') - col('GarageArea') - col('PoolArea') \
+                       - col('WoodDeckSF') - total_porch
+            features.append(('LotLeft_percent', safe_div(lot_left, col('LotArea'))))
+            
+        if self.bsmt_vs_lot:
+            features.append(('Bsmt_vs_Lot', safe_div(col('TotalBsmtSF'), col('LotArea'))))
+            
+        return FeatureExpressions(features)
+    
+    def _required_columns(self):
+        return self._features().columns
+    
+    def _produced_columns(self):
+        return [name for name, _ in self._features().features]
+    
+    def _compile_record(self):
+        features = self._features()
+        evaluate = features.compile_record()
+        
+        def transform_record(record):
+            try:
+                record.update(evaluate(record))
+                return record
+            except KeyError:
+                raise KeyError('[SpaceFeatures] record does not include the columns:', missing_columns(record, features.columns))
+        return transform_record
+    
     def transform(self, X):
         
         assert isinstance(X, pd.DataFrame)
         
         try:
             
-            if self.bsmt_finished_percent:
-                
-                X.loc[X['TotalBsmtSF']==0, 'BsmtFinPercent'] = 0
-                X.loc[X['TotalBsmtSF']>0, 'BsmtFinPercent'] = (1-X.loc[:, 'BsmtUnfSF']) / X.loc[:, 'TotalBsmtSF']
-            
-            if self.bsmt_vs_living:
-                X.loc[X['GrLivArea']==0, 'Bsmt_vs_LivArea'] = 0
-                X.loc[X['GrLivArea']>0, 'Bsmt_vs_LivArea'] = X.loc[:,'TotalBsmtSF'] / X.loc[:,'GrLivArea']
-                
-            if self.porch:
-                X.loc[:,'TotalPorch'] = X.loc[:, 'WoodDeckSF'] +  X.loc[:, 'OpenPorchSF'] + X.loc[:, 'EnclosedPorch'] \
-                                        + X.loc[:, '3SsnPorch'] + X.loc[:, 'ScreenPorch']
-            
-            if self.lot_left_percent:
-                total_porch = X.loc[:, 'WoodDeckSF'] +  X.loc[:, 'OpenPorchSF'] + X.loc[:, 'EnclosedPorch'] \
-                            + X.loc[:, '3SsnPorch'] + X.loc[:, 'ScreenPorch']
-                
-                X.loc[X['LotArea']==0, 'LotLeft_percent'] = 0
-                X.loc[X['LotArea']>0,'LotLeft_percent'] = (X.loc[:,'LotArea']-X.loc[:, 'TotalBsmtSF'] \
-                                              - X.loc[:, 'GarageArea']-X.loc[:, 'PoolArea']-X.loc[:, 'WoodDeckSF']\
-                                              -total_porch) / X.loc[:, 'LotArea']
-                
-            if self.bsmt_vs_lot:
-                X.loc[X['LotArea']==0, 'Bsmt_vs_Lot'] = 0
-                X.loc[X['LotArea']>0, 'Bsmt_vs_Lot'] = X.loc[:,'TotalBsmtSF'] / X.loc[:, 'LotArea']
-                
-            return X
+            return self._add_columns(X, self._features().evaluate(X))
             
         except KeyError:
             cols_related = ['BsmtUnfSF', 'TotalBsmtSF','GrLivArea','WoodDeckSF',
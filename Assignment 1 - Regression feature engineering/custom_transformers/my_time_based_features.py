@@ -1,8 +1,10 @@
 import pandas as pd
 import numpy as np
-from sklearn.base import BaseEstimator, TransformerMixin
+from custom_transformers.base import BaseTransformer
+from custom_transformers.record import missing_columns
+from custom_transformers.feature_expressions import FeatureExpressions, col, clip_lower, greater
 
-class MyTimeBasedFeatures(BaseEstimator, TransformerMixin):
+class MyTimeBasedFeatures(BaseTransformer):
     """Adds features based on time: YrSold, MoSold, YearBuilt, GarageYrBlt, YearRemodAdd
         
     Args: 
@@ -11,48 +13,79 @@ class MyTimeBasedFeatures(BaseEstimator, TransformerMixin):
         since_house_remod (Bool): True (default) to include feature for time since house was remodeled
         since_garage_built (Bool): True (default) to include feature for time since garage was built
         isRemodeled (Bool): True (default) to include feature indicating if house was remodeled
+        copy (Bool): True (default) to leave the input DataFrame untouched, False to add the features in place
         
     Returns: 
         pd.DataFrame: transformed pandas DataFrame with new features
     """
     
-    def __init__(self, season=True, since_house_built=True, since_house_remod=True, since_garage_built=True, isRemodeled=True):
+    _season_dict = {1:'Winter', 2:'Winter', 3: 'Spring', 4: 'Spring', 
+                    5: 'Spring', 6: 'Summer', 7: 'Summer', 8: 'Summer',
+                    9: 'Autumn', 10: 'Autumn', 11: 'Autumn', 12: 'Winter'}
+    
+    def __init__(self, season=True, since_house_built=True, since_house_remod=True, since_garage_built=True, isRemodeled=True, copy=True):
         self.season = season
         self.since_house_built = since_house_built
         self.since_house_remod = since_house_remod
         self.since_garage_built = since_garage_built
         self.isRemodeled = isRemodeled
+        self.copy = copy
     
     def fit(self, X, y=None):
         return self
     
+    def _features(self):
+        features = []
+        
+        if self.since_house_built:
+            features.append(('YrsSinceBuilt', col('YrSold') - col('YearBuilt')))
+        
+        if self.since_house_remod:
+            features.append(('YrsSinceRemod', col('YrSold') - col('YearRemodAdd')))
+            
+        if self.since_garage_built:
+            features.append(('GarageYrsSinceBuilt', clip_lower(col('YrSold') - col('GarageYrBlt'), 0)))
+            
+        if self.isRemodeled:
+            features.append(('isRemodeled', greater(col('YearBuilt') - col('YearRemodAdd'), 0)))
+            
+        return FeatureExpressions(features)
+    
+    def _required_columns(self):
+        return (['MoSold'] if self.season else []) + self._features().columns
+    
+    def _produced_columns(self):
+        return (['season'] if self.season else []) + [name for name, _ in self._features().features]
+    
+    def _compile_record(self):
+        features = self._features()
+        evaluate = features.compile_record()
+        
+        def transform_record(record):
+            try:
+                if self.season:
+                    record['season'] = self._season_dict.get(record['MoSold'], np.nan)
+                record.update(evaluate(record))
+                return record
+            except KeyError:
+                cols_error = missing_columns(record, ['MoSold'] + features.columns)
+                raise KeyError('[TimeFeature] record does not include the columns:', cols_error)
+        return transform_record
+    
     def transform(self, X):
         
         assert isinstance(X, pd.DataFrame)
         
         try:
             
-            if self.season:
-                season_dict = {1:'Winter', 2:'Winter', 3: 'Spring', 4: 'Spring', 
-                               5: 'Spring', 6: 'Summer', 7: 'Summer', 8: 'Summer',
-                              9: 'Autumn', 10: 'Autumn', 11: 'Autumn', 12: 'Winter'}
-                
-                X.loc[:, 'season'] = X.loc[:,'MoSold'].replace(season_dict)
-                
-            if self.since_house_built:
-                X.loc[:, 'YrsSinceBuilt'] = X.loc[:, 'YrSold'] - X.loc[:,'YearBuilt'] 
+            new_columns = {}
             
-            if self.since_house_remod:
-                X.loc[:, 'YrsSinceRemod'] = X.loc[:, 'YrSold'] - X.loc[:, 'YearRemodAdd']
-                
-            if self.since_garage_built:
-                X.loc[:, 'GarageYrsSinceBuilt'] = X.loc[:, 'YrSold'] - X.loc[:, 'GarageYrBlt']
-                X.loc[X['GarageYrsSinceBuilt'] < 0, 'GarageYrsSinceBuilt'] = 0
+            if self.season:
+                new_columns['season'] = X.loc[:, 'MoSold'].map(self._season_dict).to_numpy()
                 
-            if self.isRemodeled:
-                X.loc[:, 'isRemodeled'] = ((X.loc[:, 'YearBuilt'] - X.loc[:, 'YearRemodAdd']) > 0).astype(int)
+            new_columns.update(self._features().evaluate(X))
                     
-            return X
+            return self._add_columns(X, new_columns)
             
         except KeyError:
             cols_related = ['YrSold', 'YearBuilt', 'GarageYrBlt', 'YearRemodAdd', 'MoSold']
@@ -1,8 +1,10 @@
 import pandas as pd
 import numpy as np
-from sklearn.base import BaseEstimator, TransformerMixin
+from custom_transformers.base import BaseTransformer
+from custom_transformers.record import missing_columns
+from custom_transformers.feature_expressions import FeatureExpressions, col, const
 
-class MyValueAddedFeatures(BaseEstimator, TransformerMixin):
+class MyValueAddedFeatures(BaseTransformer):
     """Adds features based on value added:  Size * Quality.
         
     Args: 
@@ -12,56 +14,77 @@ class MyValueAddedFeatures(BaseEstimator, TransformerMixin):
         fireplace (Bool): True (default) to include value feature for Fireplace, False otherwise
         basement (Bool): True (default) to include value feature for Basement, False otherwise
         basement_adv (Bool): True (default) to include advanced value feature for Basement (multiplied by BsmtExposure), False otherwise
+        copy (Bool): True (default) to leave the input DataFrame untouched, False to add the features in place
         
     Returns: 
         pd.DataFrame: transformed pandas DataFrame with new features
     """
     
-    def __init__(self, pool=True, kitchen=True, garage=True, fireplace=True, basement=True, basement_adv=True):
+    def __init__(self, pool=True, kitchen=True, garage=True, fireplace=True, basement=True, basement_adv=True, copy=True):
         self.pool = pool
         self.kitchen = kitchen
         self.garage = garage
         self.fireplace = fireplace
         self.basement = basement
         self.basement_adv = basement_adv
+        self.copy = copy
     
     def fit(self, X, y=None):
         return self
     
-    def transform(self, X):
-        
-        assert isinstance(X, pd.DataFrame)
+    def _features(self):
+        bsmt_value = col('BsmtFinType1') * col('BsmtFinSF1') + col('BsmtFinType2') * col('BsmtFinSF2')
+        values = []
         
-        try:
+        if self.pool:
+            values.append(('PoolValue', col('PoolArea') * col('PoolQC')))
             
-            X.loc[:, 'TotalValue'] = 1
+        if self.kitchen:
+            values.append(('KitchenValue', col('KitchenAbvGr') * col('KitchenQual')))
+        
+        if self.fireplace: 
+            values.append(('FireplacesValue', col('Fireplaces') * col('FireplaceQu')))
             
-            if self.pool:
-                X.loc[:, 'PoolValue'] = X.loc[:, 'PoolArea'] * X.loc[:, 'PoolQC']
-                X.loc[:, 'TotalValue'] = X.loc[:, 'TotalValue'] + X.loc[:, 'PoolValue']
-                
-            if self.kitchen:
-                X.loc[:, 'KitchenValue'] = X.loc[:, 'KitchenAbvGr'] * X.loc[:, 'KitchenQual']
-                X.loc[:, 'TotalValue'] = X.loc[:, 'TotalValue'] + X.loc[:, 'KitchenValue']
+        if self.garage:
+            values.append(('GarageValue', col('GarageArea') * col('GarageQual')))
             
-            if self.fireplace: 
-                X.loc[:, 'FireplacesValue'] = X.loc[:, 'Fireplaces'] * X.loc[:, 'FireplaceQu']
-                X.loc[:, 'TotalValue'] = X.loc[:, 'TotalValue'] + X.loc[:, 'FireplacesValue']
-                
-            if self.garage:
-                X.loc[:, 'GarageValue'] = X.loc[:, 'GarageArea'] * X.loc[:, 'GarageQual']
-                X.loc[:, 'TotalValue'] = X.loc[:, 'TotalValue'] + X.loc[:, 'GarageValue']
+        if self.basement:
+            values.append(('BsmtValue', bsmt_value))
+        
+        if self.basement_adv:
+            values.append(('BsmtValueAdv', bsmt_value * col('BsmtExposure')))
+        
+        total_value = const(1)
+        for _, value in values:
+            total_value = total_value + value
                 
-            if self.basement:
-                X.loc[:, 'BsmtValue'] = X.loc[:, 'BsmtFinType1'] * X.loc[:, 'BsmtFinSF1'] + X.loc[:, 'BsmtFinType2'] * X.loc[:, 'BsmtFinSF2']
-                X.loc[:, 'TotalValue'] = X.loc[:, 'TotalValue'] + X.loc[:, 'BsmtValue']
+        return FeatureExpressions([('TotalValue', total_value)] + values)
+    
+    def _required_columns(self):
+        return self._features().columns
+    
+    def _produced_columns(self):
+        return [name for name, _ in self._features().features]
+    
+    def _compile_record(self):
+        features = self._features()
+        evaluate = features.compile_record()
+        
+        def transform_record(record):
+            try:
+                record.update(evaluate(record))
+                return record
+            except KeyError:
+                raise KeyError('[ValueFeatures] record does not include the columns:', missing_columns(record, features.columns))
+        return transform_record
+    
+    def transform(self, X):
+        
+        assert isinstance(X, pd.DataFrame)
+        
+        try:
             
-            if self.basement_adv:
-                bsmt_value = X.loc[:, 'BsmtFinType1'] * X.loc[:, 'BsmtFinSF1'] + X.loc[:, 'BsmtFinType2'] * X.loc[:, 'BsmtFinSF2']
-                X.loc[:, 'BsmtValueAdv'] = bsmt_value * X.loc[:, 'BsmtExposure']
-                X.loc[:, 'TotalValue'] = X.loc[:, 'TotalValue'] + X.loc[:, 'BsmtValueAdv']
-                    
-            return X
+            return self._add_columns(X, self._features().evaluate(X))
             
         except KeyError:
             cols_related = ['PoolArea', 'PoolQC', 'Fireplaces', 'FireplaceQu', 
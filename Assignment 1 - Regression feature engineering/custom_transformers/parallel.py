@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed, effective_n_jobs
+from pandas.api.types import union_categoricals
+from scipy import sparse
+from sklearn.base import BaseEstimator, TransformerMixin
+
+
+def _union_dtype(columns):
+    """ Categorical dtype with the union of the categories (in order of appearance) of the same column of several
+    blocks, None if the dtypes are equal or not all categorical. Raises for ordered categoricals which differ """
+    dtypes = [column.dtype for column in columns]
+    if all(dtype == dtypes[0] for dtype in dtypes):
+        return None
+    if not all(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes):
+        return None
+    return pd.CategoricalDtype(union_categoricals(columns).categories, ordered=dtypes[0].ordered)
+
+
+def _union_categories(blocks):
+    """ Row blocks (DataFrames or Series) with the same categories for each categorical column: pd.concat gives an
+    object column for categoricals whose categories differ between the blocks """
+    if isinstance(blocks[0], pd.Series):
+        dtype = _union_dtype(blocks)
+        return blocks if dtype is None else [block.astype(dtype) for block in blocks]
+
+    dtypes = {}
+    for col, dtype in blocks[0].dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            union = _union_dtype([block[col] for block in blocks])
+            if union is not None:
+                dtypes[col] = union
+    return [block.astype(dtypes) for block in blocks] if dtypes else blocks
+
+
+def _concat(blocks):
+    """ Reassembles transformed row blocks, in order """
+    if isinstance(blocks[0], (pd.DataFrame, pd.Series)):
+        return pd.concat(_union_categories(blocks))
+    if sparse.issparse(blocks[0]):
+        return sparse.vstack(blocks, format=blocks[0].format)
+    return np.concatenate(blocks)
+
+
+def parallel_transform(pipeline, X, n_jobs=-1, n_blocks=None, backend='loky', max_nbytes='1M'):
+    """ Transforms X with an already fitted pipeline (or transformer) by row blocks in parallel
+
+    All custom transformers are row-local once fitted, so the result is the same as pipeline.transform(X).
+    Categorical columns whose categories differ between the blocks are concatenated with the union of the
+    categories. Numeric columns larger than max_nbytes are handed to the workers as read-only memory maps (joblib
+    memmapping) instead of being pickled, object columns are pickled.
+
+    The speedup over pipeline.transform(X) has only been measured on a single core, where the workers only add
+    overhead: measure it with benchmarks/bench_parallel.py on the target machine before using n_jobs > 1.
+
+    Args:
+        pipeline (sklearn.pipeline.Pipeline): fitted pipeline
+        X (pd.DataFrame): data to transform
+        n_jobs (int): number of workers, -1 (default) for all cores
+        n_blocks (int): number of row blocks, default one per worker
+        backend (str): joblib backend, default 'loky' (processes). With 'threading' the transformers should
+            have copy=True, as the blocks can be views of X
+        max_nbytes (str or int): arrays larger than this are memory mapped, None to disable, default '1M'
+
+    Returns:
+        transformed data, blocks concatenated in the order of the rows of X
+    """
+    assert isinstance(X, pd.DataFrame)
+
+    n_jobs = effective_n_jobs(n_jobs)
+    n_blocks = min(n_blocks or n_jobs, len(X))
+    if n_jobs == 1 or n_blocks <= 1:
+        return pipeline.transform(X)
+
+    bounds = np.linspace(0, len(X), n_blocks + 1).astype(int)
+    blocks = [X.iloc[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+
+    results = Parallel(n_jobs=n_jobs, backend=backend, max_nbytes=max_nbytes)(
+        delayed(pipeline.transform)(block) for block in blocks)
+
+    return _concat(results)
+
+
+class ParallelTransformer(BaseEstimator, TransformerMixin):
+    """ Wraps a pipeline (or transformer): fit as usual, transform by row blocks in parallel (see parallel_transform)
+
+    Args:
+        pipeline (sklearn.pipeline.Pipeline): pipeline to wrap
+        n_jobs (int): number of workers, -1 (default) for all cores
+        n_blocks (int): number of row blocks, default one per worker
+        backend (str): joblib backend, default 'loky' (processes)
+
+    Returns:
+        transformed data, same as pipeline.transform
+    """
+
+    def __init__(self, pipeline, n_jobs=-1, n_blocks=None, backend='loky'):
+        self.pipeline = pipeline
+        self.n_jobs = n_jobs
+        self.n_blocks = n_blocks
+        self.backend = backend
+
+    def fit(self, X, y=None):
+        self.pipeline.fit(X, y)
+        return self
+
+    def transform(self, X):
+        return parallel_transform(self.pipeline, X, n_jobs=self.n_jobs, n_blocks=self.n_blocks, backend=self.backend)
@@ -0,0 +1,87 @@
+import numpy as np
+from sklearn.pipeline import Pipeline
+from sklearn.utils.validation import check_is_fitted
+
+
+def is_missing(value):
+    """ True for None and NaN (record mode counterpart of pd.isnull) """
+    return value is None or value != value
+
+
+def missing_columns(record, columns):
+    """ Columns (of a list) that a record does not include, for the KeyError messages of record mode """
+    return [col for col in columns if col not in record]
+
+
+def _steps(pipelines):
+    for pipeline in pipelines:
+        if isinstance(pipeline, Pipeline):
+            for step in _steps([step for _, step in pipeline.steps]):
+                yield step
+        else:
+            yield pipeline
+
+
+class RecordPipeline(object):
+    """ Compiled record mode of fitted pipelines, to score one record (or a few) with low latency
+
+    Each step is compiled once (_compile_record) into a function on a dict column -> value, which uses the
+    lookup tables of the fitted transformer, so that a record goes through the pipelines without building
+    any DataFrame. The output has a fixed layout: the columns of pipeline.transform on a DataFrame, as
+    float64. The values are the same as the ones of the DataFrame transform.
+
+    The last step gives the layout: MyDummyFeatures builds the row itself (always dense), otherwise the
+    columns are taken from get_feature_names_out of the last step or from columns.
+
+    Args:
+        *pipelines: fitted pipelines (or transformers), applied in order
+        input_columns (List): column names of the input rows, to score NumPy rows (or sequences) instead of dicts
+        columns (List): output columns, if the last step does not give them
+
+    Example:
+        scorer = RecordPipeline(preprocessing, feature_creation)
+        row = scorer.transform_record({'LotArea': 8450, ...})
+    """
+
+    def __init__(self, *pipelines, input_columns=None, columns=None):
+        self.steps = list(_steps(pipelines))
+        self.input_columns = None if input_columns is None else list(input_columns)
+
+        self._functions = []
+        for step in self.steps:
+            if not hasattr(step, '_compile_record'):
+                raise TypeError('[RecordPipeline] %s has no record mode' % type(step).__name__)
+            check_is_fitted(step)
+            self._functions.append(step._compile_record())
+
+        if columns is None and hasattr(self.steps[-1], 'get_feature_names_out'):
+            columns = self.steps[-1].get_feature_names_out()
+        self.columns = None if columns is None else list(columns)
+
+    def transform_record(self, record):
+        """ Transforms one record (dict column -> value, or row of values of input_columns)
+
+        Returns:
+            np.ndarray: transformed row (float64)
+        """
+        if isinstance(record, dict):
+            record = dict(record)
+        else:
+            record = dict(zip(self.input_columns, record))
+
+        for function in self._functions:
+            record = function(record)
+
+        if isinstance(record, np.ndarray):
+            return record
+        if self.columns is None:
+            raise ValueError('[RecordPipeline] output columns are unknown, pass columns')
+        return np.array([record[col] for col in self.columns], dtype=np.float64)
+
+    def transform_records(self, records):
+        """ Transforms a micro-batch of records (list of dicts, or 2D array of rows of input_columns)
+
+        Returns:
+            np.ndarray: transformed rows (n_records x n_columns, float64)
+        """
+        return np.vstack([self.transform_record(record) for record in records])
@@ -0,0 +1,27 @@
+import numpy as np
+
+# dtypes of the columns of data/train.csv and data/test.csv (no SalePrice), for pd.read_csv and
+# custom_transformers.columns.read_csv. The columns with missing values in test.csv only (basement and garage
+# areas and counts) are float64 in both files, so that the train and test frames have the same dtypes
+DTYPES = {
+    'Id': np.int64, 'MSSubClass': np.int64, 'MSZoning': object, 'LotFrontage': np.float64, 'LotArea': np.int64,
+    'Street': object, 'Alley': object, 'LotShape': object, 'LandContour': object, 'Utilities': object,
+    'LotConfig': object, 'LandSlope': object, 'Neighborhood': object, 'Condition1': object,
+    'Condition2': object, 'BldgType': object, 'HouseStyle': object, 'OverallQual': np.int64,
+    'OverallCond': np.int64, 'YearBuilt': np.int64, 'YearRemodAdd': np.int64, 'RoofStyle': object,
+    'RoofMatl': object, 'Exterior1st': object, 'Exterior2nd': object, 'MasVnrType': object,
+    'MasVnrArea': np.float64, 'ExterQual': object, 'ExterCond': object, 'Foundation': object,
+    'BsmtQual': object, 'BsmtCond': object, 'BsmtExposure': object, 'BsmtFinType1': object,
+    'BsmtFinSF1': np.float64, 'BsmtFinType2': object, 'BsmtFinSF2': np.float64, 'BsmtUnfSF': np.float64,
+    'TotalBsmtSF': np.float64, 'Heating': object, 'HeatingQC': object, 'CentralAir': object,
+    'Electrical': object, '1stFlrSF': np.int64, '2ndFlrSF': np.int64, 'LowQualFinSF': np.int64,
+    'GrLivArea': np.int64, 'BsmtFullBath': np.float64, 'BsmtHalfBath': np.float64, 'FullBath': np.int64,
+    'HalfBath': np.int64, 'BedroomAbvGr': np.int64, 'KitchenAbvGr': np.int64, 'KitchenQual': object,
+    'TotRmsAbvGrd': np.int64, 'Functional': object, 'Fireplaces': np.int64, 'FireplaceQu': object,
+    'GarageType': object, 'GarageYrBlt': np.float64, 'GarageFinish': object, 'GarageCars': np.float64,
+    'GarageArea': np.float64, 'GarageQual': object, 'GarageCond': object, 'PavedDrive': object,
+    'WoodDeckSF': np.int64, 'OpenPorchSF': np.int64, 'EnclosedPorch': np.int64, '3SsnPorch': np.int64,
+    'ScreenPorch': np.int64, 'PoolArea': np.int64, 'PoolQC': object, 'Fence': object, 'MiscFeature': object,
+    'MiscVal': np.int64, 'MoSold': np.int64, 'YrSold': np.int64, 'SaleType': object, 'SaleCondition': object,
+    'SalePrice': np.int64
+}
@@ -0,0 +1,136 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.exceptions import NotFittedError
+from sklearn.pipeline import Pipeline
+from sklearn.utils.validation import check_is_fitted
+
+from custom_transformers import DTYPES, MyBinaryEncoder, MyLog1pTransformer, RecordPipeline
+from custom_transformers import MyDummyFeatures, MyOtherOrdinalEncoder, MyQualityEncoder
+from custom_transformers import load_pipeline, read_csv, save_pipeline
+from custom_transformers.parallel import parallel_transform
+
+
+@pytest.fixture(scope='module')
+def train(synthetic):
+    return pd.read_csv(synthetic.DATA_PATH, dtype=DTYPES)
+
+
+def make_pipeline(pipelines, copy=True):
+    return Pipeline([('cleaning', pipelines.make_preprocessing(copy)),
+                     ('features', pipelines.make_feature_creation(copy))])
+
+
+@pytest.fixture(scope='module')
+def fitted(train, pipelines):
+    return make_pipeline(pipelines).fit(train.drop(columns='SalePrice'))
+
+
+def test_parallel_transform_equals_serial(fitted, synthetic):
+    data = synthetic.make_houses(3000)
+    expected = fitted.transform(data)
+
+    # small blocks: each block sees only part of the levels
+    result = parallel_transform(fitted, data, n_jobs=2, n_blocks=40, backend='threading')
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_artifacts_round_trip(fitted, synthetic, tmp_path):
+    data = synthetic.make_houses(500)
+    save_pipeline(fitted, str(tmp_path / 'pipeline'))
+
+    pd.testing.assert_frame_equal(load_pipeline(str(tmp_path / 'pipeline')).transform(data), fitted.transform(data))
+
+
+def test_record_mode_equals_frame_transform(fitted, synthetic):
+    data = synthetic.make_houses(200)
+    expected = fitted.transform(data)
+    scorer = RecordPipeline(fitted)
+
+    assert list(scorer.columns) == list(expected.columns)
+    np.testing.assert_allclose(scorer.transform_records(data.to_dict('records')),
+                               expected.to_numpy(dtype=np.float64), rtol=1e-12)
+
+
+def test_encoders_give_numeric_columns(train, pipelines):
+    result = pipelines.make_preprocessing().fit_transform(train.drop(columns='SalePrice'))
+
+    for col in pipelines.cols_enc_quality + pipelines.cols_enc_ordinal:
+        assert pd.api.types.is_numeric_dtype(result[col]), col
+
+
+def test_dummy_features_string_columns_and_csr():
+    X = pd.DataFrame({'level': pd.array(['a', 'b', None, 'b'], dtype='string'), 'value': [1.0, 2.0, 3.0, 4.0]})
+
+    result = MyDummyFeatures().fit_transform(X)
+    assert list(result.columns) == ['value', 'level_b']
+    assert list(result.level_b) == [0, 1, 0, 1]
+    np.testing.assert_array_equal(MyDummyFeatures(output='csr').fit_transform(X).toarray(),
+                                  result.to_numpy(dtype=np.float64))
+
+    # name is neither numeric nor dummified
+    with pytest.raises(ValueError):
+        MyDummyFeatures(columns=['level'], output='csr').fit_transform(X.assign(name=['w', 'x', 'y', 'z']))
+
+
+def test_log1p_fit_by_chunks_and_merge(train, pipelines):
+    X = pipelines.make_arithmetic_features().fit_transform(
+        pipelines.make_preprocessing().fit_transform(train.drop(columns='SalePrice')))
+    expected = MyLog1pTransformer().fit(X)
+
+    chunked = MyLog1pTransformer()
+    merged = MyLog1pTransformer()
+    for rows in np.array_split(np.arange(len(X)), 4):
+        chunked.partial_fit(X.iloc[rows])
+        merged.merge(MyLog1pTransformer().fit(X.iloc[rows]))
+    for transformer in [chunked, merged]:
+        assert transformer.skewed_cols == expected.skewed_cols
+        pd.testing.assert_frame_equal(transformer.transform(X), expected.transform(X))
+
+    # fitted state only: __init__ keeps the parameters
+    assert not hasattr(MyLog1pTransformer(), 'moments_')
+    assert list(expected.moments_.columns) == list(chunked.moments_.columns)
+
+    # with columns given there are no moments: nothing to merge
+    columns = MyLog1pTransformer(columns=['LotArea']).fit(X)
+    assert not hasattr(columns, 'moments_')
+    assert MyLog1pTransformer(columns=['LotArea']).merge(columns).skewed_cols == ['LotArea']
+    with pytest.raises(ValueError):
+        MyLog1pTransformer().merge(columns)
+
+
+@pytest.mark.parametrize('transformer', [MyLog1pTransformer(), MyQualityEncoder(['ExterQual']),
+                                         MyOtherOrdinalEncoder(['BsmtExposure']), MyDummyFeatures()])
+def test_transform_before_fit_raises(train, transformer):
+    with pytest.raises(NotFittedError):
+        transformer.transform(train)
+    with pytest.raises(NotFittedError):
+        RecordPipeline(transformer)
+
+    # the transformers without fitted state are fitted
+    check_is_fitted(MyBinaryEncoder())
+
+
+@pytest.mark.parametrize('copy', [True, False])
+@pytest.mark.parametrize('features', ['make_feature_creation', 'make_feature_selection'])
+def test_planned_read_equals_full_read(train, pipelines, synthetic, features, copy):
+    def make(copy):
+        return Pipeline([('cleaning', pipelines.make_preprocessing(copy)),
+                         ('features', getattr(pipelines, features)(copy))]).set_params(
+            cleaning__drop_cols__errors='ignore')
+
+    planned = read_csv(synthetic.DATA_PATH, make(copy), dtype=DTYPES, keep=['SalePrice'])
+    assert planned.shape[1] < train.shape[1]
+
+    expected = make(copy).fit_transform(train.drop(columns='SalePrice'), np.log(train.SalePrice))
+    result = make(copy).fit_transform(planned.drop(columns='SalePrice'), np.log(planned.SalePrice))
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_test_file_is_planned(pipelines, synthetic):
+    path = os.path.join(os.path.dirname(synthetic.DATA_PATH), 'test.csv')
+    test = read_csv(path, make_pipeline(pipelines).set_params(cleaning__drop_cols__errors='ignore'), dtype=DTYPES)
+
+    assert 'SalePrice' not in test.columns
@@ -0,0 +1,83 @@
+""" Benchmark of OurAdvancedImputer fit / transform
+
+Compares the groupby fit and null-mask Series.map fill with the former per-cluster mask loop and
+row-wise DataFrame.apply, checks that both produce identical output and that partial_fit over
+chunks gives the same table as a single fit.
+
+Usage (from the assignment folder):
+    python benchmarks/bench_advanced_imputer.py --rows 1000000 --chunks 10
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_transformers import OurAdvancedImputer
+from synthetic import make_waterpoints
+
+
+def loop_fit(X):
+    """ Former per-cluster implementation of the fit, kept as the reference """
+    cluster_population = {}
+    X.loc[X.population.isin([0,1]), 'population'] = np.nan
+    for cluster in X.cluster.unique():
+        population_mean = X.loc[X.cluster==cluster, 'population'].mean()
+        if np.isnan(population_mean):
+            cluster_population[cluster] = 0
+        else:
+            cluster_population[cluster] = population_mean
+    return cluster_population
+
+
+def apply_transform(cluster_population, X):
+    """ Former row-wise implementation of the transform, kept as the reference """
+    X.loc[X.population.isin([0,1]), 'population'] = np.nan
+    X.loc[X.population.isnull(),'population'] = X.apply(lambda row: cluster_population.get(row.cluster), axis=1)
+    return X
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--clusters', type=int, default=50)
+    parser.add_argument('--chunks', type=int, default=10)
+    args = parser.parse_args()
+
+    data = make_waterpoints(args.rows)
+    data['cluster'] = np.random.RandomState(0).randint(args.clusters, size=args.rows).astype('str')
+
+    expected_table, loop_fit_time = timed(loop_fit, data.copy())
+    imputer, groupby_fit_time = timed(OurAdvancedImputer(population_bucket=False).fit, data)
+    pd.testing.assert_series_equal(pd.Series(imputer.cluster_population).sort_index(),
+                                   pd.Series(expected_table).sort_index())
+
+    chunked = OurAdvancedImputer(population_bucket=False)
+    for chunk in np.array_split(np.arange(args.rows), args.chunks):
+        chunked.partial_fit(data.iloc[chunk])
+    pd.testing.assert_series_equal(pd.Series(chunked.cluster_population).sort_index(),
+                                   pd.Series(imputer.cluster_population).sort_index())
+
+    expected, apply_time = timed(apply_transform, expected_table, data.copy())
+    result, map_time = timed(imputer.transform, data.copy())
+    pd.testing.assert_frame_equal(result, expected)
+
+    print('rows: %d, clusters: %d' % (args.rows, args.clusters))
+    print('fit       loop: %8.3f s   groupby: %8.3f s   speedup: %6.1fx'
+          % (loop_fit_time, groupby_fit_time, loop_fit_time / groupby_fit_time))
+    print('transform apply: %6.3f s   map:     %8.3f s   speedup: %6.1fx'
+          % (apply_time, map_time, apply_time / map_time))
+
+
+if __name__ == '__main__':
+    main()
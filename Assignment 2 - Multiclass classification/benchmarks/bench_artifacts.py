@@ -0,0 +1,117 @@
+""" Benchmark of the pipeline artifacts (save_pipeline / load_pipeline) against a pickled Pipeline
+
+Fits the waterpoint pipeline (with NeighborhoodFeatures, whose fitted state grows with the training
+data) and saves it as a pickle and as an artifact directory. Each one is then loaded by a fresh worker
+process, which reports the load time and its increase of anonymous memory (not shared with other
+processes) after load and after transforming a batch. Linux only (/proc/self/smaps_rollup).
+The outputs of both workers are checked against the fitted pipeline.
+
+Usage (from the assignment folder):
+    python benchmarks/bench_artifacts.py --rows 1000000 --batch 1000
+"""
+import argparse
+import json
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_transformers import NeighborhoodFeatures, save_pipeline, load_pipeline
+from pipelines import make_transformation
+from synthetic import make_waterpoints
+
+
+def anonymous_mb():
+    """ Anonymous memory of the process (Linux), i.e. memory that is not shared with other processes through
+    the page cache, unlike memory mapped files """
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            if line.startswith('Anonymous:'):
+                return int(line.split()[1]) / 1024
+
+
+def worker(kind, path, batch_path, output_path):
+    """ Loads the pipeline, transforms the batch and prints the timings and memory as JSON """
+    batch = pd.read_pickle(batch_path)
+    memory = anonymous_mb()
+
+    start = time.perf_counter()
+    if kind == 'pickle':
+        with open(path, 'rb') as f:
+            pipeline = pickle.load(f)
+    else:
+        pipeline = load_pipeline(path)
+    load_time = time.perf_counter() - start
+    load_memory = anonymous_mb() - memory
+
+    start = time.perf_counter()
+    pipeline.transform(batch).to_pickle(output_path)
+    transform_time = time.perf_counter() - start
+
+    print(json.dumps({'load': load_time, 'load_mb': load_memory, 'transform': transform_time,
+                      'transform_mb': anonymous_mb() - memory}))
+
+
+def directory_mb(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path) / 2**20
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)) / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--batch', type=int, default=1000)
+    parser.add_argument('--worker', nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        return worker(*args.worker)
+
+    data = make_waterpoints(args.rows + args.batch)
+    y = np.where(np.random.RandomState(289).rand(len(data)) < 0.55, 'functional', 'non functional')
+    train, batch = data.iloc[:args.rows], data.iloc[args.rows:]
+
+    steps = make_transformation().steps
+    pipeline = Pipeline(steps[:-1] + [('neighborhood', NeighborhoodFeatures())] + steps[-1:])
+    pipeline.fit(train, y[:args.rows])
+    expected = pipeline.transform(batch)
+    print('rows: %d, batch: %d' % (args.rows, args.batch))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = {'pickle': os.path.join(tmp_dir, 'pipeline.pkl'), 'artifacts': os.path.join(tmp_dir, 'pipeline')}
+        batch_path = os.path.join(tmp_dir, 'batch.pkl')
+        batch.to_pickle(batch_path)
+
+        start = time.perf_counter()
+        with open(paths['pickle'], 'wb') as f:
+            pickle.dump(pipeline, f, protocol=pickle.HIGHEST_PROTOCOL)
+        save_times = {'pickle': time.perf_counter() - start}
+        start = time.perf_counter()
+        save_pipeline(pipeline, paths['artifacts'])
+        save_times['artifacts'] = time.perf_counter() - start
+
+        print('%-10s %8s %8s %8s %10s %10s %12s' % ('', 'size MB', 'save s', 'load s', 'load MB', 'transform s',
+                                                    'transform MB'))
+        for kind, path in paths.items():
+            output_path = os.path.join(tmp_dir, kind + '_output.pkl')
+            result = subprocess.run([sys.executable, '-W', 'ignore', os.path.abspath(__file__), '--worker', kind,
+                                     path, batch_path, output_path], check=True, capture_output=True, text=True)
+            stats = json.loads(result.stdout.strip().splitlines()[-1])
+            pd.testing.assert_frame_equal(pd.read_pickle(output_path), expected)
+
+            print('%-10s %8.1f %8.2f %8.3f %10.1f %10.3f %12.1f' % (kind, directory_mb(path), save_times[kind],
+                                                                   stats['load'], stats['load_mb'],
+                                                                   stats['transform'], stats['transform_mb']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+""" Benchmark of TransformerCache on a grid search over the transformation pipeline of the notebook
+
+Runs the same GridSearchCV (n_clusters of GeoClustering x max_depth of a decision tree, --cv folds) over the
+transformation pipeline (with the meaningless_features step) followed by an ordinal encoding and the tree:
+without cache, with cached steps (cache_pipeline) and an empty cache, and a second time with the filled
+cache, as a repeated search would. Checks that the three give the same cross-validation scores, and
+reports the times and the size of the cache.
+
+Usage (from the assignment folder):
+    python benchmarks/bench_cache.py --rows 59400 --cv 5
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+from sklearn.compose import make_column_selector, make_column_transformer
+from sklearn.model_selection import GridSearchCV
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OrdinalEncoder
+from sklearn.tree import DecisionTreeClassifier
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_transformers import TransformerCache, cache_pipeline
+from pipelines import make_transformation
+from synthetic import make_waterpoints, make_labels
+
+
+def make_model(transformation):
+    encoder = make_column_transformer(
+        (OrdinalEncoder(handle_unknown='use_encoded_value', unknown_value=-1, encoded_missing_value=-1),
+         make_column_selector(dtype_include=['object', 'category'])),
+        remainder='passthrough')
+    return Pipeline([('transformation', transformation), ('encoder', encoder),
+                     ('model', DecisionTreeClassifier(random_state=0))])
+
+
+def search(model, param_grid, X, y, cv):
+    start = time.perf_counter()
+    grid = GridSearchCV(model, param_grid, cv=cv).fit(X, y)
+    return grid.cv_results_['mean_test_score'], time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=59400)
+    parser.add_argument('--cv', type=int, default=5)
+    parser.add_argument('--max-bytes', default='2G', help='size of the cache')
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+
+    X = make_waterpoints(args.rows, full_schema=True)
+    y = make_labels(args.rows)
+    param_grid = {'n_clusters': [30, 50], 'max_depth': [6, 10, 14]}
+
+    plain_grid = {'transformation__geo_clusters__n_clusters': param_grid['n_clusters'],
+                  'model__max_depth': param_grid['max_depth']}
+    expected, plain_time = search(make_model(make_transformation(meaningless_features=True)), plain_grid, X, y,
+                                  args.cv)
+
+    directory = tempfile.mkdtemp()
+    try:
+        cache = TransformerCache(directory, max_bytes=args.max_bytes)
+        cached_grid = {'transformation__geo_clusters__transformer__n_clusters': param_grid['n_clusters'],
+                       'model__max_depth': param_grid['max_depth']}
+        times = []
+        for _ in range(2):
+            model = make_model(cache_pipeline(make_transformation(meaningless_features=True), cache))
+            scores, seconds = search(model, cached_grid, X, y, args.cv)
+            np.testing.assert_array_equal(scores, expected)
+            times.append(seconds)
+        info = cache.info()
+    finally:
+        shutil.rmtree(directory)
+
+    print('%d rows, %d candidates x %d folds, same scores with and without cache' % (
+        args.rows, len(param_grid['n_clusters']) * len(param_grid['max_depth']), args.cv))
+    print('%-32s %10s' % ('', 'seconds'))
+    for label, seconds in [('no cache', plain_time), ('cache, empty', times[0]), ('cache, filled', times[1])]:
+        print('%-32s %10.2f' % (label, seconds))
+    print('cache: %d entries, %.1f MB' % (info['entries'], info['bytes'] / 2**20))
+
+
+if __name__ == '__main__':
+    main()
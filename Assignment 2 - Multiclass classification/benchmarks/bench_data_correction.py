@@ -0,0 +1,76 @@
+""" Benchmark of the installer / funder normalization in DataCorrection.transform
+
+Compares the current normalization of unique values with the former row-wise DataFrame.apply
+implementation, checks that both produce identical output and reports the speedup.
+data/train.csv (the training set values) is replicated to --rows rows if present, otherwise
+synthetic waterpoints are used.
+
+Usage (from the assignment folder):
+    python benchmarks/bench_data_correction.py --rows 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ASSIGNMENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRAIN_PATH = os.path.join(ASSIGNMENT_DIR, 'data', 'train.csv')
+
+sys.path.insert(0, ASSIGNMENT_DIR)
+
+from custom_transformers import DataCorrection
+from synthetic import make_waterpoints
+
+
+def apply_transform(X):
+    """ Former row-wise implementation, kept as the reference """
+    gov_installer = X.installer.str.lower().str.slice(stop=5).isin(['gover', 'centr','tanza', 'cetra'])
+    X.loc[gov_installer, 'installer'] = 'government'
+    X.loc[:, 'installer'] = X.apply(lambda row: row.installer.lower()[:4], axis=1)
+    funder_installer = X.funder.str.lower().str.slice(stop=5).isin(['gover', 'centr','tanza', 'cetra'])
+    X.loc[funder_installer, 'funder'] = 'government'
+    X.loc[:, 'funder'] = X.apply(lambda row: row.funder.lower()[:4], axis=1)
+    return X
+
+
+def load_data(n_rows):
+    if not os.path.exists(TRAIN_PATH):
+        data = make_waterpoints(n_rows)
+    else:
+        train = pd.read_csv(TRAIN_PATH)
+        data = train.iloc[np.arange(n_rows) % len(train)].reset_index(drop=True)
+    # as after OurSimpleImputer, which runs before DataCorrection
+    return data.loc[:, ['installer', 'funder']].fillna('unknown')
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    args = parser.parse_args()
+
+    data = load_data(args.rows)
+    correction = DataCorrection(installer=True, funder=True)
+
+    expected, apply_time = timed(apply_transform, data.copy())
+    result, unique_time = timed(correction.transform, data)
+    pd.testing.assert_frame_equal(result, expected)
+
+    print('rows: %d (%s), distinct installers: %d, funders: %d'
+          % (args.rows, 'train.csv' if os.path.exists(TRAIN_PATH) else 'synthetic',
+             data.installer.nunique(), data.funder.nunique()))
+    print('DataFrame.apply: %8.3f s' % apply_time)
+    print('unique values:   %8.3f s' % unique_time)
+    print('speedup:         %8.1fx' % (apply_time / unique_time))
+
+
+if __name__ == '__main__':
+    main()
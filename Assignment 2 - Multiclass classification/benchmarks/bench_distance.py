@@ -0,0 +1,75 @@
+""" Benchmark of Distance with the default landmarks and with a large landmark table
+
+1. Dodoma and Dar es Salaam (default): compares with the former pandas implementation (identical output).
+2. --landmarks random landmarks, haversine: distances to all landmarks, and nearest landmark(s) with the
+   brute-force kernel and with the BallTree (same output).
+
+Usage (from the assignment folder):
+    python benchmarks/bench_distance.py --rows 1000000 --landmarks 300
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_transformers import Distance
+from synthetic import make_waterpoints
+
+
+def pandas_transform(X):
+    """ Former implementation (manhattan distance to Dodoma and Dar es Salaam), kept as the reference """
+    dodoma = (-6.1630, 35.7516)
+    salaam = (-6.7924, 39.2083)
+    X.loc[:, 'distance_to_Dodoma'] = np.abs(X.loc[:,'longitude'] - dodoma[1]) + np.abs(X.loc[:, 'latitude'] - dodoma[0])
+    X.loc[:, 'distance_to_Salaam'] = np.abs(X.loc[:,'longitude'] - salaam[1]) + np.abs(X.loc[:, 'latitude'] - salaam[0])
+    return X
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--landmarks', type=int, default=300)
+    parser.add_argument('--nearest', type=int, default=3)
+    args = parser.parse_args()
+
+    data = make_waterpoints(args.rows).loc[:, ['longitude', 'latitude']]
+    print('rows: %d' % args.rows)
+
+    expected, pandas_time = timed(pandas_transform, data.copy())
+    result, numpy_time = timed(Distance(copy=False).fit(data).transform, data.copy())
+    pd.testing.assert_frame_equal(result, expected)
+    print('Dodoma + Salaam (manhattan)   pandas: %7.3f s  blocks: %7.3f s' % (pandas_time, numpy_time))
+
+    rng = np.random.RandomState(289)
+    landmarks = pd.DataFrame({'latitude': rng.uniform(-11.5, -1.0, args.landmarks),
+                              'longitude': rng.uniform(29.5, 40.0, args.landmarks)},
+                             index=['landmark %d' % i for i in range(args.landmarks)])
+    print('%d landmarks (haversine)' % args.landmarks)
+
+    distance = Distance(strategy='haversine', landmarks=landmarks, copy=False).fit(data)
+    _, elapsed = timed(distance.transform, data.copy())
+    print('  all distances               %7.3f s' % elapsed)
+
+    outputs = {}
+    for algorithm in ['brute', 'ball_tree']:
+        distance = Distance(strategy='haversine', landmarks=landmarks, output='nearest', n_nearest=args.nearest,
+                            algorithm=algorithm, copy=False).fit(data)
+        outputs[algorithm], elapsed = timed(distance.transform, data.copy())
+        print('  %d nearest, %-10s       %7.3f s' % (args.nearest, algorithm, elapsed))
+
+    pd.testing.assert_frame_equal(outputs['brute'], outputs['ball_tree'], check_exact=False)
+
+
+if __name__ == '__main__':
+    main()
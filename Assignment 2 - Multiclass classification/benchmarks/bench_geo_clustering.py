@@ -0,0 +1,86 @@
+""" Benchmark of GeoClustering: KMeans, MiniBatchKMeans and warm start from saved centroids
+
+Times fit with full KMeans, fit with MiniBatchKMeans, and a weekly-refit scenario: partial_fit over
+coordinate chunks warm started from the centroids saved by the full fit. Reports how close the clusters
+are to the ones of the full fit (adjusted Rand index, and share of identical labels for the warm start,
+which keeps the numbering), the time of the nearest-centroid assignment against KMeans.predict and a KD-tree,
+and the memory of the categorical labels against the former string labels.
+
+Usage (from the assignment folder):
+    python benchmarks/bench_geo_clustering.py --rows 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from scipy.spatial import cKDTree
+from sklearn.metrics import adjusted_rand_score
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_transformers import GeoClustering, OurSimpleImputer
+from custom_transformers.geo_clustering import _nearest_centroid
+from synthetic import make_waterpoints
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def partial_fit_chunks(clustering, X, chunksize):
+    for start in range(0, len(X), chunksize):
+        clustering.partial_fit(X.iloc[start:start + chunksize])
+    return clustering
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--chunksize', type=int, default=100000)
+    args = parser.parse_args()
+
+    data = OurSimpleImputer(categorical=False).fit_transform(make_waterpoints(args.rows))
+    data = data.loc[:, ['longitude', 'latitude']]
+    print('rows: %d' % args.rows)
+
+    full, fit_time = timed(GeoClustering(copy=False).fit, data)
+    labels, transform_time = timed(full.transform, data.copy())
+    labels = labels.cluster.cat.codes.to_numpy()
+    print('%-32s fit: %7.2f s' % ('KMeans', fit_time))
+
+    minibatch, fit_time = timed(GeoClustering(minibatch=True).fit, data)
+    rand_index = adjusted_rand_score(labels, minibatch.transform(data).cluster.cat.codes.to_numpy())
+    print('%-32s fit: %7.2f s  adjusted Rand index: %.3f' % ('MiniBatchKMeans', fit_time, rand_index))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'centroids.npy')
+        full.save_centroids(path)
+        warm, fit_time = timed(partial_fit_chunks, GeoClustering(minibatch=True, init_centroids=path), data,
+                               args.chunksize)
+    warm_labels = warm.transform(data).cluster.cat.codes.to_numpy()
+    print('%-32s fit: %7.2f s  adjusted Rand index: %.3f, same label: %5.1f%%'
+          % ('warm start partial_fit', fit_time, adjusted_rand_score(labels, warm_labels),
+             100 * (warm_labels == labels).mean()))
+
+    scaled = full.scaler_.transform(data.to_numpy(dtype=np.float64))
+    predicted, predict_time = timed(_nearest_centroid, scaled, full.scaled_centers_)
+    kmeans_predicted, kmeans_time = timed(full.kmeans_.predict, scaled)
+    (_, nearest), tree_time = timed(cKDTree(full.scaled_centers_).query, scaled)
+    assert np.array_equal(predicted, labels) and np.array_equal(kmeans_predicted, labels)
+    assert np.array_equal(nearest, labels)
+    print('transform: %.3f s, of which assignment %.3f s (KMeans.predict: %.3f s, KD-tree: %.3f s)'
+          % (transform_time, predict_time, kmeans_time, tree_time))
+
+    str_labels = full.transform(data).cluster.astype(int).astype('str')
+    categorical = full.transform(data).cluster
+    print('labels memory: str %.1f MB, categorical %.1f MB'
+          % (str_labels.memory_usage(deep=True) / 2**20, categorical.memory_usage(deep=True) / 2**20))
+
+
+if __name__ == '__main__':
+    main()
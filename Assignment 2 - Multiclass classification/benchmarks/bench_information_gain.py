@@ -0,0 +1,84 @@
+""" Benchmark of information_gain / InformationGain against information_gain of the notebook
+
+Screens all the columns of synthetic waterpoints (all the columns of data/train.csv, status_group from the
+class frequencies of data/train_labels.csv) with the notebook function (one call per feature, on --notebook-rows
+rows: it takes minutes on high-cardinality columns), with information_gain on 1 and --n-jobs threads, and with
+InformationGain by chunks of --chunk rows. Checks that all give the gains of the notebook. The notebook does
+not handle missing values, so it is run on the columns converted to str (a missing value is then the value
+'nan', as the value of its own of information_gain).
+
+Usage (from the assignment folder):
+    python benchmarks/bench_information_gain.py --rows 1000000 --chunk 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_transformers import InformationGain, information_gain
+from synthetic import make_waterpoints, make_labels
+
+
+def notebook_information_gain(df, feature, target):
+    p_target = df[target].value_counts(normalize=True)
+    H_target = np.nansum(-np.log2(p_target) * p_target)
+
+    p_feature_target = df.groupby(feature)[target].value_counts(normalize=True)
+    p_features = df[feature].value_counts(normalize=True)
+
+    H_feature = 0
+    for value in df[feature].unique():
+        H_value = p_features[value] * np.nansum(-np.log2(p_feature_target[value]) * p_feature_target[value])
+        H_feature += H_value
+
+    return H_target - H_feature
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--notebook-rows', type=int, default=20000)
+    parser.add_argument('--chunk', type=int, default=100000)
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    args = parser.parse_args()
+
+    data = make_waterpoints(args.rows, full_schema=True)
+    data['status_group'] = make_labels(args.rows).values
+    features = data.columns.drop('status_group')
+
+    sample = data.iloc[:args.notebook_rows].astype(str)
+    expected, notebook_time = timed(lambda: pd.Series({feature: notebook_information_gain(sample, feature, 'status_group')
+                                                       for feature in features}))
+    gains = information_gain(data.iloc[:args.notebook_rows])
+    pd.testing.assert_series_equal(gains.sort_index(), expected.sort_index(), check_exact=False, rtol=1e-10)
+
+    reference, serial_time = timed(information_gain, data)
+    threaded, threaded_time = timed(lambda: information_gain(data, n_jobs=args.n_jobs))
+    chunked, chunked_time = timed(lambda: InformationGain().fit(
+        data.iloc[start:start + args.chunk] for start in range(0, len(data), args.chunk)).information_gain())
+    for result in [threaded, chunked]:
+        pd.testing.assert_series_equal(result, reference, check_exact=False, rtol=1e-10)
+
+    print('%d features, gains equal to the notebook (%d rows)' % (len(features), args.notebook_rows))
+    print('%-40s %8s %10s' % ('', 'rows', 'seconds'))
+    print('%-40s %8d %10.3f' % ('notebook, one call per feature', args.notebook_rows, notebook_time))
+    for label, seconds in [('information_gain', serial_time),
+                           ('information_gain, n_jobs=%d' % args.n_jobs, threaded_time),
+                           ('InformationGain, chunks of %d' % args.chunk, chunked_time)]:
+        print('%-40s %8d %10.3f' % (label, args.rows, seconds))
+    print(reference.head(10).to_string())
+
+
+if __name__ == '__main__':
+    main()
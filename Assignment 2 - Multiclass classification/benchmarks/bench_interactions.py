@@ -0,0 +1,75 @@
+""" Benchmark of Interactions: integer-code interactions against the former string concatenation
+
+Times the seven interactions and reports the memory of the new columns (object strings against
+categoricals), and checks that the values are the concatenated strings. Also times the hashed interactions (--hash-features buckets) and a downstream count
+encoding of the new columns.
+
+Usage (from the assignment folder):
+    python benchmarks/bench_interactions.py --rows 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_transformers import Interactions
+from synthetic import make_waterpoints
+
+
+def string_transform(X):
+    """ Former implementation (with the source_extraction_type column fixed), kept as the reference """
+    for feature, (first, second) in Interactions._interactions.items():
+        X.loc[:, feature] = X.loc[:, first] + '_' + X.loc[:, second]
+    return X
+
+
+def count_encode(X, columns):
+    """ Count encoding of the columns, as CountEncoder does """
+    return {col: X[col].map(X[col].value_counts()) for col in columns}
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def memory_mb(X, columns):
+    return X.loc[:, columns].memory_usage(deep=True, index=False).sum() / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--hash-features', type=int, default=64)
+    args = parser.parse_args()
+
+    features = list(Interactions._interactions)
+    data = make_waterpoints(args.rows)
+    print('rows: %d' % args.rows)
+
+    expected, string_time = timed(string_transform, data.copy())
+    interactions, fit_time = timed(Interactions(copy=False).fit, data)
+    result, codes_time = timed(interactions.transform, data.copy())
+    hashed, hash_time = timed(Interactions(n_features=args.hash_features, copy=False).fit(data).transform, data.copy())
+
+    for feature in features:
+        pd.testing.assert_series_equal(result[feature].astype(object), expected[feature])
+        assert hashed[feature].isna().equals(expected[feature].isna())
+
+    _, string_count_time = timed(count_encode, expected, features)
+    _, codes_count_time = timed(count_encode, result, features)
+
+    print('%-22s %9s %12s %12s' % ('', 'time (s)', 'memory (MB)', 'count enc (s)'))
+    print('%-22s %9.3f %12.1f %12.3f' % ('string concat', string_time, memory_mb(expected, features), string_count_time))
+    print('%-22s %9.3f %12.1f %12.3f' % ('integer codes', codes_time, memory_mb(result, features), codes_count_time))
+    print('%-22s %9.3f' % ('fit (categories)', fit_time))
+    print('%-22s %9.3f %12.1f' % ('hashed (%d buckets)' % args.hash_features, hash_time, memory_mb(hashed, features)))
+
+
+if __name__ == '__main__':
+    main()
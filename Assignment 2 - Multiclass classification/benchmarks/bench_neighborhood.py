@@ -0,0 +1,106 @@
+""" Benchmark of NeighborhoodFeatures (k nearest and radius neighborhoods)
+
+Times fit_transform (training data, out-of-fold target) and transform (new data) with 1 and all threads,
+and checks the features of --check-rows rows against a brute-force computation over all waterpoints.
+The target is synthetic and spatially correlated: a waterpoint is 'functional' with a probability that
+depends on its LGA.
+
+Usage (from the assignment folder):
+    python benchmarks/bench_neighborhood.py --rows 1000000 --radius 5
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_transformers import NeighborhoodFeatures
+from custom_transformers.distance import _unit_vectors, _chord_to_km
+from synthetic import make_waterpoints
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def brute_force(neighborhood, fitted, y, query, rows=None):
+    """ Features of the query waterpoints computed from the distances to all fitted waterpoints. rows gives
+    the positions of the query waterpoints among the fitted ones (training data: out-of-fold target) """
+    xyz = _unit_vectors(fitted.latitude.to_numpy(), fitted.longitude.to_numpy())
+    query_xyz = _unit_vectors(query.latitude.to_numpy(), query.longitude.to_numpy())
+    population = fitted.population.mask(fitted.population.isin([0, 1])).to_numpy()
+    target = (y == neighborhood.positive_class).astype(float)
+    folds = np.random.RandomState(neighborhood.random_state).permutation(len(fitted)) % neighborhood.n_folds
+
+    expected = []
+    for i in range(len(query)):
+        distance = _chord_to_km(((xyz - query_xyz[i])**2).sum(axis=1))
+        candidates = np.ones(len(fitted), dtype=bool)
+        if rows is not None:
+            candidates[rows[i]] = False
+        features = {}
+        for name, values in [('population', population), ('target', target)]:
+            allowed = candidates
+            if rows is not None and name == 'target':
+                allowed = candidates & (folds != folds[rows[i]])
+            index = np.flatnonzero(allowed)
+            if neighborhood.radius is None:
+                index = index[np.argsort(distance[index], kind='stable')[:neighborhood.n_neighbors]]
+                if name == 'population':
+                    features['neighbors_distance'] = distance[index].mean()
+            else:
+                index = index[distance[index] <= neighborhood.radius]
+                if name == 'population':
+                    features['neighbors_count'] = float(len(index))
+            known = values[index][~np.isnan(values[index])]
+            features['neighbors_' + name] = known.mean() if len(known) else np.nan
+        expected.append(features)
+
+    return pd.DataFrame(expected, index=query.index)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--neighbors', type=int, default=10)
+    parser.add_argument('--radius', type=float, default=5.0)
+    parser.add_argument('--check-rows', type=int, default=50)
+    args = parser.parse_args()
+
+    # waterpoints with GPS coordinates only (the imputed coordinates are ties of the nearest neighbors)
+    data = make_waterpoints(args.rows).loc[:, ['longitude', 'latitude', 'lga', 'population']]
+    data = data[data.longitude != 0].reset_index(drop=True)
+    rng = np.random.RandomState(289)
+    functional_rate = pd.Series(rng.uniform(0.2, 0.9, data.lga.nunique()), index=data.lga.unique())
+    y = np.where(rng.rand(len(data)) < data.lga.map(functional_rate).to_numpy(), 'functional', 'non functional')
+
+    train = data.iloc[:len(data) // 2]
+    test = data.iloc[len(data) // 2:]
+    y_train = y[:len(train)]
+    check = rng.choice(len(train), size=min(args.check_rows, len(train)), replace=False)
+    print('rows: %d train, %d test' % (len(train), len(test)))
+
+    for label, params in [('%d nearest' % args.neighbors, {'n_neighbors': args.neighbors}),
+                          ('radius %g km' % args.radius, {'radius': args.radius})]:
+        for n_jobs in [1, -1]:
+            neighborhood = NeighborhoodFeatures(n_jobs=n_jobs, **params)
+            train_features, fit_time = timed(neighborhood.fit_transform, train, y_train)
+            test_features, transform_time = timed(neighborhood.transform, test)
+            print('%-14s n_jobs=%2d  fit_transform: %7.2f s  transform: %7.2f s'
+                  % (label, n_jobs, fit_time, transform_time))
+
+        expected = brute_force(neighborhood, train, y_train, train.iloc[check], check)
+        pd.testing.assert_frame_equal(train_features.iloc[check].loc[:, expected.columns], expected)
+        expected = brute_force(neighborhood, train, y_train, test.iloc[check])
+        pd.testing.assert_frame_equal(test_features.iloc[check].loc[:, expected.columns], expected)
+        print('%-14s %d rows checked against brute force' % (label, len(check)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+""" Micro-benchmark of OtherFeatures, one feature at a time
+
+Times each feature of OtherFeatures alone against the former implementation of the feature and checks
+that the outputs are identical, so that a regression in one feature is visible.
+
+Usage (from the assignment folder):
+    python benchmarks/bench_other_features.py --rows 1000000 --repeat 3
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_transformers import OtherFeatures
+from synthetic import make_waterpoints
+
+FEATURES = ['type_wpt_name', 'water_per_capita', 'dry_season', 'num_private', 'age']
+
+
+def former_transform(X, feature):
+    """ Former implementation of each feature, kept as the reference (date_recorded is assigned as a column,
+    X.loc[:, 'date_recorded'] keeps the object dtype from pandas 2) """
+    if feature == 'type_wpt_name':
+        X.loc[:, 'type_wpt_name'] = X.loc[:,'wpt_name'].apply(lambda x: x.split(' ')[0].strip()).replace('Zahanati-Misssion', 'Zahanati')
+
+    if feature == 'water_per_capita':
+        X.loc[:, 'water_per_capita'] = X.loc[:,'amount_tsh'] / (X.loc[:, 'population'] + 1)
+
+    if feature == 'dry_season':
+        X['date_recorded'] = pd.to_datetime(X.date_recorded)
+        X['dry_season'] = X.date_recorded.dt.month
+        X.dry_season = X.dry_season.replace([1,2,3,4,5,6,7,8,9,10,11,12],[1,1,0,0,0,1,1,1,1,1,0,0])
+
+    if feature == 'num_private':
+        X.loc[:, "num_private"] = X.loc[:, 'num_private'].ne(0).astype(int)
+
+    if feature == 'age':
+        X['date_recorded'] = pd.to_datetime(X.date_recorded)
+        X.loc[:, 'age'] = X.loc[:, 'date_recorded'].dt.year - X.loc[:, 'construction_year']
+
+    return X
+
+
+def best_time(func, data, repeat):
+    """ Best time of repeat runs, each on a fresh copy of the data """
+    times = []
+    for _ in range(repeat):
+        X = data.copy()
+        start = time.perf_counter()
+        result = func(X)
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    data = make_waterpoints(args.rows)
+    print('rows: %d' % args.rows)
+    print('%-18s %10s %10s %8s' % ('feature', 'former (s)', 'new (s)', 'speedup'))
+
+    for feature in FEATURES:
+        params = {name: name == feature for name in FEATURES}
+        transformer = OtherFeatures(copy=False, **params)
+
+        expected, former_time = best_time(lambda X: former_transform(X, feature), data, args.repeat)
+        result, new_time = best_time(transformer.transform, data, args.repeat)
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+        print('%-18s %10.3f %10.3f %7.1fx' % (feature, former_time, new_time, former_time / new_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+""" Overhead of InstrumentedPipeline on the transformation pipeline of the notebook
+
+Transforms synthetic waterpoints with the fitted pipeline and with the same pipeline wrapped by
+InstrumentedPipeline (memory=True, the default, and with tracemalloc), runs interleaved so that both see
+the same machine load, and reports the median times. Checks that the outputs are identical and prints
+the summary table of the instrumented runs.
+
+Usage (from the assignment folder):
+    python benchmarks/bench_profiling.py --rows 1000000 --repeat 7
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_transformers import InstrumentedPipeline
+from pipelines import make_transformation
+from synthetic import make_waterpoints
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=7)
+    args = parser.parse_args()
+
+    data = make_waterpoints(args.rows, full_schema=True)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        pipeline = make_transformation(meaningless_features=True).fit(data)
+    versions = [('pipeline', pipeline),
+                ('instrumented', InstrumentedPipeline(pipeline)),
+                ('instrumented, tracemalloc', InstrumentedPipeline(pipeline, trace_memory=True))]
+
+    expected = pipeline.transform(data)
+    times = {label: [] for label, _ in versions}
+    for i in range(args.repeat):
+        # the order changes at each repeat
+        for label, version in versions[i % 3:] + versions[:i % 3]:
+            start = time.perf_counter()
+            result = version.transform(data)
+            times[label].append(time.perf_counter() - start)
+            pd.testing.assert_frame_equal(result, expected)
+
+    print('rows: %d' % args.rows)
+    reference = np.median(times['pipeline'])
+    print('%-28s %12s %10s' % ('', 'median (s)', 'overhead'))
+    for label, _ in versions:
+        print('%-28s %12.3f %9.1f%%' % (label, np.median(times[label]), 100 * (np.median(times[label]) / reference - 1)))
+
+    pd.set_option('display.width', 250)
+    pd.set_option('display.max_columns', 20)
+    print(versions[2][1].summary().loc['transform'])
+
+
+if __name__ == '__main__':
+    main()
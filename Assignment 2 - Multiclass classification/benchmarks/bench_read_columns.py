@@ -0,0 +1,83 @@
+""" Reading only the columns a pipeline needs (custom_transformers.columns.read_csv) against reading the whole file
+
+Writes --rows synthetic waterpoints with all the columns of data/train.csv (population and construction_year as
+integers, as in the file) to a CSV file, then reads it for the transformation pipeline of the notebook (with the
+meaningless_features step): with pd.read_csv (inferred dtypes), with pd.read_csv and DTYPES, and with read_csv
+(usecols planned from the column declarations of the transformers, DTYPES of these columns). Reports the columns
+read, the read time and the memory of the frame, and checks that the pipeline gives the same output from the
+planned read as from the whole file, with copy=True and copy=False, and that the plan is the same through
+cache_pipeline and ParallelTransformer.
+
+Usage (from the assignment folder):
+    python benchmarks/bench_read_columns.py --rows 200000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_transformers import DTYPES, ParallelTransformer, cache_pipeline, read_csv, required_columns
+from pipelines import make_transformation
+from synthetic import COLUMNS, make_waterpoints, make_labels
+
+
+def make_pipeline(copy=None):
+    # the dropped columns are not read
+    return make_transformation(copy, meaningless_features=True).set_params(meaningless_features__errors='ignore',
+                                                                           drop__errors='ignore')
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200000)
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+
+    planned_columns = required_columns(make_pipeline(), COLUMNS)
+    with tempfile.TemporaryDirectory() as directory:
+        for wrapped in [cache_pipeline(make_pipeline(), directory), ParallelTransformer(make_pipeline())]:
+            assert required_columns(wrapped, COLUMNS) == planned_columns
+
+    data = make_waterpoints(args.rows, full_schema=True).loc[:, COLUMNS]
+    data = data.astype({'population': 'int64', 'construction_year': 'int64'})
+    y = make_labels(args.rows)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'train.csv')
+        data.to_csv(path, index=False)
+        del data
+
+        reads = [('pd.read_csv', lambda: pd.read_csv(path)),
+                 ('pd.read_csv, DTYPES', lambda: pd.read_csv(path, dtype=DTYPES)),
+                 ('read_csv, DTYPES', lambda: read_csv(path, make_pipeline(), dtype=DTYPES))]
+        print('%d rows, %d columns' % (args.rows, len(COLUMNS)))
+        print('%-26s %8s %10s %12s' % ('read', 'columns', 'seconds', 'memory (MB)'))
+        frames = {}
+        for label, read in reads:
+            frames[label], seconds = timed(read)
+            print('%-26s %8d %10.2f %12.1f' % (label, frames[label].shape[1], seconds,
+                                               frames[label].memory_usage(deep=True).sum() / 2**20))
+
+        planned = frames['read_csv, DTYPES']
+        assert list(planned.columns) == planned_columns
+        for copy in [True, False]:
+            expected = make_pipeline(copy).fit_transform(frames['pd.read_csv, DTYPES'], y)
+            pd.testing.assert_frame_equal(make_pipeline(copy).fit_transform(planned, y), expected)
+    print('not read: %s' % sorted(set(COLUMNS) - set(planned_columns)))
+    print('same outputs from the planned read as from the whole file (copy=True and copy=False)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+""" Benchmark of the coordinates / construction year lookups in OurSimpleImputer.transform
+
+Compares the current null-mask Series.map implementation with the former row-wise
+DataFrame.apply implementation, checks that both produce identical output and reports the speedup.
+
+Usage (from the assignment folder):
+    python benchmarks/bench_simple_imputer.py --rows 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_transformers import OurSimpleImputer
+from synthetic import make_waterpoints
+
+
+def apply_transform(imputer, X):
+    """ Former row-wise implementation of the lookups, kept as the reference """
+    X.loc[X.longitude==0, ['longitude', 'latitude']] = np.nan
+    X.loc[X.latitude.isnull(),'latitude'] = X.apply(lambda row: imputer.lga_coords.get(row.lga)[0], axis=1)
+    X.loc[X.longitude.isnull(),'longitude'] = X.apply(lambda row: imputer.lga_coords.get(row.lga)[1], axis=1)
+    X.loc[X.construction_year==0, 'construction_year'] = np.nan
+    X.loc[X.construction_year.isnull(),'construction_year'] = X.apply(lambda row: imputer.extraction_dict.get(row.extraction_type), axis=1)
+    return X
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    args = parser.parse_args()
+
+    data = make_waterpoints(args.rows)
+    imputer = OurSimpleImputer(categorical=False).fit(data.copy())
+
+    expected, apply_time = timed(apply_transform, imputer, data.copy())
+    result, map_time = timed(imputer.transform, data.copy())
+    pd.testing.assert_frame_equal(result, expected)
+
+    print('rows: %d' % args.rows)
+    print('DataFrame.apply: %8.3f s' % apply_time)
+    print('Series.map:      %8.3f s' % map_time)
+    print('speedup:         %8.1fx' % (apply_time / map_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+""" Benchmark and correctness check of the chunked streaming transform
+
+Writes a synthetic waterpoint CSV, fits the transformation pipeline of the notebook on its first rows,
+then transforms the whole file in two ways, each in its own process:
+    whole:  pd.read_csv of the whole file, transform, write
+    stream: custom_transformers.streaming.stream_transform with --chunksize rows per chunk
+Both output files are read back and compared (they must be equal), time and peak RSS are reported.
+
+Usage (from the assignment folder):
+    python benchmarks/bench_streaming.py --rows 1000000 --chunksize 100000 --format parquet
+"""
+import argparse
+import json
+import os
+import pickle
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_transformers.streaming import CSVChunkWriter, ParquetChunkWriter, stream_transform
+from pipelines import make_transformation
+from synthetic import make_waterpoints
+
+
+def peak_rss_mb():
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def read_output(path):
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def run(mode, pipeline_path, input_path, output_path, chunksize):
+    with open(pipeline_path, 'rb') as f:
+        pipeline = pickle.load(f)
+
+    start = time.perf_counter()
+    if mode == 'whole':
+        writer = ParquetChunkWriter(output_path) if output_path.endswith('.parquet') else CSVChunkWriter(output_path)
+        with writer:
+            writer.write(pipeline.transform(pd.read_csv(input_path)))
+        rows = writer.rows
+    else:
+        rows = stream_transform(pipeline, input_path, output_path, chunksize=chunksize)
+    elapsed = time.perf_counter() - start
+
+    return {'mode': mode, 'rows': rows, 'seconds': elapsed, 'peak_rss_mb': peak_rss_mb()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--fit-rows', type=int, default=50000)
+    parser.add_argument('--chunksize', type=int, default=100000)
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='parquet')
+    parser.add_argument('--mode', choices=['whole', 'stream'], help=argparse.SUPPRESS)
+    parser.add_argument('--dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        paths = [os.path.join(args.dir, name) for name in ['pipeline.pkl', 'input.csv', args.mode + '.' + args.format]]
+        print(json.dumps(run(args.mode, *paths, chunksize=args.chunksize)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data = make_waterpoints(args.rows)
+        data.to_csv(os.path.join(tmp_dir, 'input.csv'), index=False)
+
+        pipeline = make_transformation().fit(pd.read_csv(os.path.join(tmp_dir, 'input.csv'), nrows=args.fit_rows))
+        with open(os.path.join(tmp_dir, 'pipeline.pkl'), 'wb') as f:
+            pickle.dump(pipeline, f)
+        data = pipeline = None
+
+        print('rows: %d, chunksize: %d, format: %s' % (args.rows, args.chunksize, args.format))
+        for mode in ['whole', 'stream']:
+            output = subprocess.check_output([sys.executable, os.path.abspath(__file__), '--mode', mode,
+                                              '--dir', tmp_dir, '--format', args.format,
+                                              '--chunksize', str(args.chunksize)])
+            stats = json.loads(output.decode().strip().splitlines()[-1])
+            print('%-6s  time: %7.2f s  peak RSS: %8.1f MB' % (mode, stats['seconds'], stats['peak_rss_mb']))
+
+        expected = read_output(os.path.join(tmp_dir, 'whole.' + args.format))
+        result = read_output(os.path.join(tmp_dir, 'stream.' + args.format))
+        pd.testing.assert_frame_equal(result, expected)
+        print('chunked output equals whole-frame output')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,266 @@
+""" Benchmark harness of the custom_transformers suites (benchmarks/suite.py of each assignment)
+
+A suite is a function (n_rows) -> iterable of Case. Each case is timed (best and mean of repeat runs, each
+after an untimed setup) and, in a last run, its peak memory is traced with tracemalloc: the peak of the
+memory allocated by the case (NumPy and pandas buffers included) above what was allocated before it.
+
+Results are stored as JSON (machine, library versions, git commit and one entry per case and size) so that
+a run can be compared with a former one: cases slower or using more memory than the baseline by more
+than the threshold are reported as regressions, and the exit status is 1.
+"""
+import argparse
+import datetime
+import gc
+import glob
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.base import clone
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+# times below this are mostly noise, they are compared as if they took this long
+MIN_SECONDS = 0.01
+
+
+class Case(object):
+    """ One benchmark case
+
+    Args:
+        name (str): name of the case, e.g. 'preprocessing.imputer.transform'
+        run (callable): function timed, called with the result of setup
+        setup (callable): untimed function run before each call of run, returns the arguments (tuple) of run
+    """
+
+    def __init__(self, name, run, setup=None):
+        self.name = name
+        self.run = run
+        self.setup = setup
+
+    def call(self):
+        args = self.setup() if self.setup is not None else ()
+        start = time.perf_counter()
+        self.run(*args)
+        return time.perf_counter() - start
+
+    def peak_memory(self):
+        """ Peak memory (MB) allocated by run above the memory allocated before it """
+        args = self.setup() if self.setup is not None else ()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            start, _ = tracemalloc.get_traced_memory()
+            self.run(*args)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return (peak - start) / 2**20
+
+
+def _setup(X, step):
+    # transformers that work in place get a fresh copy of their input at each run (untimed)
+    if getattr(step, 'copy', True) is False:
+        return lambda: (X.copy(),)
+    return lambda: (X,)
+
+
+def pipeline_cases(name, pipeline, X, y=None):
+    """ Cases of a pipeline: fit and transform of each step, on the output of the steps before it, then fit and
+    transform of the whole pipeline
+
+    Args:
+        name (str): prefix of the case names
+        pipeline (sklearn.pipeline.Pipeline): pipeline, not fitted
+        X (pd.DataFrame): input data
+        y: target, passed to fit
+    """
+    data = X
+    for step_name, step in pipeline.steps:
+        fitted = clone(step).fit(X, y)
+        yield Case('%s.%s.fit' % (name, step_name), lambda X, step=step: clone(step).fit(X, y), _setup(X, step))
+        yield Case('%s.%s.transform' % (name, step_name), fitted.transform, _setup(X, step))
+        X = fitted.transform(X)
+
+    # the steps of a pipeline work on the output of the first one, which copies its input unless copy=False
+    first = pipeline.steps[0][1]
+    fitted = clone(pipeline).fit(_setup(data, first)()[0], y)
+    yield Case('%s.fit' % name, lambda X: clone(pipeline).fit(X, y), _setup(data, first))
+    yield Case('%s.transform' % name, fitted.transform, _setup(data, first))
+
+
+def parse_size(size):
+    """ '10k' -> 10000, '1M' -> 1000000, '500' -> 500 """
+    match = re.match(r'^(\d+(?:\.\d+)?)([kKmM]?)$', size.strip())
+    if match is None:
+        raise ValueError('[Benchmarks] invalid size: %s' % size)
+    factor = {'': 1, 'k': 10**3, 'm': 10**6}[match.group(2).lower()]
+    return int(float(match.group(1)) * factor)
+
+
+def format_size(n_rows):
+    for factor, suffix in [(10**6, 'M'), (10**3, 'k')]:
+        if n_rows >= factor and n_rows % factor == 0:
+            return '%d%s' % (n_rows // factor, suffix)
+    return str(n_rows)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(RESULTS_DIR),
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata():
+    return {
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'machine': platform.node(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'libraries': {'numpy': np.__version__, 'pandas': pd.__version__, 'sklearn': sklearn.__version__},
+    }
+
+
+def run_suite(suite, sizes, repeat=3, pattern=None, memory=True):
+    """ Runs the cases of a suite for each size
+
+    Args:
+        suite (callable): function (n_rows) -> iterable of Case
+        sizes (List[int]): numbers of rows
+        repeat (int): number of timed runs of each case
+        pattern (str): regular expression, only the cases whose name matches are run
+        memory (bool): True (default) to trace the peak memory of each case (one more run)
+
+    Returns:
+        List[dict]: one result per case and size
+    """
+    results = []
+    for n_rows in sizes:
+        for case in suite(n_rows):
+            if pattern and not re.search(pattern, case.name):
+                continue
+            times = [case.call() for _ in range(repeat)]
+            result = {'case': case.name, 'rows': n_rows, 'seconds': min(times), 'mean_seconds': float(np.mean(times)),
+                      'peak_mb': case.peak_memory() if memory else None}
+            results.append(result)
+            print_result(result)
+            sys.stdout.flush()
+    return results
+
+
+def print_result(result):
+    print('%-55s %6s %10.4f %10s' % (result['case'], format_size(result['rows']), result['seconds'],
+                                      '' if result['peak_mb'] is None else '%.1f' % result['peak_mb']))
+
+
+def save_results(results, path=None):
+    """ Saves the results with the metadata of the run, by default in benchmarks/results/<date>_<commit>.json
+
+    Returns:
+        str: path of the file
+    """
+    info = metadata()
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        name = '%s_%s.json' % (info['date'].replace(':', '-'), info['commit'] or 'nocommit')
+        path = os.path.join(RESULTS_DIR, name)
+    with open(path, 'w') as f:
+        json.dump({'metadata': info, 'results': results}, f, indent=1)
+    return path
+
+
+def load_results(path):
+    """ Loads saved results, path 'last' for the most recent file of benchmarks/results """
+    if path == 'last':
+        paths = sorted(glob.glob(os.path.join(RESULTS_DIR, '*.json')))
+        if not paths:
+            raise ValueError('[Benchmarks] no results in %s' % RESULTS_DIR)
+        path = paths[-1]
+    with open(path) as f:
+        return json.load(f), path
+
+
+def compare(results, baseline, threshold=0.2):
+    """ Compares results with the results of a baseline run, case by case (same name and size)
+
+    Args:
+        results (List[dict]): results of run_suite
+        baseline (List[dict]): results of the baseline run
+        threshold (float): relative increase of time or peak memory reported as a regression, default 0.2
+
+    Returns:
+        List[dict]: the compared cases, with their time and memory ratios and a regression flag
+    """
+    former = {(result['case'], result['rows']): result for result in baseline}
+    compared = []
+    for result in results:
+        base = former.get((result['case'], result['rows']))
+        if base is None:
+            continue
+        time_ratio = max(result['seconds'], MIN_SECONDS) / max(base['seconds'], MIN_SECONDS)
+        memory_ratio = None
+        if result['peak_mb'] is not None and base['peak_mb'] is not None:
+            memory_ratio = max(result['peak_mb'], 1) / max(base['peak_mb'], 1)
+        compared.append({'case': result['case'], 'rows': result['rows'], 'seconds': result['seconds'],
+                         'baseline_seconds': base['seconds'], 'time_ratio': time_ratio,
+                         'memory_ratio': memory_ratio,
+                         'regression': time_ratio > 1 + threshold or (memory_ratio or 0) > 1 + threshold})
+    return compared
+
+
+def main(suite, description):
+    """ Command line of a suite: runs it, saves the results and compares them with a baseline """
+    parser = argparse.ArgumentParser(description=description, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10k,100k', help='numbers of rows, e.g. 10k,100k,1M,10M (default 10k,100k)')
+    parser.add_argument('--repeat', type=int, default=3, help='number of timed runs of each case (default 3)')
+    parser.add_argument('--filter', help='regular expression on the case names')
+    parser.add_argument('--no-memory', action='store_true', help='do not trace the peak memory')
+    parser.add_argument('--output', help='results file, default benchmarks/results/<date>_<commit>.json')
+    parser.add_argument('--no-save', action='store_true', help='do not save the results')
+    parser.add_argument('--compare', help="results file of the baseline, or 'last' for the most recent one")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='relative increase of time or memory reported as a regression (default 0.2)')
+    args = parser.parse_args()
+
+    # the baseline is read first, so that --compare last is not the results of this run
+    baseline = load_results(args.compare) if args.compare else None
+
+    sizes = [parse_size(size) for size in args.sizes.split(',')]
+    print('%-55s %6s %10s %10s' % ('case', 'rows', 'seconds', 'peak MB'))
+    results = run_suite(suite, sizes, repeat=args.repeat, pattern=args.filter, memory=not args.no_memory)
+
+    if not args.no_save:
+        print('results saved to %s' % save_results(results, args.output))
+
+    if baseline is None:
+        return 0
+
+    former, path = baseline
+    print('\ncompared with %s (commit %s)' % (path, former['metadata'].get('commit')))
+    if former['metadata'].get('libraries') != metadata()['libraries']:
+        print('warning: library versions differ from the baseline: %s' % former['metadata'].get('libraries'))
+
+    compared = compare(results, former['results'], args.threshold)
+    print('%-55s %6s %10s %10s %8s %8s' % ('case', 'rows', 'seconds', 'baseline', 'time x', 'memory x'))
+    for item in compared:
+        print('%-55s %6s %10.4f %10.4f %8.2f %8s %s' % (
+            item['case'], format_size(item['rows']), item['seconds'], item['baseline_seconds'], item['time_ratio'],
+            '' if item['memory_ratio'] is None else '%.2f' % item['memory_ratio'],
+            'REGRESSION' if item['regression'] else ''))
+
+    regressions = [item for item in compared if item['regression']]
+    print('%d cases compared, %d regressions (threshold %+.0f%%)' % (len(compared), len(regressions),
+                                                                        100 * args.threshold))
+    return 1 if regressions else 0
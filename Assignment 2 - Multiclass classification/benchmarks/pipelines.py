@@ -0,0 +1,33 @@
+from sklearn.pipeline import Pipeline
+
+from custom_transformers import DropColumns, OurSimpleImputer, DataCorrection, GeoClustering
+from custom_transformers import OurAdvancedImputer, Distance, Interactions, OtherFeatures
+
+# transformation_pipeline of multiclass_classification_DrivenData_Tanzania.ipynb, without the
+# meaningless_features step unless the synthetic waterpoints include these columns (full_schema=True)
+meaningless_cols = ['id', 'waterpoint_type_group', 'source_type', 'source_class',
+                    'quantity_group', 'quality_group', 'payment_type',
+                    'management_group', 'extraction_type_group', 'extraction_type_class',
+                    'scheme_name', 'recorded_by', 'district_code',
+                    'region_code', 'region', 'subvillage', 'public_meeting']
+features_to_drop = ['latitude', 'longitude', 'date_recorded', 'num_private']
+
+
+def _kwargs(copy):
+    # copy=None builds the transformers with their defaults, e.g. for older versions of the package
+    return {} if copy is None else {'copy': copy}
+
+
+def make_transformation(copy=None, meaningless_features=False):
+    kwargs = _kwargs(copy)
+    steps = [('meaningless_features', DropColumns(meaningless_cols, **kwargs))] if meaningless_features else []
+    return Pipeline(steps + [
+        ('simple_imputer', OurSimpleImputer(permit=False, **kwargs)),
+        ('government', DataCorrection(installer=True, funder=True, **kwargs)),
+        ('geo_clusters', GeoClustering(**kwargs)),
+        ('advanced_imputer', OurAdvancedImputer(population_bucket=False, **kwargs)),
+        ('distance', Distance(**kwargs)),
+        ('interactions', Interactions(**kwargs)),
+        ('other_features', OtherFeatures(num_private=False, **kwargs)),
+        ('drop', DropColumns(features_to_drop, **kwargs))
+    ])
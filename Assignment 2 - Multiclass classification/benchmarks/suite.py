@@ -0,0 +1,40 @@
+""" Benchmark suite of custom_transformers (waterpoints)
+
+Times fit and transform of each step of the transformation pipeline of the notebook (with the
+meaningless_features step, on synthetic waterpoints with all the columns of data/train.csv), of the
+whole pipeline, of the transformers that are not part of it and of the information gain screening, and
+traces their peak memory. Results are saved in benchmarks/results (see benchmarks/harness.py) and can
+be compared with a former run to catch regressions.
+
+Usage (from the assignment folder):
+    python benchmarks/suite.py --sizes 10k,100k,1M,10M
+    python benchmarks/suite.py --sizes 100k --filter interactions --compare last
+"""
+import os
+import sys
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_transformers import InformationGain, NeighborhoodFeatures
+from harness import Case, main, pipeline_cases
+from pipelines import make_transformation
+from synthetic import make_waterpoints, make_labels
+
+
+def suite(n_rows):
+    data = make_waterpoints(n_rows, full_schema=True)
+    y = make_labels(n_rows)
+
+    for case in pipeline_cases('transformation', make_transformation(meaningless_features=True), data):
+        yield case
+
+    neighborhood = NeighborhoodFeatures().fit(data, y)
+    yield Case('neighborhood.fit', lambda X: NeighborhoodFeatures().fit(X, y), lambda: (data,))
+    yield Case('neighborhood.transform', neighborhood.transform, lambda: (data,))
+    yield Case('information_gain', lambda X: InformationGain().fit(X, y).information_gain(), lambda: (data,))
+
+
+if __name__ == '__main__':
+    warnings.simplefilter('ignore')
+    sys.exit(main(suite, __doc__))
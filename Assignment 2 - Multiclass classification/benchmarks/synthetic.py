@@ -0,0 +1,160 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+
+def _levels(prefix, n):
+    return np.array(['%s %d' % (prefix, i) for i in range(n)], dtype=object)
+
+
+# columns of the DrivenData training set (data/train.csv), in order
+COLUMNS = ['id', 'amount_tsh', 'date_recorded', 'funder', 'gps_height', 'installer', 'longitude', 'latitude',
+           'wpt_name', 'num_private', 'basin', 'subvillage', 'region', 'region_code', 'district_code', 'lga',
+           'ward', 'population', 'public_meeting', 'recorded_by', 'scheme_management', 'scheme_name', 'permit',
+           'construction_year', 'extraction_type', 'extraction_type_group', 'extraction_type_class',
+           'management', 'management_group', 'payment', 'payment_type', 'water_quality', 'quality_group',
+           'quantity', 'quantity_group', 'source', 'source_type', 'source_class', 'waterpoint_type',
+           'waterpoint_type_group']
+
+LABELS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'train_labels.csv')
+
+
+def make_waterpoints(n_rows, seed=289, full_schema=False):
+    """ Synthesizes a frame with the columns used by the waterpoint custom transformers
+
+    Values are random, but cardinalities, null rates and the "missing" markers (0 coordinates,
+    0 construction year, 0/1 population) follow the DrivenData Tanzania training set.
+
+    Args:
+        n_rows (int): number of rows to generate
+        seed (int): random seed
+        full_schema (bool): True to add the other columns of data/train.csv (id, subvillage, region, ...),
+            in the order of the file, e.g. for the meaningless_features step of the notebook
+
+    Returns:
+        pd.DataFrame: synthetic waterpoints
+    """
+    rng = np.random.RandomState(seed)
+
+    lgas = _levels('lga', 125)
+    lga_lat = rng.uniform(-11.5, -1.0, size=len(lgas))
+    lga_lon = rng.uniform(29.5, 40.0, size=len(lgas))
+    lga_idx = rng.randint(len(lgas), size=n_rows)
+
+    longitude = lga_lon[lga_idx] + rng.normal(scale=0.3, size=n_rows)
+    latitude = lga_lat[lga_idx] + rng.normal(scale=0.3, size=n_rows)
+    no_gps = rng.rand(n_rows) < 0.03
+    longitude[no_gps] = 0
+    latitude[no_gps] = -2e-08
+
+    extraction_types = np.array(['gravity', 'nira/tanira', 'other', 'submersible', 'swn 80',
+                                 'mono', 'india mark ii', 'afridev', 'ksb', 'other - rope pump',
+                                 'other - swn 81', 'windmill', 'india mark iii', 'cemo',
+                                 'other - play pump', 'walimi', 'climax', 'other - mkulima/shinyanga'],
+                                dtype=object)
+    construction_year = rng.randint(1960, 2014, size=n_rows).astype(float)
+    construction_year[rng.rand(n_rows) < 0.35] = 0
+
+    population = rng.lognormal(mean=4.5, sigma=1.5, size=n_rows).round()
+    population_marker = rng.rand(n_rows)
+    population[population_marker < 0.36] = 0
+    population[(population_marker >= 0.36) & (population_marker < 0.48)] = 1
+
+    def categorical(values, missing_rate=0.0):
+        column = pd.Series(values[rng.randint(len(values), size=n_rows)], dtype=object)
+        if missing_rate:
+            column[rng.rand(n_rows) < missing_rate] = np.nan
+        return column
+
+    dates = pd.date_range('2011-01-01', '2013-12-03', freq='D').strftime('%Y-%m-%d').values
+
+    data = pd.DataFrame({
+        'amount_tsh': rng.choice([0, 0, 0, 20, 50, 200, 500, 1000], size=n_rows).astype(float),
+        'date_recorded': categorical(dates),
+        'funder': categorical(np.concatenate([_levels('Funder', 1900), ['Government Of Tanzania', '0']]), 0.06),
+        'gps_height': rng.randint(-90, 2770, size=n_rows),
+        'installer': categorical(np.concatenate([_levels('Installer', 2140), ['Central government', '-']]), 0.06),
+        'longitude': longitude,
+        'latitude': latitude,
+        'wpt_name': categorical(np.concatenate([_levels('Zahanati', 3000), _levels('Shule', 3000), ['none']])),
+        'num_private': rng.choice([0] * 98 + [1, 6], size=n_rows),
+        'basin': categorical(np.array(['Lake Victoria', 'Pangani', 'Rufiji', 'Internal', 'Lake Tanganyika',
+                                       'Wami / Ruvu', 'Lake Nyasa', 'Ruvuma / Southern Coast', 'Lake Rukwa'],
+                                      dtype=object)),
+        'lga': pd.Series(lgas[lga_idx], dtype=object),
+        'population': population,
+        'scheme_management': categorical(np.array(['VWC', 'WUG', 'Water authority', 'WUA', 'Water Board',
+                                                   'Parastatal', 'Private operator', 'Company', 'Other', 'SWC',
+                                                   'Trust', 'None'], dtype=object), 0.065),
+        'permit': categorical(np.array([True, False], dtype=object), 0.05),
+        'construction_year': construction_year,
+        'extraction_type': categorical(extraction_types),
+        'management': categorical(np.array(['vwc', 'wug', 'water board', 'wua', 'private operator',
+                                            'parastatal', 'water authority', 'other', 'company', 'unknown',
+                                            'other - school', 'trust'], dtype=object)),
+        'payment': categorical(np.array(['never pay', 'pay per bucket', 'pay monthly', 'unknown',
+                                         'pay when scheme fails', 'pay annually', 'other'], dtype=object)),
+        'water_quality': categorical(np.array(['soft', 'salty', 'unknown', 'milky', 'coloured',
+                                               'salty abandoned', 'fluoride', 'fluoride abandoned'],
+                                              dtype=object)),
+        'quantity': categorical(np.array(['enough', 'insufficient', 'dry', 'seasonal', 'unknown'],
+                                         dtype=object)),
+        'source': categorical(np.array(['spring', 'shallow well', 'machine dbh', 'river', 'rainwater harvesting',
+                                        'hand dtw', 'lake', 'dam', 'other', 'unknown'], dtype=object)),
+        'waterpoint_type': categorical(np.array(['communal standpipe', 'hand pump', 'other',
+                                                 'communal standpipe multiple', 'improved spring',
+                                                 'cattle trough', 'dam'], dtype=object)),
+    })
+
+    if not full_schema:
+        return data
+
+    # generated after the other columns, so that the common columns do not depend on full_schema
+    regions = _levels('Region', 21)
+    region_idx = rng.randint(len(regions), size=len(lgas))[lga_idx]
+    data['id'] = rng.permutation(n_rows)
+    data['subvillage'] = categorical(_levels('Subvillage', 19287), 0.006)
+    data['region'] = pd.Series(regions[region_idx], dtype=object)
+    data['region_code'] = rng.randint(1, 28, size=len(regions))[region_idx]
+    data['district_code'] = rng.randint(0, 81, size=n_rows)
+    data['ward'] = categorical(_levels('Ward', 2092))
+    data['public_meeting'] = categorical(np.array([True, True, True, True, True, True, True, True, True, False],
+                                                  dtype=object), 0.056)
+    data['recorded_by'] = 'GeoData Consultants Ltd'
+    data['scheme_name'] = categorical(_levels('Scheme', 2696), 0.474)
+    data['extraction_type_group'] = data['extraction_type'].replace({'other - swn 81': 'swn 80',
+                                                                     'cemo': 'other motorpump',
+                                                                     'climax': 'other motorpump'})
+    data['extraction_type_class'] = categorical(np.array(['gravity', 'handpump', 'other', 'submersible',
+                                                          'motorpump', 'rope pump', 'wind-powered'], dtype=object))
+    data['management_group'] = categorical(np.array(['user-group', 'commercial', 'parastatal', 'other',
+                                                     'unknown'], dtype=object))
+    data['payment_type'] = data['payment'].replace({'pay per bucket': 'per bucket', 'pay monthly': 'monthly',
+                                                    'pay when scheme fails': 'on failure',
+                                                    'pay annually': 'annually'})
+    data['quality_group'] = data['water_quality'].replace({'soft': 'good', 'salty abandoned': 'salty',
+                                                           'fluoride abandoned': 'fluoride'})
+    data['quantity_group'] = data['quantity']
+    data['source_type'] = data['source'].replace({'machine dbh': 'borehole', 'hand dtw': 'borehole',
+                                                  'lake': 'river/lake', 'river': 'river/lake', 'unknown': 'other'})
+    data['source_class'] = categorical(np.array(['groundwater', 'surface', 'unknown'], dtype=object))
+    data['waterpoint_type_group'] = data['waterpoint_type'].replace('communal standpipe multiple',
+                                                                    'communal standpipe')
+
+    return data.loc[:, COLUMNS]
+
+
+def make_labels(n_rows, seed=289):
+    """ Synthesizes status_group labels with the class frequencies of data/train_labels.csv
+
+    Args:
+        n_rows (int): number of labels to generate
+        seed (int): random seed
+
+    Returns:
+        pd.Series: status_group
+    """
+    frequencies = pd.read_csv(LABELS_PATH).status_group.value_counts(normalize=True)
+    labels = np.random.RandomState(seed).choice(frequencies.index.values, size=n_rows, p=frequencies.values)
+    return pd.Series(labels, name='status_group')
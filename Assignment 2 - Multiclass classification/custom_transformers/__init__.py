@@ -5,4 +5,12 @@ from custom_transformers.our_adv_imputer import OurAdvancedImputer
 from custom_transformers.distance import Distance
 from custom_transformers.interactions import Interactions
 from custom_transformers.other_features import OtherFeatures
-from custom_transformers.drop_columns import DropColumns
\ No newline at end of file
+from custom_transformers.drop_columns import DropColumns
+from custom_transformers.parallel import ParallelTransformer
+from custom_transformers.neighborhood import NeighborhoodFeatures
+from custom_transformers.artifacts import save_pipeline, load_pipeline
+from custom_transformers.profiling import InstrumentedPipeline
+from custom_transformers.information_gain import InformationGain, information_gain
+from custom_transformers.cache import TransformerCache, CachedTransformer, cache_pipeline
+from custom_transformers.columns import required_columns, plan_read, read_csv
+from custom_transformers.schema import DTYPES
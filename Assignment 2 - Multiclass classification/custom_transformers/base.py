@@ -0,0 +1,99 @@
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.utils.validation import check_is_fitted
+
+
+class BaseTransformer(BaseEstimator, TransformerMixin):
+    """ Base class of the custom transformers with explicit copy semantics
+    
+    copy=True: the DataFrame passed to transform is left untouched, the transformer works on a copy.
+    copy=False: the DataFrame passed to transform is modified in place (columns are added, changed
+    and deleted on it) and returned, no full copy of the frame is made.
+    
+    Transformers that can not produce their output in place (e.g. one-hot encoding builds a new 
+    frame) declare _inplace_safe = False. They never modify their input, whatever the value of copy.
+    
+    fit never modifies its input.
+    
+    Transformers with a fitted state declare the attributes set by fit in _fitted_attributes: transform
+    raises NotFittedError until they are set (by fit or _set_state). The transformers without fitted state
+    are always fitted.
+    
+    Transformers can export their fitted state through _get_state / _set_state, used by save_pipeline and
+    load_pipeline (custom_transformers.artifacts).
+    
+    Transformers declare the columns they read, produce and drop through _required_columns,
+    _produced_columns and _dropped_columns, used by custom_transformers.columns to read only the columns
+    of a file that a pipeline needs.
+    
+    frame_copies counts the full copies of frames made by _check_input and _add_columns, over all the
+    transformers, for custom_transformers.profiling.
+    """
+    
+    _inplace_safe = True
+    
+    _fitted_attributes = ()
+    
+    frame_copies = 0
+    
+    def _check_input(self, X):
+        assert isinstance(X, pd.DataFrame)
+        self._check_fitted()
+        
+        if self.copy and self._inplace_safe:
+            BaseTransformer.frame_copies += 1
+            return X.copy()
+        return X
+    
+    def _add_columns(self, X, columns):
+        """ Adds new columns (dict name -> values) to X: in place if copy is False, otherwise
+        with a single concat into a new frame, which leaves X untouched """
+        if not self.copy:
+            for name, values in columns.items():
+                X[name] = values
+            return X
+        
+        new_columns = pd.DataFrame(columns, index=X.index)
+        existing = new_columns.columns.intersection(X.columns)
+        if len(existing):
+            X = X.drop(columns=existing)
+        BaseTransformer.frame_copies += 1
+        return pd.concat([X, new_columns], axis=1)
+    
+    def __sklearn_is_fitted__(self):
+        # without it, check_is_fitted (Pipeline.transform checks its last step, scikit-learn >= 1.3) fails for
+        # the transformers without fitted state (fit returns self, no attribute ending with _)
+        return all(hasattr(self, name) for name in self._fitted_attributes)
+    
+    def _check_fitted(self):
+        """ Raises NotFittedError if an attribute of _fitted_attributes is not set """
+        check_is_fitted(self)
+    
+    def _get_state(self):
+        """ Fitted state saved by custom_transformers.artifacts: dict name -> NumPy array (saved as .npy and
+        loaded memory mapped) or JSON value. None (default): the transformer is pickled """
+        return None
+    
+    def _set_state(self, state):
+        """ Restores the fitted state returned by _get_state, arrays may be read-only memory maps """
+        raise NotImplementedError('[%s] _set_state is not implemented' % type(self).__name__)
+    
+    def _required_columns(self):
+        """ Columns of the input read by fit and transform. None (default): unknown, the transformer may read
+        any column """
+        return None
+    
+    def _produced_columns(self):
+        """ New columns written by transform (a column of the input of the same name is replaced) """
+        return []
+    
+    def _dropped_columns(self, columns):
+        """ Columns, out of the columns of the input, deleted by transform """
+        return []
+    
+    @staticmethod
+    def _drop_inplace(X, columns):
+        # del keeps the remaining columns as views, DataFrame.drop(inplace=True) copies them
+        for col in columns:
+            del X[col]
+        return X
@@ -0,0 +1,327 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin, clone
+from sklearn.pipeline import Pipeline
+
+from custom_transformers.artifacts import _class_path, _json_default, save_pipeline, load_pipeline
+
+VERSION = 1
+FRAME = 'frame.pkl'
+FITTED = 'fitted'
+
+
+def _hash_values(h, values):
+    """ Adds a column (pd.Series or pd.Index) to the hash h: the bytes of numeric data, the pandas hash of
+    the values otherwise (object, categorical and extension columns) """
+    h.update(str(values.dtype).encode())
+    if isinstance(values.dtype, np.dtype) and values.dtype.kind in 'biufcmM':
+        h.update(np.ascontiguousarray(values.to_numpy()).view(np.uint8))
+    else:
+        h.update(pd.util.hash_pandas_object(values, index=False).to_numpy())
+
+
+def hash_frame(X):
+    """ Content hash of a DataFrame (columns, dtypes, values and index), a Series or an array
+
+    Numeric columns are hashed from their memory (blake2b), other columns with pd.util.hash_pandas_object,
+    so that hashing is much cheaper than fitting or transforming.
+
+    Returns:
+        str: hexadecimal digest
+    """
+    h = hashlib.blake2b(digest_size=16)
+    if not isinstance(X, (pd.DataFrame, pd.Series)):
+        X = pd.Series(np.asarray(X).ravel()) if np.ndim(X) < 2 else pd.DataFrame(np.asarray(X))
+    if isinstance(X, pd.Series):
+        X = X.to_frame()
+
+    h.update(repr(X.shape).encode())
+    for i, col in enumerate(X.columns):
+        h.update(repr(col).encode())
+        _hash_values(h, X.iloc[:, i])
+    if isinstance(X.index, pd.RangeIndex):
+        h.update(repr((X.index.start, X.index.stop, X.index.step)).encode())
+    else:
+        _hash_values(h, X.index)
+    return h.hexdigest()
+
+
+# bytes taken by the entries of each cache directory (absolute path), counted once per process and then kept up
+# to date by store, evict and clear: a store does not walk the whole cache
+_cache_bytes = {}
+
+
+def _directory_bytes(path):
+    return sum(os.path.getsize(os.path.join(directory, file_name))
+               for directory, _, file_names in os.walk(path) for file_name in file_names)
+
+
+def _param_default(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return hash_frame(value)
+    try:
+        return _json_default(value)
+    except TypeError:
+        return repr(value)
+
+
+def _key(*parts):
+    return hashlib.blake2b(json.dumps([VERSION] + list(parts), sort_keys=True, default=_param_default).encode(),
+                           digest_size=16).hexdigest()
+
+
+def _fit_key(transformer, X_hash, y_hash):
+    """ Key of a fitted transformer: class, parameters (nested ones included) and content of X and y """
+    return _key('fit', _class_path(transformer), transformer.get_params(deep=True), X_hash, y_hash)
+
+
+def _parse_size(size):
+    if isinstance(size, str):
+        units = {'K': 2**10, 'M': 2**20, 'G': 2**30}
+        size = size.strip().upper()
+        if size[-1] in units:
+            return int(float(size[:-1]) * units[size[-1]])
+    return int(size)
+
+
+def _save_frame(X, path):
+    """ Saves a DataFrame column by column: numeric columns as .npy files, other columns pickled """
+    kinds = []
+    for i, (_, series) in enumerate(X.items()):
+        if isinstance(series.dtype, np.dtype) and series.dtype.kind in 'biufcmM':
+            np.save(os.path.join(path, '%04d.npy' % i), series.to_numpy(), allow_pickle=False)
+            kinds.append('npy')
+        else:
+            # object columns as NumPy arrays (faster to load than their pandas array), extension arrays as is
+            values = series.to_numpy() if series.dtype == object else series.array
+            with open(os.path.join(path, '%04d.pkl' % i), 'wb') as f:
+                pickle.dump(values, f, protocol=pickle.HIGHEST_PROTOCOL)
+            kinds.append('pkl')
+    with open(os.path.join(path, FRAME), 'wb') as f:
+        pickle.dump({'columns': X.columns, 'kinds': kinds, 'index': X.index}, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _load_frame(path):
+    with open(os.path.join(path, FRAME), 'rb') as f:
+        frame = pickle.load(f)
+    columns = {}
+    for i, kind in enumerate(frame['kinds']):
+        if kind == 'npy':
+            columns[i] = np.load(os.path.join(path, '%04d.npy' % i), allow_pickle=False)
+        else:
+            with open(os.path.join(path, '%04d.pkl' % i), 'rb') as f:
+                columns[i] = pickle.load(f)
+    X = pd.DataFrame(columns, index=frame['index'])
+    X.columns = frame['columns']
+    return X
+
+
+class TransformerCache(object):
+    """ Content-addressed cache of fitted transformers and transform outputs on local disk
+
+    Each entry is a directory named by its key: a fitted transformer is saved with save_pipeline (state hooks,
+    or a pickle), a transformed DataFrame column by column (.npy files for the numeric columns). Entries are
+    written to a temporary directory and renamed, so processes of a parallel search can share the cache.
+    Reading an entry marks it as used (mtime); once the entries take more than max_bytes, the least recently
+    used ones are deleted. The size of the cache is counted once per process and then kept as a running total,
+    the entries stored by other processes are only counted at the next eviction.
+
+    The keys do not cover the code of the transformers: clear the cache after changing it.
+
+    Args:
+        path (str): directory of the cache, created if needed
+        max_bytes (int or str): size of the cache, e.g. 2**30 or '1G', default '2G'
+    """
+
+    def __init__(self, path, max_bytes='2G'):
+        self.path = path
+        self.max_bytes = max_bytes
+
+    def _entries(self):
+        """ (last use, bytes, path) of the entries, least recently used first """
+        if not os.path.isdir(self.path):
+            return []
+        entries = []
+        for name in os.listdir(self.path):
+            entry = os.path.join(self.path, name)
+            if name.startswith('.') or not os.path.isdir(entry):
+                continue
+            try:
+                entries.append((os.path.getmtime(entry), _directory_bytes(entry), entry))
+            except OSError:
+                # deleted by another process meanwhile
+                continue
+        return sorted(entries)
+
+    def load(self, key):
+        """ Fitted transformer or DataFrame stored under key, None if there is none """
+        entry = os.path.join(self.path, key)
+        try:
+            if os.path.isdir(os.path.join(entry, FITTED)):
+                value = load_pipeline(os.path.join(entry, FITTED), mmap_mode=None)
+            else:
+                value = _load_frame(entry)
+            os.utime(entry)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        return value
+
+    def _bytes(self):
+        """ Bytes taken by the entries: counted on the first call of the process, then a running total """
+        path = os.path.abspath(self.path)
+        if path not in _cache_bytes:
+            _cache_bytes[path] = sum(size for _, size, _ in self._entries())
+        return _cache_bytes[path]
+
+    def store(self, key, value):
+        """ Stores a fitted transformer or a DataFrame under key, then evicts the least recently used entries if
+        the cache takes more than max_bytes """
+        total = self._bytes()
+        os.makedirs(self.path, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix='.tmp-', dir=self.path)
+        try:
+            if isinstance(value, pd.DataFrame):
+                _save_frame(value, tmp)
+            else:
+                save_pipeline(value, os.path.join(tmp, FITTED))
+            size = _directory_bytes(tmp)
+            os.rename(tmp, os.path.join(self.path, key))
+            total = _cache_bytes[os.path.abspath(self.path)] = total + size
+        except OSError:
+            # stored by another process meanwhile
+            shutil.rmtree(tmp, ignore_errors=True)
+        if total > _parse_size(self.max_bytes):
+            self.evict()
+
+    def evict(self):
+        """ Deletes the least recently used entries until the cache takes at most max_bytes (the most recent is kept)
+
+        Counts all the entries, the ones stored by other processes included, and resets the running total """
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in entries[:-1]:
+            if total <= _parse_size(self.max_bytes):
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+        _cache_bytes[os.path.abspath(self.path)] = total
+
+    def info(self):
+        """ Number of entries and bytes used
+
+        Returns:
+            dict: entries, bytes
+        """
+        entries = self._entries()
+        _cache_bytes[os.path.abspath(self.path)] = sum(size for _, size, _ in entries)
+        return {'entries': len(entries), 'bytes': _cache_bytes[os.path.abspath(self.path)]}
+
+    def clear(self):
+        """ Deletes all the entries """
+        for _, _, entry in self._entries():
+            shutil.rmtree(entry, ignore_errors=True)
+        _cache_bytes.pop(os.path.abspath(self.path), None)
+
+
+class CachedTransformer(BaseEstimator, TransformerMixin):
+    """ Wraps a transformer: fit, transform and fit_transform go through a TransformerCache
+
+    The fitted transformer is keyed by its class, its parameters and a content hash of X and y (hash_frame),
+    the outputs by the key of the fitted transformer and a content hash of the input (fit_transform has its
+    own outputs, e.g. out-of-fold features of NeighborhoodFeatures). The input of every step is hashed, the
+    output of the previous step included, so that an output modified in place gets a key of its own. In a grid
+    search or cross-validation over a pipeline of wrapped steps, the steps whose parameters and input are the
+    same as in an earlier candidate, fold or search are loaded instead of fitted and transformed again.
+
+    The transformer is cloned, the fitted one is transformer_. Outputs read from the cache are new frames, so
+    the wrapped transformers should have copy=True (default): with copy=False the input is only modified in
+    place when the output is computed. Outputs that are not DataFrames are not cached.
+
+    Args:
+        transformer: transformer to wrap, its parameters are set through transformer__<param>
+        cache (TransformerCache or str): cache, or its directory (TransformerCache with the default size)
+
+    Returns:
+        pd.DataFrame: output of the transformer
+
+    Example:
+        cache = TransformerCache('.transformer_cache', max_bytes='4G')
+        search = GridSearchCV(Pipeline([('transformation', cache_pipeline(transformation_pipeline, cache)),
+                                        ('model', RandomForestClassifier())]), param_grid, cv=5)
+    """
+
+    def __init__(self, transformer, cache):
+        self.transformer = transformer
+        self.cache = cache
+
+    def _cache(self):
+        return self.cache if isinstance(self.cache, TransformerCache) else TransformerCache(self.cache)
+
+    def _fit(self, X, y, X_hash):
+        cache = self._cache()
+        self.fit_key_ = _fit_key(self.transformer, X_hash, None if y is None else hash_frame(y))
+        self.transformer_ = cache.load(self.fit_key_)
+        if self.transformer_ is None:
+            self.transformer_ = clone(self.transformer).fit(X, y)
+            cache.store(self.fit_key_, self.transformer_)
+
+    def _output(self, key, compute):
+        cache = self._cache()
+        Xt = cache.load(key)
+        if Xt is None:
+            Xt = compute()
+            if isinstance(Xt, pd.DataFrame):
+                cache.store(key, Xt)
+        return Xt
+
+    def fit(self, X, y=None):
+        self._fit(X, y, hash_frame(X))
+        return self
+
+    def transform(self, X):
+        return self._output(_key('transform', self.fit_key_, hash_frame(X)), lambda: self.transformer_.transform(X))
+
+    def fit_transform(self, X, y=None):
+        cache = self._cache()
+        self.fit_key_ = _fit_key(self.transformer, hash_frame(X), None if y is None else hash_frame(y))
+        output_key = _key('fit_transform', self.fit_key_)
+
+        self.transformer_ = cache.load(self.fit_key_)
+        Xt = None if self.transformer_ is None else cache.load(output_key)
+        if Xt is None:
+            fitted = self.transformer_ is not None
+            self.transformer_ = clone(self.transformer)
+            Xt = self.transformer_.fit_transform(X, y)
+            if not fitted:
+                cache.store(self.fit_key_, self.transformer_)
+            if isinstance(Xt, pd.DataFrame):
+                cache.store(output_key, Xt)
+        return Xt
+
+
+def cache_pipeline(pipeline, cache):
+    """ Pipeline whose transformers (of nested pipelines as well) are wrapped in CachedTransformer, the final
+    estimator is left as is if it does not transform. Parameters of a step become <step>__transformer__<param>
+
+    Args:
+        pipeline (sklearn.pipeline.Pipeline): pipeline, not fitted
+        cache (TransformerCache or str): cache, or its directory
+
+    Returns:
+        sklearn.pipeline.Pipeline: pipeline with cached steps
+    """
+    steps = []
+    for name, step in pipeline.steps:
+        if isinstance(step, Pipeline):
+            step = cache_pipeline(step, cache)
+        elif step is not None and step != 'passthrough' and hasattr(step, 'transform'):
+            step = CachedTransformer(step, cache)
+        steps.append((name, step))
+    return Pipeline(steps)
@@ -1,39 +1,56 @@
 import pandas as pd
 import numpy as np
-from sklearn.base import BaseEstimator, TransformerMixin
+from custom_transformers.base import BaseTransformer
 
-class DataCorrection(BaseEstimator, TransformerMixin):
-    """ Text
+class DataCorrection(BaseTransformer):
+    """ Normalizes installer and funder names: government-related names are grouped into 'government',
+    all names are lower-cased and truncated to 4 characters
         
     Args: 
-        name (type): description
+        installer (bool): if True normalizes installer, default False
+        funder (bool): if True normalizes funder, default False
+        copy (bool): if True the input DataFrame is left untouched, otherwise it is transformed in place, default True
         
     Returns: 
         pd.DataFrame: transformed pandas DataFrame with new features
     """
     
-    def __init__(self, installer=False, funder=False):
+    _government_prefixes = ['gover', 'centr','tanza', 'cetra']
+    
+    def __init__(self, installer=False, funder=False, copy=True):
         self.installer = installer
         self.funder = funder
+        self.copy = copy
     
     def fit(self, X, y=None):    
         return self
     
+    def _normalize(self, values):
+        """ Normalizes the unique values only and maps them back to the rows through the factorized codes """
+        codes, uniques = pd.factorize(values)
+        names = pd.Index(uniques, dtype=object).str.lower()
+        
+        government = names.str.slice(stop=5).isin(self._government_prefixes)
+        normalized = np.where(government, 'gove', names.str.slice(stop=4))
+        
+        # code -1 (NA) takes the last entry
+        normalized = np.append(normalized.astype(object), np.nan)
+        return normalized[codes]
+    
+    def _required_columns(self):
+        return (['installer'] if self.installer else []) + (['funder'] if self.funder else [])
+    
     def transform(self, X):
         
-        assert isinstance(X, pd.DataFrame)
+        X = self._check_input(X)
         
         try:
         
             if self.installer:
-                gov_installer = X.installer.str.lower().str.slice(stop=5).isin(['gover', 'centr','tanza', 'cetra'])
-                X.loc[gov_installer, 'installer'] = 'government'
-                X.loc[:, 'installer'] = X.apply(lambda row: row.installer.lower()[:4], axis=1) 
+                X['installer'] = self._normalize(X.installer)
             
             if self.funder:
-                funder_installer = X.funder.str.lower().str.slice(stop=5).isin(['gover', 'centr','tanza', 'cetra'])
-                X.loc[funder_installer, 'funder'] = 'government'
-                X.loc[:, 'funder'] = X.apply(lambda row: row.funder.lower()[:4], axis=1) 
+                X['funder'] = self._normalize(X.funder)
                 
             return X
             
@@ -1,56 +1,213 @@
-from sklearn.base import BaseEstimator, TransformerMixin
+from custom_transformers.base import BaseTransformer
+from sklearn.neighbors import BallTree
 import pandas as pd
 import numpy as np
 
-class Distance(BaseEstimator, TransformerMixin):
-    """Feature creation based on existing geographic variables
-    
+EARTH_RADIUS_KM = 6371.0
+
+
+def _unit_vectors(lat, lon):
+    """ Points of the unit sphere (n, 3) of coordinates in degrees """
+    lat = np.radians(lat)
+    lon = np.radians(lon)
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def _chord_to_km(squared_chord):
+    """ Great-circle distance (km) from the squared chord length between unit vectors, computed in place """
+    np.sqrt(squared_chord, out=squared_chord)
+    squared_chord *= 0.5
+    np.minimum(squared_chord, 1, out=squared_chord)
+    np.arcsin(squared_chord, out=squared_chord)
+    squared_chord *= 2 * EARTH_RADIUS_KM
+    return squared_chord
+
+
+class Distance(BaseTransformer):
+    """Feature creation based on existing geographic variables: distances from the waterpoint to landmarks
+
+    By default the landmarks are Dodoma and Dar es Salaam. Any landmark table can be given instead, distances to
+    all landmarks are computed in one NumPy broadcast by blocks of rows, which bounds memory use.
+    With output='nearest' only the distance to the nearest landmark(s) and their names are created, for large
+    landmark tables the nearest landmarks are found through a BallTree.
+
     Args:
-        distance_to_Dodoma (bool): if True creates manhattan distance from the waterpoint to Dodoma, default True
-        distance_to_Salaam (bool): if True creates manhattan distance from the waterpoint to Salaam, default True
-        strategy (str): 'manhattan' or 'eucledian' distance
-    
-    Returns: 
+        distance_to_Dodoma (bool): if True creates distance from the waterpoint to Dodoma, default True (ignored if landmarks is given)
+        distance_to_Salaam (bool): if True creates distance from the waterpoint to Salaam, default True (ignored if landmarks is given)
+        strategy (str): 'manhattan' or 'eucledian' distance in degrees, or 'haversine' (great-circle) distance in km
+        landmarks (pd.DataFrame or dict): landmark table with columns latitude and longitude indexed by name, or
+        dict name -> (latitude, longitude), default None
+        output (str): 'all' (default) creates feature distance_to_<name> for each landmark, 'nearest' creates
+        features nearest_landmark and distance_to_nearest_landmark (suffixed _1.._k if n_nearest > 1), missing for
+        the rows with a missing latitude or longitude
+        n_nearest (int): number of nearest landmarks with output='nearest', default 1
+        algorithm (str): 'brute', 'ball_tree' or 'auto' (default, BallTree from 1000 landmarks) for output='nearest'
+        block_size (int): number of rows per block of the distance computation, default 65536 (reduced so that
+        a block has at most 2**24 distances)
+        copy (bool): if True the input DataFrame is left untouched, otherwise it is transformed in place, default True
+
+    Returns:
         pd.DataFrame: transformed pandas DataFrame.
     """
-    
-    def __init__(self, distance_to_Dodoma=True, distance_to_Salaam=True, strategy='manhattan'):
+
+    _default_landmarks = {'Dodoma': (-6.1630, 35.7516), 'Salaam': (-6.7924, 39.2083)}
+
+    _fitted_attributes = ('landmarks_', 'tree_')
+
+    def __init__(self, distance_to_Dodoma=True, distance_to_Salaam=True, strategy='manhattan', landmarks=None,
+                 output='all', n_nearest=1, algorithm='auto', block_size=65536, copy=True):
         self.distance_to_Dodoma = distance_to_Dodoma
         self.distance_to_Salaam = distance_to_Salaam
         self.strategy = strategy
-        
-    def fit(self,X,y=None):    
+        self.landmarks = landmarks
+        self.output = output
+        self.n_nearest = n_nearest
+        self.algorithm = algorithm
+        self.block_size = block_size
+        self.copy = copy
+
+    def fit(self,X,y=None):
+        if self.strategy not in ('manhattan', 'eucledian', 'haversine'):
+            raise ValueError('Strategy is wrong. Should be either "manhattan", "eucledian" or "haversine"')
+        if self.output not in ('all', 'nearest'):
+            raise ValueError('Output is wrong. Should be either "all" or "nearest"')
+
+        if self.landmarks is None:
+            landmarks = {name: coords for name, coords in self._default_landmarks.items()
+                         if getattr(self, 'distance_to_' + name)}
+        else:
+            landmarks = self.landmarks
+        if isinstance(landmarks, dict):
+            landmarks = pd.DataFrame.from_dict(landmarks, orient='index', columns=['latitude', 'longitude'])
+
+        # precomputed landmark table
+        self.landmarks_ = landmarks.loc[:, ['latitude', 'longitude']].astype(np.float64)
+        self.landmark_names_ = self.landmarks_.index.astype(str)
+        self.landmark_lat_ = self.landmarks_.latitude.to_numpy()
+        self.landmark_lon_ = self.landmarks_.longitude.to_numpy()
+        self.landmark_xyz_ = _unit_vectors(self.landmark_lat_, self.landmark_lon_)
+
+        self.tree_ = None
+        if self.output == 'nearest':
+            if self.n_nearest > len(self.landmarks_):
+                raise ValueError('n_nearest is larger than the number of landmarks')
+            if self.algorithm == 'ball_tree' or (self.algorithm == 'auto' and len(self.landmarks_) >= 1000):
+                self.tree_ = BallTree(self._tree_points(self.landmark_lat_, self.landmark_lon_),
+                                      metric=self._tree_metric())
+
         return self
-    
+
+    def _tree_metric(self):
+        return {'haversine': 'haversine', 'manhattan': 'manhattan', 'eucledian': 'euclidean'}[self.strategy]
+
+    def _tree_points(self, lat, lon):
+        if self.strategy == 'haversine':
+            return np.radians(np.column_stack([lat, lon]))
+        return np.column_stack([lon, lat])
+
+    def _distances(self, lat, lon):
+        """ Distances between all landmarks and n points in one broadcast, shape (L, n): one row per landmark """
+        landmark_lat = self.landmark_lat_[:, None]
+        landmark_lon = self.landmark_lon_[:, None]
+
+        if self.strategy == 'haversine':
+            # chord between points of the unit sphere, cheaper than the haversine formula and as precise
+            xyz = _unit_vectors(lat, lon)
+            squared_chord = (self.landmark_xyz_[:, 0:1] - xyz[:, 0])**2
+            squared_chord += (self.landmark_xyz_[:, 1:2] - xyz[:, 1])**2
+            squared_chord += (self.landmark_xyz_[:, 2:3] - xyz[:, 2])**2
+            return _chord_to_km(squared_chord)
+
+        if self.strategy == 'manhattan':
+            return np.abs(lon - landmark_lon) + np.abs(lat - landmark_lat)
+
+        return np.sqrt((lon - landmark_lon)**2 + (lat - landmark_lat)**2)
+
+    def _nearest(self, lat, lon):
+        """ Distances (n, k) and indices (n, k) of the k nearest landmarks, nearest first """
+        k = self.n_nearest
+
+        if self.tree_ is not None:
+            dist, ind = self.tree_.query(self._tree_points(lat, lon), k=k)
+            if self.strategy == 'haversine':
+                dist = dist * EARTH_RADIUS_KM
+            return dist, ind
+
+        if self.strategy == 'haversine':
+            # the nearest landmarks on the sphere have the largest dot products (one matrix product),
+            # distances are only computed for them
+            xyz = _unit_vectors(lat, lon)
+            dist = -(xyz @ self.landmark_xyz_.T)
+        else:
+            dist = self._distances(lat, lon).T
+
+        if k == 1:
+            ind = dist.argmin(axis=1)[:, None]
+        else:
+            ind = np.argpartition(dist, k - 1, axis=1)[:, :k]
+            ind = np.take_along_axis(ind, np.take_along_axis(dist, ind, axis=1).argsort(axis=1), axis=1)
+
+        if self.strategy == 'haversine':
+            squared_chord = ((xyz[:, None, :] - self.landmark_xyz_[ind])**2).sum(axis=2)
+            return _chord_to_km(squared_chord), ind
+        return np.take_along_axis(dist, ind, axis=1), ind
+
+    def _required_columns(self):
+        return ['latitude', 'longitude']
+
+    def _produced_columns(self):
+        if self.output == 'nearest':
+            suffixes = [''] if self.n_nearest == 1 else ['_%d' % (j + 1) for j in range(self.n_nearest)]
+            return [name + suffix for suffix in suffixes
+                    for name in ['nearest_landmark', 'distance_to_nearest_landmark']]
+        if self.landmarks is None:
+            names = [name for name in self._default_landmarks if getattr(self, 'distance_to_' + name)]
+        elif isinstance(self.landmarks, dict):
+            names = list(self.landmarks)
+        else:
+            names = list(self.landmarks.index)
+        return ['distance_to_' + str(name) for name in names]
+
     def transform(self, X):
-        
+
         assert isinstance(X, pd.DataFrame)
-        
-        try: 
-            dodoma = (-6.1630, 35.7516)
-            salaam = (-6.7924, 39.2083)
-
-            if self.strategy == 'manhattan':
-                if self.distance_to_Dodoma:
-                    X.loc[:, 'distance_to_Dodoma'] = np.abs(X.loc[:,'longitude'] - dodoma[1]) + np.abs(X.loc[:, 'latitude'] - dodoma[0])
-
-                if self.distance_to_Salaam:
-                    X.loc[:, 'distance_to_Salaam'] = np.abs(X.loc[:,'longitude'] - salaam[1]) + np.abs(X.loc[:, 'latitude'] - salaam[0])
-            
-            elif self.strategy == 'eucledian':
-                if self.distance_to_Dodoma:
-                    X.loc[:, 'distance_to_Dodoma'] = np.sqrt((X.loc[:,'longitude'] - dodoma[1])**2 + (X.loc[:, 'latitude'] - dodoma[0])**2)
-                
-                if self.distance_to_Salaam:
-                    X.loc[:, 'distance_to_Salaam'] = np.sqrt((X.loc[:,'longitude'] - salaam[1])**2 + (X.loc[:, 'latitude'] - salaam[0])**2)
-                    
-            else:
-                raise KeyError('Strategy is wrong. Should be either "manhattan" or "eucledian"')
-            
-            return X
+        self._check_fitted()
+
+        try:
+            lat = X.loc[:, 'latitude'].to_numpy(dtype=np.float64)
+            lon = X.loc[:, 'longitude'].to_numpy(dtype=np.float64)
 
         except KeyError:
-            cols_error = list(set(['longtitude', 'latitude']) - set(X.columns))
+            cols_error = list(set(['longitude', 'latitude']) - set(X.columns))
             raise KeyError('[Distance] DataFrame does not include the columns:', cols_error)
-            
-      
\ No newline at end of file
+
+        n_rows = len(X)
+        block_size = max(1, min(self.block_size, 2**24 // max(1, len(self.landmarks_))))
+
+        if self.output == 'all':
+            # one row per landmark, i.e. one contiguous array per new column
+            distances = np.empty((len(self.landmarks_), n_rows))
+            for start in range(0, n_rows, block_size):
+                stop = start + block_size
+                distances[:, start:stop] = self._distances(lat[start:stop], lon[start:stop])
+
+            columns = {'distance_to_' + name: distances[i] for i, name in enumerate(self.landmark_names_)}
+            return self._add_columns(X, columns)
+
+        # rows with a missing latitude or longitude have no nearest landmark (missing name, NaN distance)
+        k = self.n_nearest
+        distances = np.full((n_rows, k), np.nan)
+        indices = np.full((n_rows, k), -1, dtype=np.intp)
+        rows = np.flatnonzero(~(np.isnan(lat) | np.isnan(lon)))
+        for start in range(0, len(rows), block_size):
+            block = rows[start:start + block_size]
+            distances[block], indices[block] = self._nearest(lat[block], lon[block])
+
+        columns = {}
+        for j in range(k):
+            suffix = '' if k == 1 else '_%d' % (j + 1)
+            columns['nearest_landmark' + suffix] = pd.Categorical.from_codes(indices[:, j],
+                                                                             categories=self.landmark_names_)
+            columns['distance_to_nearest_landmark' + suffix] = distances[:, j]
+
+        return self._add_columns(X, columns)
@@ -1,29 +1,46 @@
 import pandas as pd
 import numpy as np
-from sklearn.base import BaseEstimator, TransformerMixin
+from custom_transformers.base import BaseTransformer
 
-class DropColumns(BaseEstimator, TransformerMixin):
+class DropColumns(BaseTransformer):
     """ Drops columns specified and returns transformed DataFrame
     
     Args:
         columns (List): list of column names to drop
+        errors (str): 'raise' (default) raises a KeyError if a column is missing, 'ignore' drops the columns
+            present only, e.g. when the input is read with custom_transformers.columns.read_csv
+        copy (bool): if True (default) the input DataFrame is left untouched, otherwise columns are dropped in place
         
     Returns: 
         pd.DataFrame: transformed pandas DataFrame.
         
     """ 
     
-    def __init__(self, columns):
+    def __init__(self, columns, errors='raise', copy=True):
         self.columns = columns
+        self.errors = errors
+        self.copy = copy
 
     def fit(self, X, y=None):
         return self
+    
+    def _required_columns(self):
+        return [] if self.errors == 'ignore' else list(self.columns)
+    
+    def _dropped_columns(self, columns):
+        return [col for col in columns if col in self.columns]
 
     def transform(self, X):
         assert isinstance(X, pd.DataFrame)
 
         try:
-            return X.drop(columns=self.columns)
+            if self.copy:
+                return X.drop(columns=self.columns, errors=self.errors)
+            
+            missing = set(self.columns) - set(X.columns)
+            if missing and self.errors != 'ignore':
+                raise KeyError(missing)
+            return self._drop_inplace(X, [col for col in self.columns if col not in missing])
         
         except KeyError:
             cols_error = list(set(self.columns) - set(X.columns))
@@ -1,47 +1,151 @@
 import pandas as pd
 import numpy as np
-from sklearn.base import BaseEstimator, TransformerMixin
-from sklearn.pipeline import Pipeline
+from custom_transformers.base import BaseTransformer
 from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
-
-class GeoClustering(BaseEstimator, TransformerMixin):
-    """Text
-        
-    Args: 
-        name (type): description
-        
-    Returns: 
+from sklearn.cluster import KMeans, MiniBatchKMeans
+
+
+def _nearest_centroid(points, centroids, block_size=2048):
+    """ Index of the nearest centroid of each point, by blocks of rows: argmin of |c|^2 - 2 x.c, the distance
+    expansion of KMeans.predict (same labels), on blocks small enough to stay in cache """
+    squared_norms = (centroids**2).sum(axis=1)
+    weights = -2 * centroids.T
+    labels = np.empty(len(points), dtype=np.intp)
+    distances = np.empty((min(block_size, len(points)), len(centroids)))
+    for start in range(0, len(points), block_size):
+        block = points[start:start + block_size]
+        out = distances[:len(block)]
+        np.dot(block, weights, out=out)
+        out += squared_norms
+        out.argmin(axis=1, out=labels[start:start + block_size])
+    return labels
+
+
+class GeoClustering(BaseTransformer):
+    """Clusters waterpoints by their scaled coordinates (KMeans) and adds the cluster label as feature "cluster"
+
+    Labels are integers 0..n_clusters-1 stored as a pandas categorical. Each waterpoint is assigned to the
+    nearest of the centroids kept in scaled_centers_, with the distance expansion of KMeans.predict computed
+    by blocks of rows (faster than a KD-tree for a few dozen centroids in 2 dimensions).
+
+    With minibatch=True clusters are computed with MiniBatchKMeans, which can also be updated with new
+    coordinate chunks through partial_fit (the scaler is fitted on the first chunk only). Centroids can be
+    saved with save_centroids and used to warm start a later fit through init_centroids. A clustering loaded
+    with load_pipeline assigns labels like the saved one, its partial_fit warm starts from the loaded centroids.
+
+    Args:
+        n_clusters (int): number of clusters, default 50
+        minibatch (bool): if True uses MiniBatchKMeans instead of KMeans, default False
+        batch_size (int): size of the mini batches of MiniBatchKMeans, default 10000
+        init_centroids (np.ndarray or str): centroids (n_clusters x [longitude, latitude]) or path of a .npy file
+        saved by save_centroids to start from, default None (k-means++)
+        random_state (int): random state of the clustering, default 289
+        copy (bool): if True the input DataFrame is left untouched, otherwise it is transformed in place, default True
+
+    Returns:
         pd.DataFrame: transformed pandas DataFrame with new features
     """
-    
-    def __init__(self, n_clusters=50):
+
+    _fitted_attributes = ('scaler_', 'scaled_centers_', 'cluster_centers_')
+
+    def __init__(self, n_clusters=50, minibatch=False, batch_size=10000, init_centroids=None, random_state=289,
+                 copy=True):
         self.n_clusters = n_clusters
-        self.pipeline = Pipeline([
-            ('scaler', StandardScaler()),
-            ('kmeans', KMeans(n_clusters=self.n_clusters, n_jobs=-1, random_state = 289))
-        ])
-    
+        self.minibatch = minibatch
+        self.batch_size = batch_size
+        self.init_centroids = init_centroids
+        self.random_state = random_state
+        self.copy = copy
+
+    def _coordinates(self, X):
+        return X[['longitude','latitude']].to_numpy(dtype=np.float64)
+
+    def _init_model(self, coords):
+        self.scaler_ = StandardScaler().fit(coords)
+
+        if self.init_centroids is None:
+            init = 'k-means++'
+            n_init = 3 if self.minibatch else 10
+        else:
+            centroids = self.init_centroids
+            if isinstance(centroids, str):
+                centroids = np.load(centroids)
+            init = self.scaler_.transform(np.asarray(centroids, dtype=np.float64))
+            n_init = 1
+
+        if self.minibatch:
+            self.kmeans_ = MiniBatchKMeans(n_clusters=self.n_clusters, init=init, n_init=n_init,
+                                           batch_size=self.batch_size, random_state=self.random_state)
+        else:
+            self.kmeans_ = KMeans(n_clusters=self.n_clusters, init=init, n_init=n_init,
+                                  random_state=self.random_state)
+
+    def _set_centroids(self, scaled_centers):
+        # centroids are kept in [longitude, latitude], the clustering works in the scaled space
+        self.scaled_centers_ = np.array(scaled_centers, dtype=np.float64)
+        self.cluster_centers_ = self.scaler_.inverse_transform(self.scaled_centers_)
+
     def fit(self, X, y=None):
-        self.pipeline.fit(X[['longitude','latitude']])             
-            
+        coords = self._coordinates(X)
+        self._init_model(coords)
+        self.kmeans_.fit(self.scaler_.transform(coords))
+        self._set_centroids(self.kmeans_.cluster_centers_)
+
+        return self
+
+    def partial_fit(self, X, y=None):
+        if not self.minibatch:
+            raise ValueError('[Clustering] partial_fit requires minibatch=True')
+
+        coords = self._coordinates(X)
+        if not hasattr(self, 'scaled_centers_'):
+            self._init_model(coords)
+        elif not hasattr(self, 'kmeans_'):
+            # loaded by load_pipeline: warm start from the loaded centroids
+            self.kmeans_ = MiniBatchKMeans(n_clusters=self.n_clusters, init=self.scaled_centers_, n_init=1,
+                                           batch_size=self.batch_size, random_state=self.random_state)
+        self.kmeans_.partial_fit(self.scaler_.transform(coords))
+        self._set_centroids(self.kmeans_.cluster_centers_)
+
         return self
+
+    def _get_state(self):
+        return {'scaler_mean': self.scaler_.mean_, 'scaler_scale': self.scaler_.scale_,
+                'centroids': self.scaled_centers_}
+    
+    def _set_state(self, state):
+        self.scaler_ = StandardScaler()
+        self.scaler_.mean_ = np.array(state['scaler_mean'])
+        self.scaler_.scale_ = np.array(state['scaler_scale'])
+        self.scaler_.var_ = self.scaler_.scale_**2
+        self.scaler_.n_features_in_ = 2
+        self._set_centroids(state['centroids'])
+    
+    def save_centroids(self, path):
+        """ Saves the centroids ([longitude, latitude]) as .npy file, to be used as init_centroids """
+        np.save(path, self.cluster_centers_)
+
+    def _required_columns(self):
+        return ['longitude', 'latitude']
+    
+    def _produced_columns(self):
+        return ['cluster']
     
     def transform(self, X):
-        
-        assert isinstance(X, pd.DataFrame)
-        
+
+        X = self._check_input(X)
+
         try:
-            labels = self.pipeline.predict(X[['longitude','latitude']]).astype('str')
-            X = X.assign(cluster = labels)
-            
+            labels = _nearest_centroid(self.scaler_.transform(self._coordinates(X)), self.scaled_centers_)
+            X['cluster'] = pd.Categorical.from_codes(labels, categories=np.arange(self.n_clusters))
+
             return X
-            
+
         except KeyError:
             cols_related = ['longitude','latitude']
-            
+
             cols_error = list(set(cols_related) - set(X.columns))
             raise KeyError('[Clustering] DataFrame does not include the columns:', cols_error)
-        
-        
-        
\ No newline at end of file
+
+
+
@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+
+def _codes(values, index):
+    """ Codes of values in index (0 for missing values, 1 + position otherwise), values not in index appended
+
+    Returns:
+        (np.ndarray, pd.Index): codes and index of the values seen
+    """
+    codes, uniques = pd.factorize(values)
+    # values of categorical columns as well
+    uniques = pd.Index(np.asarray(uniques))
+    if len(index):
+        positions = index.get_indexer(uniques)
+        new = positions == -1
+        if new.any():
+            positions[new] = len(index) + np.arange(new.sum())
+            index = index.append(uniques[new])
+    else:
+        positions, index = np.arange(len(uniques)), uniques
+    return np.concatenate([[0], positions + 1])[codes + 1], index
+
+
+def _entropy_bits(counts, axis=-1):
+    """ Entropy (bits) of the distributions given by counts along axis, 0 for empty ones """
+    total = counts.sum(axis=axis, keepdims=True)
+    p = np.divide(counts, total, out=np.zeros(counts.shape), where=total > 0)
+    return -np.sum(p * np.log2(p, out=np.zeros(counts.shape), where=p > 0), axis=axis)
+
+
+def _gain(table):
+    """ Information gain of a contingency table (values x classes) """
+    n_values = table.sum(axis=1)
+    n = n_values.sum()
+    if not n:
+        return np.nan
+    return _entropy_bits(table.sum(axis=0)) - np.dot(n_values / n, _entropy_bits(table))
+
+
+class InformationGain(object):
+    """ Information gain of the target for every feature, from contingency tables accumulated chunk by chunk
+
+    information_gain(df, feature, target) of the notebook, for all features at once: each column is
+    factorized once per chunk, and its contingency table with the target (values x classes) is counted with
+    one np.bincount on the joint codes (value code * n_classes + class code), instead of a groupby and a
+    value_counts per value. The tables of the chunks are added up (a value keeps its code from one chunk to
+    the next), so data that does not fit in memory can be screened chunk by chunk (e.g. read_chunks). The
+    columns of a chunk are counted in parallel on n_jobs threads, or processes with backend='loky'.
+
+        IG(feature) = H(target) - sum over values v of P(v) H(target | feature = v)    (bits)
+
+    Missing values of a feature are a value of their own; rows whose target is missing are ignored.
+
+    Args:
+        target (str): name of the target column of the chunks, default 'status_group'
+        features (list): features to screen, default None (all columns but the target)
+        n_jobs (int): number of workers counting the columns, -1 for all cores, default 1
+        backend (str): joblib backend, default 'threading'
+
+    Attributes:
+        tables_ (dict): feature -> contingency table (n_values x n_classes, np.int64), first row: missing values
+        values_ (dict): feature -> pd.Index of the values (row i + 1 of the table)
+        classes_ (pd.Index): classes of the target (columns of the tables)
+
+    Example:
+        screening = InformationGain('status_group')
+        for chunk in read_chunks('train_with_labels.csv'):
+            screening.partial_fit(chunk)
+        screening.information_gain()
+    """
+
+    def __init__(self, target='status_group', features=None, n_jobs=1, backend='threading'):
+        self.target = target
+        self.features = features
+        self.n_jobs = n_jobs
+        self.backend = backend
+
+    def _count(self, values, target_codes, index, table):
+        codes, index = _codes(values, index)
+        n_classes = len(self.classes_)
+        counts = np.bincount(codes * n_classes + target_codes, minlength=(len(index) + 1) * n_classes)
+        counts = counts.reshape(-1, n_classes)
+        counts[:table.shape[0], :table.shape[1]] += table
+        return counts, index
+
+    def partial_fit(self, X, y=None):
+        """ Adds the contingency tables of a chunk
+
+        Args:
+            X (pd.DataFrame): chunk, with the target column unless y is given
+            y (array-like): target of the rows of X, default None (column target of X)
+
+        Returns:
+            InformationGain: self
+        """
+        assert isinstance(X, pd.DataFrame)
+        if y is None:
+            y = X[self.target]
+        features = self.features
+        if features is None:
+            features = [col for col in X.columns if col != self.target]
+        cols_error = list(set(features) - set(X.columns))
+        if cols_error:
+            raise KeyError('[InfGain] DataFrame does not include the columns:', cols_error)
+
+        if not hasattr(self, 'tables_'):
+            self.tables_, self.values_, self.classes_ = {}, {}, pd.Index([])
+        target_codes, self.classes_ = _codes(np.asarray(y), self.classes_)
+        # classes are codes 1..n, the rows with a missing target are dropped
+        rows = target_codes > 0
+        target_codes = target_codes[rows] - 1
+        if not rows.all():
+            X = X.loc[rows]
+
+        empty = np.zeros((0, 0), dtype=np.int64)
+        results = Parallel(n_jobs=self.n_jobs, backend=self.backend)(
+            delayed(self._count)(X[col], target_codes, self.values_.get(col, pd.Index([])),
+                                 self.tables_.get(col, empty))
+            for col in features)
+        for col, (table, index) in zip(features, results):
+            self.tables_[col], self.values_[col] = table, index
+        return self
+
+    def fit(self, X, y=None):
+        """ Contingency tables of X, or of an iterable of chunks (with the target column, y is None) """
+        for attr in ['tables_', 'values_', 'classes_']:
+            if hasattr(self, attr):
+                delattr(self, attr)
+        if isinstance(X, pd.DataFrame):
+            return self.partial_fit(X, y)
+        for chunk in X:
+            self.partial_fit(chunk)
+        return self
+
+    def information_gain(self):
+        """ Information gain (bits) of each feature, highest first
+
+        Returns:
+            pd.Series: information gain indexed by feature
+        """
+        gains = pd.Series({col: _gain(table) for col, table in self.tables_.items()}, dtype=np.float64)
+        return gains.sort_values(ascending=False, kind='mergesort')
+
+
+def information_gain(df, target='status_group', features=None, n_jobs=1, backend='threading'):
+    """ Information gain (bits) of the target for every feature of df, highest first (see InformationGain)
+
+    Args:
+        df (pd.DataFrame): features and target
+        target (str): name of the target column, default 'status_group'
+        features (list): features to screen, default None (all columns but the target)
+        n_jobs (int): number of workers counting the columns, -1 for all cores, default 1
+        backend (str): joblib backend, default 'threading'
+
+    Returns:
+        pd.Series: information gain indexed by feature
+    """
+    return InformationGain(target, features, n_jobs, backend).fit(df).information_gain()
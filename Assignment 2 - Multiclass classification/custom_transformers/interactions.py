@@ -1,28 +1,55 @@
-from sklearn.base import BaseEstimator, TransformerMixin
+from custom_transformers.base import BaseTransformer
 import pandas as pd
 import numpy as np
 
 
-class Interactions(BaseEstimator, TransformerMixin):
+class Interactions(BaseTransformer):
     """Feature creation based on existing categorical variables, interactions between them
-    
+
+    The combinations of values (pairs (<a>, <b>)) of each interaction are learned at fit, in their order of
+    appearance. Their labels '<a><sep><b>' are the categories of the new features (pandas categoricals): the codes
+    are the same for any batch transformed (train, test, chunks, row blocks). A combination not seen at fit is
+    missing, as a combination with a missing value. fit raises ValueError if two combinations have the same label
+    ('a_b' + 'c' and 'a' + 'b_c'), sep has then to be a string which does not occur in the values. Interactions are
+    computed on the integer codes of the two columns (code_a * n_b + code_b), only the combinations present in a
+    batch are looked up. With n_features nothing is learned, the combinations are hashed (stable hash of the two
+    values, identical across runs and machines) into n_features buckets, labelled 0..n_features-1, unseen
+    combinations included.
+
     Args:
         scheme_management_payment (bool): if True creates feature interaction of scheme_management and payment (scheme_management + payment), default True
         basin_source (bool): if True creates feature interaction of basin and source (basin + source), default True
         source_waterpoint_type (bool): if True creates feature interaction of source and waterpoint_type (source + waterpoint_type), default True
-        extraction_waterpoint_type (bool): if True creates feature interaction of extraction and waterpoint_type (extraction + waterpoint_type), default 
+        extraction_waterpoint_type (bool): if True creates feature interaction of extraction and waterpoint_type (extraction + waterpoint_type), default
         True
         water_quality_quantity (bool): if True creates feature interaction of water_quality and quantity (water_quality + quantity), default True
         source_extraction_type (bool): if True creates feature interaction of source and extraction_type (source + extraction_type), default True
         extraction_type_payment (bool): if True creates feature interaction of payment and extraction_type (payment + extraction_type), default True
-           
-    Returns: 
+        n_features (int): number of hash buckets of each interaction, default None (no hashing)
+        sep (str): separator of the two values in the labels, default '_'
+        copy (bool): if True the input DataFrame is left untouched, otherwise it is transformed in place, default True
+
+    Returns:
         pd.DataFrame: transformed pandas DataFrame.
     """
-    
-    def __init__(self, scheme_management_payment=True, basin_source=True, 
-                 source_waterpoint_type=True, extraction_waterpoint_type=True, 
-                 water_quality_quantity=True, source_extraction_type=True, extraction_type_payment=True):
+
+    # feature -> (first column, second column), in the order the features are created
+    _interactions = {
+        'scheme_management_payment': ('scheme_management', 'payment'),
+        'basin_source': ('basin', 'source'),
+        'source_waterpoint_type': ('source', 'waterpoint_type'),
+        'extraction_waterpoint_type': ('extraction_type', 'waterpoint_type'),
+        'source_extraction_type': ('source', 'extraction_type'),
+        'water_quality_quantity': ('water_quality', 'quantity'),
+        'extraction_type_payment': ('extraction_type', 'payment'),
+    }
+
+    _fitted_attributes = ('combinations_', 'categories_')
+
+    def __init__(self, scheme_management_payment=True, basin_source=True,
+                 source_waterpoint_type=True, extraction_waterpoint_type=True,
+                 water_quality_quantity=True, source_extraction_type=True, extraction_type_payment=True,
+                 n_features=None, sep='_', copy=True):
         self.scheme_management_payment = scheme_management_payment
         self.basin_source = basin_source
         self.source_waterpoint_type = source_waterpoint_type
@@ -30,42 +57,108 @@ class Interactions(BaseEstimator, TransformerMixin):
         self.water_quality_quantity = water_quality_quantity
         self.source_extraction_type = source_extraction_type
         self.extraction_type_payment = extraction_type_payment
- 
-    
-    def fit(self,X,y=None):    
+        self.n_features = n_features
+        self.sep = sep
+        self.copy = copy
+
+
+    def _features(self):
+        return [(feature, pair) for feature, pair in self._interactions.items() if getattr(self, feature)]
+
+    def _raise_missing_columns(self, X):
+        cols_error = list(set(['scheme_management', 'basin', 'source', 'population', 'payment', 'waterpoint_type', 'extraction_type', 'water_quality', 'quantity' ]) - set(X.columns))
+        raise KeyError('[Interactions] DataFrame does not include the columns:', cols_error)
+
+    def fit(self, X, y=None):
+
+        assert isinstance(X, pd.DataFrame)
+
+        # feature -> combinations (a, b) seen at fit (Index of tuples), and their labels
+        self.combinations_ = {}
+        self.categories_ = {}
+        if self.n_features is not None:
+            return self
+
+        try:
+            factorized = self._factorize(X)
+            for feature, (first, second) in self._features():
+                _, pairs = self._combinations(factorized[first], factorized[second])
+                labels = pd.Index([str(a) + self.sep + str(b) for a, b in pairs], dtype=object)
+                if not labels.is_unique:
+                    raise ValueError('[Interactions] combinations of %s and %s with the same label, sep=%r occurs in '
+                                     'their values: choose another sep' % (first, second, self.sep))
+                self.combinations_[feature] = pairs
+                self.categories_[feature] = labels
+        except KeyError:
+            self._raise_missing_columns(X)
+
         return self
-    
+
+    def _factorize(self, X):
+        # each column is factorized once, whatever the number of interactions it is part of
+        factorized = {}
+        for _, pair in self._features():
+            for col in pair:
+                if col not in factorized:
+                    factorized[col] = pd.factorize(X.loc[:, col])
+        return factorized
+
+    @staticmethod
+    def _combinations(first, second):
+        """ Combinations of two factorized columns (codes, uniques): codes of the rows (-1 if any of the two values
+        is missing) and unique combinations (Index of tuples), in their order of appearance """
+        codes_a, uniques_a = first
+        codes_b, uniques_b = second
+
+        # -1 (any of the two values missing) stays -1
+        known = (codes_a >= 0) & (codes_b >= 0)
+        codes = np.full(len(codes_a), -1, dtype=np.intp)
+        codes[known], uniques = pd.factorize(codes_a[known].astype(np.int64) * len(uniques_b) + codes_b[known])
+
+        values_a = np.asarray(uniques_a, dtype=object)[uniques // len(uniques_b)]
+        values_b = np.asarray(uniques_b, dtype=object)[uniques % len(uniques_b)]
+        return codes, pd.Index(list(zip(values_a, values_b)), dtype=object, tupleize_cols=False)
+
+    def _interact(self, feature, first, second):
+        """ Interaction of two factorized columns as a categorical, the combinations are looked up (or hashed) for
+        the unique combinations of the batch only """
+        codes, pairs = self._combinations(first, second)
+
+        if self.n_features is None:
+            categories = self.categories_[feature]
+            # combinations not seen at fit: -1
+            lookup = self.combinations_[feature].get_indexer(pairs)
+        else:
+            categories = np.arange(self.n_features)
+            values = pd.DataFrame([pair for pair in pairs], columns=['a', 'b'], dtype=object).astype(str)
+            lookup = pd.util.hash_pandas_object(values, index=False).to_numpy() % np.uint64(self.n_features)
+
+        # code -1 (NA) takes the last entry
+        lookup = np.append(lookup.astype(np.intp), -1)
+        return pd.Categorical.from_codes(lookup[codes], categories=categories)
+
+    def _required_columns(self):
+        columns = []
+        for _, pair in self._features():
+            columns += [col for col in pair if col not in columns]
+        return columns
+
+    def _produced_columns(self):
+        return [feature for feature, _ in self._features()]
+
     def transform(self, X):
-        
+
         assert isinstance(X, pd.DataFrame)
-        
-        try: 
-
-            if self.scheme_management_payment:
-                X.loc[:, 'scheme_management_payment'] = X.loc[:,'scheme_management'] + '_' + X.loc[:,'payment']
-                                                           
-            if self.basin_source:
-                X.loc[:, 'basin_source'] = X.loc[:,'basin'] + '_' + X.loc[:,'source']
-            
-            if self.source_waterpoint_type:
-                X.loc[:, 'source_waterpoint_type'] = X.loc[:,'source'] + '_' + X.loc[:,'waterpoint_type']
-            
-            if self.extraction_waterpoint_type:
-                X.loc[:, 'extraction_waterpoint_type'] = X.loc[:,'extraction_type'] + '_' + X.loc[:,'waterpoint_type']    
-            
-            if self.source_extraction_type:
-                X.loc[:, 'source_waterpoint_type'] = X.loc[:,'source'] + '_' + X.loc[:,'extraction_type']
-            
-            if self.water_quality_quantity:
-                X.loc[:, 'water_quality_quantity'] = X.loc[:,'water_quality'] + '_' + X.loc[:,'quantity']
-            
-            if self.extraction_type_payment:
-                X.loc[:, 'extraction_type_payment'] = X.loc[:,'extraction_type'] + '_' + X.loc[:,'payment']
-                
-            return X                                                                                                                     
-                                                                      
+        self._check_fitted()
+
+        try:
+
+            factorized = self._factorize(X)
+            columns = {}
+            for feature, (first, second) in self._features():
+                columns[feature] = self._interact(feature, factorized[first], factorized[second])
+
+            return self._add_columns(X, columns)
+
         except KeyError:
-            cols_error = list(set(['scheme_management', 'basin', 'source', 'population', 'payment', 'waterpoint_type', 'extraction_type', 'water_quality', 'quantity' ]) - set(X.columns))
-            raise KeyError('[Interactions] DataFrame does not include the columns:', cols_error)
-            
-    
\ No newline at end of file
+            self._raise_missing_columns(X)
@@ -0,0 +1,198 @@
+from custom_transformers.base import BaseTransformer
+from custom_transformers.distance import EARTH_RADIUS_KM, _unit_vectors, _chord_to_km
+from joblib import Parallel, delayed
+from sklearn.neighbors import KDTree
+import pandas as pd
+import numpy as np
+
+
+class NeighborhoodFeatures(BaseTransformer):
+    """Feature creation based on the neighboring waterpoints (great-circle distance on latitude / longitude)
+
+    The fitted waterpoints are indexed in a KD-tree on their points of the unit sphere (the chord between two
+    points gives the same neighbors as the great-circle distance, and is much cheaper). For each waterpoint the
+    neighbors are either the fitted waterpoints within radius km, or its n_neighbors nearest fitted waterpoints,
+    and the following features are created:
+        neighbors_count: number of neighbors (radius) / neighbors_distance: mean distance to the neighbors in km (nearest)
+        neighbors_population: mean population of the neighbors (population 0 and 1 are missing values)
+        neighbors_target: fraction of neighbors whose target is positive_class (e.g. functional waterpoints)
+
+    Use fit_transform on the training data: a waterpoint is never its own neighbor, and neighbors_target of
+    a training waterpoint only uses the waterpoints of the other folds (out-of-fold), so the target does not leak.
+    Queries run by batches of batch_size rows, on n_jobs threads.
+
+    Args:
+        radius (float): radius in km, default None (n_neighbors nearest waterpoints)
+        n_neighbors (int): number of nearest waterpoints if radius is None, default 10
+        population (bool): if True creates feature neighbors_population, default True
+        target (bool): if True creates feature neighbors_target (y is required at fit), default True
+        positive_class: target value counted by neighbors_target, default 'functional'
+        n_folds (int): number of folds of the out-of-fold neighbors_target, default 5
+        n_jobs (int): number of threads of the queries, -1 for all cores, default 1
+        batch_size (int): number of rows per query batch, default 65536
+        random_state (int): random state of the folds, default 289
+        copy (bool): if True the input DataFrame is left untouched, otherwise it is transformed in place, default True
+
+    Returns:
+        pd.DataFrame: transformed pandas DataFrame.
+    """
+
+    _fitted_attributes = ('points_', 'tree_')
+
+    def __init__(self, radius=None, n_neighbors=10, population=True, target=True, positive_class='functional',
+                 n_folds=5, n_jobs=1, batch_size=65536, random_state=289, copy=True):
+        self.radius = radius
+        self.n_neighbors = n_neighbors
+        self.population = population
+        self.target = target
+        self.positive_class = positive_class
+        self.n_folds = n_folds
+        self.n_jobs = n_jobs
+        self.batch_size = batch_size
+        self.random_state = random_state
+        self.copy = copy
+
+    def _points(self, X):
+        try:
+            return _unit_vectors(X.loc[:, 'latitude'].to_numpy(dtype=np.float64),
+                                 X.loc[:, 'longitude'].to_numpy(dtype=np.float64))
+
+        except KeyError:
+            cols_error = list(set(['latitude', 'longitude']) - set(X.columns))
+            raise KeyError('[Neighborhood] DataFrame does not include the columns:', cols_error)
+
+    def fit(self, X, y=None):
+        assert isinstance(X, pd.DataFrame)
+
+        self.points_ = self._points(X)
+        self.tree_ = KDTree(self.points_)
+
+        if self.population:
+            if 'population' not in X.columns:
+                raise KeyError('[Neighborhood] DataFrame does not include the columns:', ['population'])
+            self.population_ = X.population.mask(X.population.isin([0,1])).to_numpy(dtype=np.float64)
+
+        if self.target:
+            if y is None:
+                raise ValueError('[Neighborhood] y is required for the feature neighbors_target, or set target=False')
+            self.target_ = (np.asarray(y) == self.positive_class).astype(np.float64)
+
+        return self
+
+    def _get_state(self):
+        # the KD-tree is not saved (its pickled layout is private to scikit-learn), it is rebuilt from the points
+        state = {'points': self.points_}
+        if self.population:
+            state['population'] = self.population_
+        if self.target:
+            state['target'] = self.target_
+        return state
+
+    def _set_state(self, state):
+        self.points_ = state['points']
+        self.tree_ = KDTree(self.points_)
+        if self.population:
+            self.population_ = state['population']
+        if self.target:
+            self.target_ = state['target']
+
+    def _query_batch(self, tree, points, values, exclude=None):
+        """ Aggregates over the neighbors (in tree) of a batch of points. values are aligned with the points of
+        the tree, exclude gives for each point its own position in the tree (not counted as a neighbor) """
+        n_points = len(points)
+
+        if self.radius is not None:
+            chord = 2 * np.sin(self.radius / (2 * EARTH_RADIUS_KM))
+            neighbors = tree.query_radius(points, r=chord)
+            counts = np.array([len(ind) for ind in neighbors], dtype=np.intp)
+            flat = np.concatenate(neighbors) if n_points else np.array([], dtype=np.intp)
+            owner = np.repeat(np.arange(n_points), counts)
+            keep = np.ones(len(flat), dtype=bool) if exclude is None else flat != exclude[owner]
+            distance = None
+        else:
+            k = min(self.n_neighbors + (exclude is not None), tree.data.shape[0])
+            distance, ind = tree.query(points, k=k)
+            keep = np.ones(ind.shape, dtype=bool)
+            if exclude is not None:
+                keep = ind != exclude[:, None]
+                # rows without themselves among the results (ties) keep their k nearest
+                keep[keep.all(axis=1), -1] = False
+            flat = ind.ravel()
+            owner = np.repeat(np.arange(n_points), k)
+            distance = _chord_to_km(distance.ravel()[keep.ravel()]**2)
+            keep = keep.ravel()
+
+        flat = flat[keep]
+        owner = owner[keep]
+        count = np.bincount(owner, minlength=n_points).astype(np.float64)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if distance is None:
+                result = {'neighbors_count': count}
+            else:
+                result = {'neighbors_distance': np.bincount(owner, weights=distance, minlength=n_points) / count}
+
+            for name, value in values.items():
+                neighbor_values = value[flat]
+                known = ~np.isnan(neighbor_values)
+                total = np.bincount(owner, weights=np.where(known, neighbor_values, 0), minlength=n_points)
+                result[name] = total / np.bincount(owner, weights=known, minlength=n_points)
+
+        return result
+
+    def _query(self, tree, points, values, exclude=None):
+        """ Batched queries on n_jobs threads (KD-tree queries release the GIL) """
+        starts = range(0, len(points), self.batch_size)
+        batches = Parallel(n_jobs=self.n_jobs, prefer='threads')(
+            delayed(self._query_batch)(tree, points[start:start + self.batch_size], values,
+                                       None if exclude is None else exclude[start:start + self.batch_size])
+            for start in starts)
+
+        if not batches:
+            return self._query_batch(tree, points, values, exclude)
+        return {name: np.concatenate([batch[name] for batch in batches]) for name in batches[0]}
+
+    def _values(self):
+        return {'neighbors_population': self.population_} if self.population else {}
+
+    def fit_transform(self, X, y=None):
+        self.fit(X, y)
+
+        # all fitted waterpoints except the waterpoint itself
+        columns = self._query(self.tree_, self.points_, self._values(), exclude=np.arange(len(X)))
+
+        if self.target:
+            # out-of-fold: the neighbors of a waterpoint are taken from the other folds only
+            folds = np.random.RandomState(self.random_state).permutation(len(X)) % self.n_folds
+            target = np.full(len(X), np.nan)
+            for fold in range(self.n_folds):
+                in_fold = folds == fold
+                out_of_fold = np.flatnonzero(~in_fold)
+                tree = KDTree(self.points_[out_of_fold])
+                target[in_fold] = self._query(tree, self.points_[in_fold],
+                                              {'neighbors_target': self.target_[out_of_fold]})['neighbors_target']
+            columns['neighbors_target'] = target
+
+        return self._add_columns(X, columns)
+
+    def _required_columns(self):
+        return ['latitude', 'longitude'] + (['population'] if self.population else [])
+
+    def _produced_columns(self):
+        columns = ['neighbors_count' if self.radius is not None else 'neighbors_distance']
+        if self.population:
+            columns.append('neighbors_population')
+        if self.target:
+            columns.append('neighbors_target')
+        return columns
+
+    def transform(self, X):
+
+        assert isinstance(X, pd.DataFrame)
+        self._check_fitted()
+
+        values = self._values()
+        if self.target:
+            values['neighbors_target'] = self.target_
+
+        return self._add_columns(X, self._query(self.tree_, self._points(X), values))
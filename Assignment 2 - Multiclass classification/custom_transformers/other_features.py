@@ -1,8 +1,8 @@
-from sklearn.base import BaseEstimator, TransformerMixin
+from custom_transformers.base import BaseTransformer
 import pandas as pd
 import numpy as np
 
-class OtherFeatures(BaseEstimator, TransformerMixin):
+class OtherFeatures(BaseTransformer):
     """Feature creation based on existing variables
     
     Feature "dry_season" was inspired by the following research: https://lib.ugent.be/fulltxt/RUG01/002/350/680/RUG01-002350680_2017_0001_AC.pdf
@@ -15,50 +15,88 @@ class OtherFeatures(BaseEstimator, TransformerMixin):
         dry_season (bool): if True creates the feature representing if the season is dry (1), 0 otherwise (if it's wet season)
         num_private (bool): if True transforms num_private into True/False feature
         age (bool): if True creates new feature representing the difference between date recorded and construction year
+        date_format (str): format of date_recorded, default '%Y-%m-%d' (None infers it). Each distinct date is parsed once
+        copy (bool): if True the input DataFrame is left untouched, otherwise it is transformed in place, default True
         
     Returns: 
         pd.DataFrame: transformed pandas DataFrame.
     """
     
-    def __init__(self, type_wpt_name=True, water_per_capita=True, dry_season=True, num_private=True, age=True):
+    # dry season (1) by month, index 0 is unused
+    _dry_months = np.array([0, 1, 1, 0, 0, 0, 1, 1, 1, 1, 1, 0, 0])
+
+    def __init__(self, type_wpt_name=True, water_per_capita=True, dry_season=True, num_private=True, age=True,
+                 date_format='%Y-%m-%d', copy=True):
         self.type_wpt_name = type_wpt_name
         self.water_per_capita = water_per_capita
         self.dry_season = dry_season
         self.num_private = num_private
         self.age = age
+        self.date_format = date_format
+        self.copy = copy
         
     def fit(self,X,y=None):    
         return self
     
+    @staticmethod
+    def _take(values, codes):
+        """ Maps the values computed on the unique values back to the rows, code -1 (NA) gives NaN """
+        if (codes < 0).any():
+            values = np.append(values.astype(np.float64), np.nan)
+        return values[codes]
+    
+    def _wpt_type(self, wpt_name):
+        # first word of the unique names only
+        codes, uniques = pd.factorize(wpt_name)
+        first_word = pd.Index(uniques, dtype=object).str.split(' ', n=1).str[0].str.strip()
+        first_word = first_word.where(first_word != 'Zahanati-Misssion', 'Zahanati')
+        return np.append(first_word.to_numpy(dtype=object), np.nan)[codes]
+    
+    def _required_columns(self):
+        columns = ['wpt_name'] if self.type_wpt_name else []
+        if self.water_per_capita:
+            columns += ['amount_tsh', 'population']
+        if self.dry_season or self.age:
+            columns += ['date_recorded']
+        if self.num_private:
+            columns += ['num_private']
+        if self.age:
+            columns += ['construction_year']
+        return columns
+    
+    def _produced_columns(self):
+        return [name for name in ['type_wpt_name', 'water_per_capita', 'dry_season', 'age'] if getattr(self, name)]
+    
     def transform(self, X):
         
-        assert isinstance(X, pd.DataFrame)
+        X = self._check_input(X)
         
         try: 
 
             if self.type_wpt_name:
-                X.loc[:, 'type_wpt_name'] = X.loc[:,'wpt_name'].apply(lambda x: x.split(' ')[0].strip()).replace('Zahanati-Misssion', 'Zahanati')
+                X['type_wpt_name'] = self._wpt_type(X.loc[:, 'wpt_name'])
     
             if self.water_per_capita:
                 X.loc[:, 'water_per_capita'] = X.loc[:,'amount_tsh'] / (X.loc[:, 'population'] + 1)
             
+            if self.dry_season or self.age:
+                # a few hundred distinct dates: each is parsed once, with an explicit format
+                codes, uniques = pd.factorize(X.loc[:, 'date_recorded'])
+                dates = pd.DatetimeIndex(pd.to_datetime(uniques, format=self.date_format))
+                X['date_recorded'] = np.append(dates.to_numpy(), np.datetime64('NaT'))[codes]
+            
             if self.dry_season:
-                
-                X.loc[:,'date_recorded'] = pd.to_datetime(X.date_recorded)
-                X = X.assign(dry_season = X.date_recorded.dt.month)
-                X.dry_season = X.dry_season.replace([1,2,3,4,5,6,7,8,9,10,11,12],[1,1,0,0,0,1,1,1,1,1,0,0])
+                X['dry_season'] = self._take(self._dry_months[dates.month.to_numpy()], codes)
             
             if self.num_private:
                 X.loc[:, "num_private"] = X.loc[:, 'num_private'].ne(0).astype(int)
                 
             if self.age:
-                X.loc[:,'date_recorded'] = pd.to_datetime(X.date_recorded)
-                X.loc[:, 'age'] = X.loc[:, 'date_recorded'].dt.year - X.loc[:, 'construction_year'] 
+                X['age'] = self._take(dates.year.to_numpy(), codes) - X.loc[:, 'construction_year']
                 
             return X
 
 
         except KeyError:
-            cols_error = list(set(['wpt_name', 'amount_tsh', 'population', 'num_private', 'date_recorded']) - set(X.columns))
+            cols_error = list(set(['wpt_name', 'amount_tsh', 'population', 'num_private', 'date_recorded', 'construction_year']) - set(X.columns))
             raise KeyError('[OtherFeatures] DataFrame does not include the columns:', cols_error)
-            
\ No newline at end of file
@@ -1,52 +1,93 @@
 import pandas as pd
 import numpy as np
-from sklearn.base import BaseEstimator, TransformerMixin
+from custom_transformers.base import BaseTransformer
 
-class OurAdvancedImputer(BaseEstimator, TransformerMixin):
+class OurAdvancedImputer(BaseTransformer):
     """Custom advanced imputation of missing values
+    
+    Population equal to 0 or 1 is considered missing and is replaced by the mean population of 
+    the waterpoint's cluster (column "cluster" created by GeoClustering). The imputer keeps count 
+    and sum of known population per cluster, so the table can be updated with new batches through 
+    partial_fit without refitting on the full history.
         
     Args: 
-        name (type): description
+        population_bucket (bool): if True creates feature with log population binned into 3 buckets, default True
+        copy (bool): if True the input DataFrame is left untouched, otherwise it is transformed in place, default True
         
     Returns: 
         pd.DataFrame: transformed pandas DataFrame with new features
     """
     
-    def __init__(self, population_bucket=True):
+    _fitted_attributes = ('cluster_count_', 'cluster_sum_', 'cluster_population')
+    
+    def __init__(self, population_bucket=True, copy=True):
         self.population_bucket = population_bucket
-        self.cluster_population = {}
+        self.copy = copy
     
     def fit(self, X, y=None):
-        X.loc[X.population.isin([0,1]), 'population'] = np.nan
-        for cluster in X.cluster.unique():
-            population_mean = X.loc[X.cluster==cluster, 'population'].mean()
-            if np.isnan(population_mean):
-                self.cluster_population[cluster] = 0
-            else:
-                self.cluster_population[cluster] = population_mean 
+        self.cluster_count_ = pd.Series(dtype=float)
+        self.cluster_sum_ = pd.Series(dtype=float)
+        
+        return self.partial_fit(X, y)
+    
+    def partial_fit(self, X, y=None):
+        if not hasattr(self, 'cluster_count_'):
+            return self.fit(X, y)
+        
+        population = X.population.mask(X.population.isin([0,1]))
+        stats = population.groupby(X.cluster, sort=False, observed=True).agg(['count', 'sum'])
+        
+        self.cluster_count_ = self.cluster_count_.add(stats['count'], fill_value=0)
+        self.cluster_sum_ = self.cluster_sum_.add(stats['sum'], fill_value=0)
+        self._set_population()
         
         return self
     
+    def _set_population(self):
+        # clusters without any known population are imputed with 0
+        population_mean = (self.cluster_sum_ / self.cluster_count_).fillna(0)
+        self.cluster_population = population_mean.to_dict()
+    
+    def _get_state(self):
+        return {
+            'clusters': self.cluster_count_.index.tolist(),
+            'cluster_count': self.cluster_count_.to_numpy(dtype=np.float64),
+            'cluster_sum': self.cluster_sum_.reindex(self.cluster_count_.index).to_numpy(dtype=np.float64)
+        }
+    
+    def _set_state(self, state):
+        self.cluster_count_ = pd.Series(state['cluster_count'], index=state['clusters'])
+        self.cluster_sum_ = pd.Series(state['cluster_sum'], index=state['clusters'])
+        self._set_population()
+    
+    def _required_columns(self):
+        return ['population', 'cluster']
+    
+    def _produced_columns(self):
+        return ['population_binned'] if self.population_bucket else []
+    
     def transform(self, X):
         
-        assert isinstance(X, pd.DataFrame)
+        X = self._check_input(X)
         
         try:
             X.loc[X.population.isin([0,1]), 'population'] = np.nan
-            X.loc[X.population.isnull(),'population'] = X.apply(lambda row: self.cluster_population.get(row.cluster), axis=1)
+            missing = X.population.isnull()
+            # map of categorical clusters (GeoClustering) gives a categorical, hence the cast
+            X.loc[missing, 'population'] = X.loc[missing, 'cluster'].map(self.cluster_population).astype(float)
             
             if self.population_bucket:
                 population_log = np.log1p(X.population)
                 population_log_binned = pd.cut(population_log, bins=[0,2,6,np.inf], include_lowest=True, labels=[1,2,3])
-                X = X.assign(population_binned = population_log_binned)
+                X['population_binned'] = population_log_binned
                                 
             return X
             
         except KeyError:
-            cols_related = ['population']
+            cols_related = ['population', 'cluster']
             
             cols_error = list(set(cols_related) - set(X.columns))
             raise KeyError('[OurAdvancedImputer] DataFrame does not include the columns:', cols_error)
         
         
-        
\ No newline at end of file
+        
@@ -1,42 +1,53 @@
 import pandas as pd
 import numpy as np
-from sklearn.base import BaseEstimator, TransformerMixin
+from custom_transformers.base import BaseTransformer
 
-class OurSimpleImputer(BaseEstimator, TransformerMixin):
+class OurSimpleImputer(BaseTransformer):
     """Custom imputation of missing values
         
     Args: 
-        name (type): description
+        categorical (bool): if True replaces "unknown"-like values of categorical features by 'unknown', default True
+        coords (bool): if True imputes missing coordinates (longitude 0) with the center of the LGA, default True
+        permit (bool): value used to fill missing permit, default True
+        construction_year (bool): if True imputes missing construction year (0) with the median of the extraction type, default True
+        copy (bool): if True the input DataFrame is left untouched, otherwise it is transformed in place, default True
         
     Returns: 
         pd.DataFrame: transformed pandas DataFrame with new features
     """
     
-    def __init__(self, categorical=True,coords=True,permit=True, construction_year=True):
+    _fitted_attributes = ('lga_coords', 'extraction_dict')
+    
+    def __init__(self, categorical=True,coords=True,permit=True, construction_year=True, copy=True):
         self.permit = permit
         self.categorical = categorical
         self.coords = coords
-        self.lga_coords = {}
         self.construction_year = construction_year
-        self.extraction_dict = {}
+        self.copy = copy
     
     def fit(self, X, y=None):
+        # fitted state is set here only: __init__ keeps the parameters (clone, get_params, cache keys)
+        self.lga_coords = {}
+        self.extraction_dict = {}
+        
         # saving center coordinates of each LGA
         if self.coords:
-            X.loc[X.longitude == 0, ['longitude','latitude']] = np.nan
+            no_coords = X.longitude == 0
+            latitude = X.latitude.mask(no_coords)
+            longitude = X.longitude.mask(no_coords)
             for lga in X.lga.unique():
                 if lga == 'Geita':                    
                     lat = -2.869440
                     lon = 32.234906
                 else:
-                    lat = X.loc[X.lga == lga, 'latitude'].mean()
-                    lon = X.loc[X.lga == lga, 'longitude'].mean()
+                    lat = latitude[X.lga == lga].mean()
+                    lon = longitude[X.lga == lga].mean()
                 self.lga_coords[lga] = (lat, lon)
         
         if self.construction_year:
-            X.loc[X.construction_year.isin([0]), 'construction_year'] = np.nan
+            construction_year = X.construction_year.mask(X.construction_year.isin([0]))
             for cluster in X.extraction_type.unique():
-                year_mean = X.loc[X.extraction_type==cluster, 'construction_year'].median()
+                year_mean = construction_year[X.extraction_type==cluster].median()
                 if np.isnan(year_mean):
                     self.extraction_dict[cluster] = 0
                 else:
@@ -44,17 +55,40 @@ class OurSimpleImputer(BaseEstimator, TransformerMixin):
         
         return self
     
+    def _get_state(self):
+        lgas = list(self.lga_coords)
+        extraction_types = list(self.extraction_dict)
+        return {
+            'lgas': lgas,
+            'lga_coords': np.array([self.lga_coords[lga] for lga in lgas], dtype=np.float64).reshape(-1, 2),
+            'extraction_types': extraction_types,
+            'extraction_years': np.array([self.extraction_dict[e] for e in extraction_types], dtype=np.float64)
+        }
+    
+    def _set_state(self, state):
+        self.lga_coords = {lga: (lat, lon) for lga, (lat, lon) in zip(state['lgas'], state['lga_coords'].tolist())}
+        self.extraction_dict = dict(zip(state['extraction_types'], state['extraction_years'].tolist()))
+    
+    def _required_columns(self):
+        # the other categorical columns are filled if present
+        columns = ['permit'] if self.categorical else []
+        if self.coords:
+            columns += ['longitude', 'latitude', 'lga']
+        if self.construction_year:
+            columns += ['construction_year', 'extraction_type']
+        return columns
+    
     def transform(self, X):
         
-        assert isinstance(X, pd.DataFrame)
+        X = self._check_input(X)
         
         try:
             
             # categorical features
             if self.categorical:
                 na_names = ['Not known', 'not known', '-', 'No', 'no', 'Unknown', '0', 'none']
-                X = X.replace(na_names, np.nan)
-                X = X.fillna({
+                X.replace(na_names, np.nan, inplace=True)
+                X.fillna({
                     'funder': 'unknown', 
                     'installer': 'unknown', 
                     'management': 'unknown', 
@@ -65,19 +99,25 @@ class OurSimpleImputer(BaseEstimator, TransformerMixin):
                     'wpt_name': 'unknown',
                     'scheme_management': 'unknown',
                     'permit': self.permit
-                })
+                }, inplace=True)
                 X.loc[:, 'permit'] = X.loc[:, 'permit'].astype(int)
             
-            # coordinates
+            # coordinates: look up LGA centers for the missing rows only
             if self.coords:
                 X.loc[X.longitude==0, ['longitude', 'latitude']] = np.nan
-                X.loc[X.latitude.isnull(),'latitude'] = X.apply(lambda row: self.lga_coords.get(row.lga)[0], axis=1)
-                X.loc[X.longitude.isnull(),'longitude'] = X.apply(lambda row: self.lga_coords.get(row.lga)[1], axis=1)
-                
-            # construction year
+                lga_lat = {lga: coords[0] for lga, coords in self.lga_coords.items()}
+                lga_lon = {lga: coords[1] for lga, coords in self.lga_coords.items()}
+
+                missing_lat = X.latitude.isnull()
+                X.loc[missing_lat, 'latitude'] = X.loc[missing_lat, 'lga'].map(lga_lat)
+                missing_lon = X.longitude.isnull()
+                X.loc[missing_lon, 'longitude'] = X.loc[missing_lon, 'lga'].map(lga_lon)
+
+            # construction year: median year of the extraction type for the missing rows only
             if self.construction_year:
                 X.loc[X.construction_year==0, 'construction_year'] = np.nan
-                X.loc[X.construction_year.isnull(),'construction_year'] = X.apply(lambda row: self.extraction_dict.get(row.extraction_type), axis=1)
+                missing_year = X.construction_year.isnull()
+                X.loc[missing_year, 'construction_year'] = X.loc[missing_year, 'extraction_type'].map(self.extraction_dict)
                     
             return X
             
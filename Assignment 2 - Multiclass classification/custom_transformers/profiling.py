@@ -0,0 +1,245 @@
+import collections
+import json
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.pipeline import Pipeline
+
+from custom_transformers.base import BaseTransformer
+
+
+def _steps(pipeline, prefix=''):
+    """ (name, step) of a pipeline, nested pipelines flattened with dotted names """
+    for name, step in pipeline.steps:
+        if step is None or step == 'passthrough':
+            continue
+        if isinstance(step, Pipeline):
+            for item in _steps(step, prefix + name + '.'):
+                yield item
+        else:
+            yield prefix + name, step
+
+
+def _column_data(series):
+    """ NumPy array holding the data of a column, None if the column is not backed by one (e.g. Arrow) """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.array.codes
+    if isinstance(series.dtype, np.dtype):
+        # view of the block of the column (datetime64 included), object columns: their pointers
+        return series.to_numpy()
+    return None
+
+
+def _buffers(X):
+    """ column -> (address, nbytes) of the data of each column of a DataFrame (a 2-D array: a single entry),
+    used to find the data of the output of a step that is not shared with its input. Object columns count
+    their pointers only """
+    if isinstance(X, np.ndarray):
+        return {None: (X.__array_interface__['data'][0], X.nbytes)}
+    if not isinstance(X, pd.DataFrame):
+        return {}
+
+    buffers = {}
+    for col, series in X.items():
+        data = _column_data(series)
+        if data is not None:
+            buffers[col] = (data.__array_interface__['data'][0], data.nbytes)
+    return buffers
+
+
+def _shape(X):
+    shape = getattr(X, 'shape', None)
+    if shape is None:
+        return None, None
+    return shape[0], (shape[1] if len(shape) > 1 else 1)
+
+
+class InstrumentedPipeline(BaseEstimator, TransformerMixin):
+    """ Wraps a pipeline and records, for each step and each call of fit / transform / fit_transform:
+    wall time, CPU time (of the process), rows and columns in and out, columns added and dropped, full frame
+    copies (of the custom transformers), output bytes and bytes of the output not shared with the input
+    (allocated by the step), and optionally the peak of the memory allocated during the step (tracemalloc).
+
+    Nested pipelines (e.g. Pipeline([('preprocessing', preprocessing), ('feature_creation', feature_creation)]))
+    are instrumented step by step, with dotted step names. The steps are fit in place, so the wrapped pipeline
+    is fitted as well. The records are available as a list of dicts (trace), JSON lines (to_json) and a
+    summary table (summary), and can be sent to a logger as JSON.
+
+    The recording costs a few microseconds per column and step (memory=True) and nothing per row, so it can
+    be left on; trace_memory=True (tracemalloc) slows the transformers down and is meant for investigations.
+
+    Args:
+        pipeline (sklearn.pipeline.Pipeline): pipeline to instrument
+        memory (bool): True (default) to record output bytes and bytes not shared with the input
+        trace_memory (bool): True to record the peak memory allocated by each step with tracemalloc, default False
+        logger (logging.Logger): logger receiving each record as JSON (level INFO), default None
+        max_records (int): number of records kept (the oldest are dropped), default 10000
+
+    Example:
+        profiled = InstrumentedPipeline(transformation_pipeline)
+        train_prep = profiled.fit_transform(train)
+        profiled.summary()
+    """
+
+    def __init__(self, pipeline, memory=True, trace_memory=False, logger=None, max_records=10000):
+        self.pipeline = pipeline
+        self.memory = memory
+        self.trace_memory = trace_memory
+        self.logger = logger
+        self.max_records = max_records
+
+    @property
+    def records(self):
+        if not hasattr(self, '_records'):
+            self.reset()
+        return self._records
+
+    def reset(self):
+        """ Drops the records """
+        self._records = collections.deque(maxlen=self.max_records)
+        self._run = 0
+
+    def fit(self, X, y=None):
+        self._call('fit', X, y)
+        return self
+
+    def fit_transform(self, X, y=None):
+        return self._call('fit_transform', X, y)
+
+    def transform(self, X):
+        return self._call('transform', X)
+
+    def _call(self, call, X, y=None):
+        records = self.records
+        self._run += 1
+
+        stop_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if stop_tracing:
+            tracemalloc.start()
+
+        try:
+            steps = list(_steps(self.pipeline))
+            buffers = _buffers(X) if self.memory else None
+            for i, (name, step) in enumerate(steps):
+                if call == 'transform':
+                    method = 'transform'
+                elif call == 'fit' and i == len(steps) - 1:
+                    method = 'fit'
+                else:
+                    method = 'fit_transform'
+
+                record, X, buffers = self._profile_step(call, name, step, method, X, y, buffers)
+                records.append(record)
+                if self.logger is not None:
+                    self.logger.info(json.dumps(record))
+        finally:
+            if stop_tracing:
+                tracemalloc.stop()
+
+        return X
+
+    def _profile_step(self, call, name, step, method, X, y, buffers):
+        rows_in, columns_in = _shape(X)
+        copies = BaseTransformer.frame_copies
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            memory_start = tracemalloc.get_traced_memory()[0]
+
+        timestamp = time.time()
+        wall, cpu = time.perf_counter(), time.process_time()
+        if method == 'transform':
+            Xt = step.transform(X)
+        elif method == 'fit':
+            step.fit(X, y)
+            Xt = None
+        elif hasattr(step, 'fit_transform'):
+            Xt = step.fit_transform(X, y)
+        else:
+            Xt = step.fit(X, y).transform(X)
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+
+        record = {
+            'run': self._run, 'call': call, 'step': name, 'class': type(step).__name__, 'method': method,
+            'timestamp': timestamp, 'wall_seconds': wall, 'cpu_seconds': cpu,
+            'rows_in': rows_in, 'columns_in': columns_in, 'rows_out': None, 'columns_out': None,
+            'columns_added': None, 'columns_dropped': None,
+            'frame_copies': BaseTransformer.frame_copies - copies,
+            'output_bytes': None, 'new_bytes': None, 'peak_bytes': None,
+        }
+        if self.trace_memory:
+            record['peak_bytes'] = tracemalloc.get_traced_memory()[1] - memory_start
+
+        if Xt is None:
+            return record, X, buffers
+
+        record['rows_out'], record['columns_out'] = _shape(Xt)
+        if isinstance(X, pd.DataFrame) and isinstance(Xt, pd.DataFrame):
+            before, after = set(X.columns), set(Xt.columns)
+            record['columns_added'] = [col for col in Xt.columns if col not in before]
+            record['columns_dropped'] = [col for col in X.columns if col not in after]
+
+        if buffers is not None:
+            buffers_out = _buffers(Xt)
+            shared = set(address for address, _ in buffers.values())
+            record['output_bytes'] = int(sum(nbytes for _, nbytes in buffers_out.values()))
+            record['new_bytes'] = int(sum(nbytes for address, nbytes in buffers_out.values() if address not in shared))
+            buffers = buffers_out
+
+        return record, Xt, buffers
+
+    def trace(self):
+        """ Records, oldest first
+
+        Returns:
+            List[dict]: one record per step and call
+        """
+        return list(self.records)
+
+    def to_json(self, path=None):
+        """ Records as JSON lines (one record per line), written to path if given
+
+        Returns:
+            str: JSON lines, None if written to path
+        """
+        lines = '\n'.join(json.dumps(record) for record in self.records) + '\n'
+        if path is None:
+            return lines
+        with open(path, 'w') as f:
+            f.write(lines)
+
+    def summary(self):
+        """ Summary table of the records, per call and step: number of calls, total and mean wall time, CPU time,
+        share of the wall time of the call, last rows / columns out, columns added and dropped (last call),
+        frame copies and new bytes per call, peak bytes (max)
+
+        Returns:
+            pd.DataFrame: one row per (call, step), in the order of the steps
+        """
+        records = pd.DataFrame(self.trace())
+        if records.empty:
+            return records
+
+        for col in ['columns_added', 'columns_dropped']:
+            records['n_' + col] = records[col].map(lambda columns: np.nan if columns is None else len(columns))
+
+        summary = records.groupby(['call', 'step'], sort=False).agg(
+            calls=('wall_seconds', 'size'),
+            wall_seconds=('wall_seconds', 'sum'),
+            mean_wall_seconds=('wall_seconds', 'mean'),
+            cpu_seconds=('cpu_seconds', 'sum'),
+            rows_out=('rows_out', 'last'),
+            columns_out=('columns_out', 'last'),
+            columns_added=('n_columns_added', 'last'),
+            columns_dropped=('n_columns_dropped', 'last'),
+            frame_copies=('frame_copies', 'mean'),
+            new_mb=('new_bytes', 'mean'),
+            peak_mb=('peak_bytes', 'max'),
+        )
+        counts = ['rows_out', 'columns_out', 'columns_added', 'columns_dropped']
+        summary[counts] = summary[counts].astype('Int64')
+        summary['wall_share'] = summary['wall_seconds'] / summary.groupby(level='call')['wall_seconds'].transform('sum')
+        summary[['new_mb', 'peak_mb']] = summary[['new_mb', 'peak_mb']].astype(np.float64) / 2**20
+        return summary
@@ -0,0 +1,16 @@
+import numpy as np
+
+# dtypes of the columns of data/train.csv and data/test.csv, for pd.read_csv and custom_transformers.columns.read_csv.
+# public_meeting and permit (True / False with missing values) are left to pandas, which parses them as booleans
+# in an object column: with dtype object they would stay strings
+DTYPES = {
+    'id': np.int64, 'amount_tsh': np.float64, 'date_recorded': object, 'funder': object, 'gps_height': np.int64,
+    'installer': object, 'longitude': np.float64, 'latitude': np.float64, 'wpt_name': object,
+    'num_private': np.int64, 'basin': object, 'subvillage': object, 'region': object, 'region_code': np.int64,
+    'district_code': np.int64, 'lga': object, 'ward': object, 'population': np.int64, 'recorded_by': object,
+    'scheme_management': object, 'scheme_name': object, 'construction_year': np.int64, 'extraction_type': object,
+    'extraction_type_group': object, 'extraction_type_class': object, 'management': object,
+    'management_group': object, 'payment': object, 'payment_type': object, 'water_quality': object,
+    'quality_group': object, 'quantity': object, 'quantity_group': object, 'source': object, 'source_type': object,
+    'source_class': object, 'waterpoint_type': object, 'waterpoint_type_group': object
+}
@@ -0,0 +1,145 @@
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+def read_chunks(path, chunksize=100000, **read_csv_kwargs):
+    """ Reads a CSV file as an iterator of DataFrames of at most chunksize rows
+
+    Args:
+        path (str): path of the CSV file
+        chunksize (int): number of rows per chunk, default 100000
+        read_csv_kwargs: other arguments of pd.read_csv
+
+    Returns:
+        Iterator of pd.DataFrame
+    """
+    return pd.read_csv(path, chunksize=chunksize, **read_csv_kwargs)
+
+
+def transform_chunks(pipeline, chunks):
+    """ Transforms chunks one by one with an already fitted pipeline (or transformer)
+
+    Only transformers which are row-local after fit give the same rows as a transform of the whole
+    frame, which is the case of all custom_transformers.
+
+    Args:
+        pipeline (sklearn.pipeline.Pipeline): fitted pipeline
+        chunks (Iterable): iterable of pd.DataFrame
+
+    Returns:
+        Iterator of transformed chunks
+    """
+    for chunk in chunks:
+        yield pipeline.transform(chunk)
+
+
+class CSVChunkWriter(object):
+    """ Writes DataFrames to a single CSV file, the header is written with the first chunk
+
+    Args:
+        path (str): path of the output file, overwritten if it exists
+        index (bool): if True writes the index of the chunks, default False
+    """
+
+    def __init__(self, path, index=False):
+        self.path = path
+        self.index = index
+        self.rows = 0
+
+    def write(self, chunk):
+        chunk.to_csv(self.path, mode='a' if self.rows else 'w', header=not self.rows, index=self.index)
+        self.rows += len(chunk)
+
+    def close(self):
+        if not self.rows:
+            # an empty input still gives a (empty) file
+            open(self.path, 'w').close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ParquetChunkWriter(object):
+    """ Writes DataFrames to a single Parquet file, one row group per chunk (requires pyarrow)
+
+    The schema of the file is the schema of the first chunk, the following chunks are converted to it.
+
+    Args:
+        path (str): path of the output file, overwritten if it exists
+        index (bool): if True writes the index of the chunks, default False
+        compression (str): Parquet compression codec, default 'snappy'
+    """
+
+    def __init__(self, path, index=False, compression='snappy'):
+        if pyarrow is None:
+            raise ImportError('pyarrow is required to write Parquet files')
+        self.path = path
+        self.index = index
+        self.compression = compression
+        self.rows = 0
+        self.writer = None
+
+    def write(self, chunk):
+        if self.writer is None:
+            table = pyarrow.Table.from_pandas(chunk, preserve_index=self.index)
+            self.writer = pyarrow.parquet.ParquetWriter(self.path, table.schema, compression=self.compression)
+        else:
+            table = pyarrow.Table.from_pandas(chunk, schema=self.writer.schema, preserve_index=self.index)
+        self.writer.write_table(table)
+        self.rows += len(chunk)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def stream_transform(pipeline, source, output, chunksize=100000, output_format=None, **read_csv_kwargs):
+    """ Transforms a CSV file (or an iterable of DataFrames) chunk by chunk with an already fitted pipeline
+    and writes the result incrementally, so memory use is bounded by the chunk size and not by the file size
+
+    Args:
+        pipeline (sklearn.pipeline.Pipeline): fitted pipeline
+        source (str or Iterable): path of a CSV file, or iterable of pd.DataFrame
+        output (str): path of the output file
+        chunksize (int): number of rows per chunk when source is a CSV file, default 100000
+        output_format (str): 'csv' or 'parquet', default inferred from the extension of output (.parquet / .pq)
+        read_csv_kwargs: other arguments of pd.read_csv when source is a CSV file
+
+    Returns:
+        int: number of rows written
+    """
+    if output_format is None:
+        output_format = 'parquet' if os.path.splitext(output)[1].lower() in ('.parquet', '.pq') else 'csv'
+
+    if output_format == 'csv':
+        writer = CSVChunkWriter(output)
+    elif output_format == 'parquet':
+        writer = ParquetChunkWriter(output)
+    else:
+        raise ValueError('output_format should be either "csv" or "parquet", got %r' % output_format)
+
+    if isinstance(source, str):
+        source = read_chunks(source, chunksize=chunksize, **read_csv_kwargs)
+
+    with writer:
+        for chunk in transform_chunks(pipeline, source):
+            writer.write(chunk)
+
+    return writer.rows
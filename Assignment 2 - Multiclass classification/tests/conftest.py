@@ -0,0 +1,67 @@
+""" Tests of the custom_transformers package of this assignment: parity checks of the transform modes (parallel,
+chunked, record), artifacts and planned reads. Run python -m pytest -q from the repository root or this folder """
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ASSIGNMENT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _package_modules():
+    return {name: module for name, module in sys.modules.items() if name.split('.')[0] == 'custom_transformers'}
+
+
+def _use_package(modules):
+    # both assignments have a package named custom_transformers: the one of this assignment is put in sys.modules
+    # and first in sys.path, so that the transformers (e.g. artifacts, joblib workers) import from it
+    for name in _package_modules():
+        del sys.modules[name]
+    sys.modules.update(modules)
+    if ASSIGNMENT in sys.path:
+        sys.path.remove(ASSIGNMENT)
+    sys.path.insert(0, ASSIGNMENT)
+
+
+_use_package({})
+import custom_transformers  # noqa: E402
+
+MODULES = _package_modules()
+
+
+def _load_benchmark_module(name):
+    # benchmarks/<name>.py of this assignment, under a name of its own (the other assignment has the same files)
+    module_name = '%s_%s' % (os.path.basename(ASSIGNMENT).split(' - ')[0].replace(' ', '_').lower(), name)
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(ASSIGNMENT, 'benchmarks', name + '.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+PIPELINES = _load_benchmark_module('pipelines')
+SYNTHETIC = _load_benchmark_module('synthetic')
+
+
+def pytest_collectstart(collector):
+    # the test modules of this folder are imported with the package of this assignment
+    _use_package(MODULES)
+
+
+@pytest.fixture(autouse=True)
+def package():
+    _use_package(MODULES)
+    yield custom_transformers
+    MODULES.update(_package_modules())
+
+
+@pytest.fixture(scope='session')
+def pipelines():
+    """ benchmarks/pipelines.py: pipelines of the notebook """
+    return PIPELINES
+
+
+@pytest.fixture(scope='session')
+def synthetic():
+    """ benchmarks/synthetic.py: data of the size needed """
+    return SYNTHETIC
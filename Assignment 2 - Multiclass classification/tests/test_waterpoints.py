@@ -0,0 +1,313 @@
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.exceptions import NotFittedError
+from sklearn.metrics.pairwise import haversine_distances
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer
+from sklearn.utils.validation import check_is_fitted
+
+from custom_transformers import DTYPES, InformationGain, Interactions, NeighborhoodFeatures, information_gain
+from custom_transformers import CachedTransformer, InstrumentedPipeline, OurSimpleImputer, TransformerCache
+from custom_transformers import DataCorrection, Distance, GeoClustering, OtherFeatures, OurAdvancedImputer
+from custom_transformers import load_pipeline, read_csv, save_pipeline
+from custom_transformers.distance import EARTH_RADIUS_KM
+from custom_transformers.parallel import parallel_transform
+from custom_transformers.streaming import CSVChunkWriter, ParquetChunkWriter, stream_transform, transform_chunks
+
+
+@pytest.fixture(scope='module')
+def data(synthetic):
+    return synthetic.make_waterpoints(4000)
+
+
+@pytest.fixture(scope='module')
+def labels(synthetic):
+    return synthetic.make_labels(4000)
+
+
+def read_output(path):
+    return pd.read_parquet(path) if path.endswith('.parquet') else pd.read_csv(path)
+
+
+@pytest.mark.parametrize('output_format', ['csv', 'parquet'])
+def test_stream_transform_equals_transform(data, labels, pipelines, tmp_path, output_format):
+    if output_format == 'parquet':
+        pytest.importorskip('pyarrow')
+    path = str(tmp_path / 'input.csv')
+    data.to_csv(path, index=False)
+    pipeline = pipelines.make_transformation().fit(pd.read_csv(path), labels)
+
+    output = str(tmp_path / ('stream.' + output_format))
+    # the last chunk is shorter than the others
+    assert stream_transform(pipeline, path, output, chunksize=700) == len(data)
+
+    whole = str(tmp_path / ('whole.' + output_format))
+    with (ParquetChunkWriter(whole) if output_format == 'parquet' else CSVChunkWriter(whole)) as writer:
+        writer.write(pipeline.transform(pd.read_csv(path)))
+    pd.testing.assert_frame_equal(read_output(output), read_output(whole))
+
+
+@pytest.mark.parametrize('n_features', [None, 16])
+def test_interactions_same_on_split_batches(data, n_features):
+    interactions = Interactions(n_features=n_features).fit(data.iloc[:3000])
+    expected = interactions.transform(data)
+
+    chunks = (data.iloc[start:start + 150] for start in range(0, len(data), 150))
+    result = pd.concat(list(transform_chunks(interactions, chunks)))
+    pd.testing.assert_frame_equal(result, expected)
+    for feature in Interactions._interactions:
+        assert isinstance(result[feature].dtype, pd.CategoricalDtype)
+
+
+def test_interactions_unseen_and_ambiguous_combinations():
+    X = pd.DataFrame({'scheme_management': ['a_b', 'a', 'a', None], 'payment': ['c', 'b_c', 'c', 'c']})
+    interactions = Interactions(basin_source=False, source_waterpoint_type=False, extraction_waterpoint_type=False,
+                                water_quality_quantity=False, source_extraction_type=False,
+                                extraction_type_payment=False)
+
+    # 'a_b' + 'c' and 'a' + 'b_c' have the same label
+    with pytest.raises(ValueError):
+        interactions.fit(X.iloc[:2])
+
+    result = interactions.set_params(sep='|').fit(X.iloc[:2]).transform(X).scheme_management_payment
+    # ('a', 'c') was not seen at fit
+    assert list(result.cat.categories) == ['a_b|c', 'a|b_c']
+    assert list(result.cat.codes) == [0, 1, -1, -1]
+
+
+@pytest.mark.parametrize('strategy', ['haversine', 'manhattan'])
+@pytest.mark.parametrize('algorithm', ['brute', 'ball_tree'])
+def test_distance_nearest_missing_coordinates(data, algorithm, strategy):
+    X = data.iloc[:300].copy()
+    X.iloc[:10, X.columns.get_loc('latitude')] = np.nan
+    X.iloc[5:15, X.columns.get_loc('longitude')] = np.nan
+    landmarks = data.iloc[300:350].loc[:, ['latitude', 'longitude']].set_axis(['l%d' % i for i in range(50)])
+    distance = Distance(landmarks=landmarks, output='nearest', n_nearest=2, strategy=strategy,
+                        algorithm=algorithm).fit(X)
+
+    result = distance.transform(X)
+    assert result.iloc[:15].loc[:, distance._produced_columns()].isnull().all().all()
+    pd.testing.assert_frame_equal(result.iloc[15:], distance.transform(X.iloc[15:]))
+
+
+def test_parallel_transform_equals_serial(data, labels, pipelines):
+    pipeline = pipelines.make_transformation().fit(data, labels)
+    expected = pipeline.transform(data)
+
+    # small blocks: each block sees only part of the levels
+    result = parallel_transform(pipeline, data, n_jobs=2, n_blocks=40, backend='threading')
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_parallel_transform_merges_categories():
+    X = pd.DataFrame({'level': ['a', 'b', 'c', 'a', 'd', 'b'], 'value': range(6)})
+    # the categories of each block are the levels of the block
+    to_category = FunctionTransformer(lambda X: X.astype({'level': 'category'}))
+
+    result = parallel_transform(to_category, X, n_jobs=2, n_blocks=3, backend='threading')
+    assert list(result.level.cat.categories) == ['a', 'b', 'c', 'd']
+    pd.testing.assert_series_equal(result.level.astype(object), X.level)
+
+
+def test_cache_output_modified_in_place(data, tmp_path):
+    X = data.iloc[:1000]
+    out = CachedTransformer(OurSimpleImputer(), str(tmp_path)).fit_transform(X)
+    CachedTransformer(OurSimpleImputer(), str(tmp_path)).fit_transform(out)
+
+    out['gps_height'] += 1000
+    result = CachedTransformer(OurSimpleImputer(), str(tmp_path)).fit_transform(out)
+    pd.testing.assert_frame_equal(result, OurSimpleImputer().fit_transform(out))
+
+
+def test_cache_size_and_eviction(data, tmp_path):
+    X = data.iloc[:1000]
+    cache = TransformerCache(str(tmp_path))
+    for i in range(3):
+        cache.store('entry-%d' % i, X)
+    size = cache.info()['bytes'] // 3
+
+    cache.max_bytes = 2 * size + size // 2
+    cache.store('entry-3', X)
+    assert sorted(os.listdir(str(tmp_path))) == ['entry-2', 'entry-3']
+    assert cache.info()['bytes'] == 2 * size
+
+
+def test_artifacts_round_trip(data, labels, pipelines, tmp_path):
+    steps = pipelines.make_transformation().steps
+    pipeline = Pipeline(steps[:-1] + [('neighborhood', NeighborhoodFeatures())] + steps[-1:])
+    pipeline.fit(data.iloc[:3000], labels.iloc[:3000])
+    save_pipeline(pipeline, str(tmp_path / 'pipeline'))
+
+    batch = data.iloc[3000:]
+    pd.testing.assert_frame_equal(load_pipeline(str(tmp_path / 'pipeline')).transform(batch),
+                                  pipeline.transform(batch))
+
+
+def test_geo_clustering_round_trip(data, tmp_path):
+    X = OurSimpleImputer(categorical=False).fit_transform(data)
+    clustering = GeoClustering(n_clusters=8, minibatch=True).fit(X.iloc[:3000])
+    save_pipeline(clustering, str(tmp_path / 'clustering'))
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        loaded = load_pipeline(str(tmp_path / 'clustering'))
+        pd.testing.assert_frame_equal(loaded.transform(X.iloc[3000:]), clustering.transform(X.iloc[3000:]))
+
+        # warm start from the loaded centroids
+        loaded.partial_fit(X.iloc[3000:])
+        assert loaded.cluster_centers_.shape == (8, 2)
+
+        # duplicate centroids (e.g. given by init_centroids) are kept as they are
+        state = clustering._get_state()
+        state['centroids'] = np.vstack([state['centroids'][:7], state['centroids'][:1]])
+        duplicates = GeoClustering(n_clusters=8)
+        duplicates._set_state(state)
+        assert set(duplicates.transform(X).cluster.cat.codes) <= set(range(7))
+
+
+@pytest.mark.parametrize('transformer', [OurSimpleImputer(), GeoClustering(), OurAdvancedImputer(), Distance(),
+                                         Interactions(), NeighborhoodFeatures()])
+def test_transform_before_fit_raises(data, transformer):
+    with pytest.raises(NotFittedError):
+        transformer.transform(data)
+
+    # the transformers without fitted state are fitted
+    check_is_fitted(DataCorrection())
+
+
+@pytest.mark.parametrize('copy', [True, False])
+def test_planned_read_equals_full_read(labels, pipelines, synthetic, tmp_path, copy):
+    def make(copy):
+        return pipelines.make_transformation(copy, meaningless_features=True).set_params(
+            meaningless_features__errors='ignore', drop__errors='ignore')
+
+    path = str(tmp_path / 'train.csv')
+    whole = synthetic.make_waterpoints(len(labels), full_schema=True).loc[:, synthetic.COLUMNS]
+    whole.astype({'population': 'int64', 'construction_year': 'int64'}).to_csv(path, index=False)
+
+    planned = read_csv(path, make(copy), dtype=DTYPES)
+    assert planned.shape[1] < len(synthetic.COLUMNS)
+
+    expected = make(copy).fit_transform(pd.read_csv(path, dtype=DTYPES), labels)
+    pd.testing.assert_frame_equal(make(copy).fit_transform(planned, labels), expected)
+
+
+def test_information_gain_by_chunks_equals_whole(data, labels):
+    df = data.assign(status_group=labels.to_numpy())
+    expected = information_gain(df)
+
+    chunks = (df.iloc[start:start + 300] for start in range(0, len(df), 300))
+    pd.testing.assert_series_equal(InformationGain().fit(chunks).information_gain(), expected,
+                                   check_exact=False, rtol=1e-10)
+    np.testing.assert_array_less(-1e-12, expected.to_numpy())
+
+
+def test_data_correction_equals_row_wise(data):
+    X = data.loc[:, ['installer', 'funder']].fillna('unknown')
+    # former implementation: government names are grouped, then every name is lower-cased row by row
+    expected = X.copy()
+    for col in ['installer', 'funder']:
+        government = expected[col].str.lower().str.slice(stop=5).isin(['gover', 'centr', 'tanza', 'cetra'])
+        expected.loc[government, col] = 'government'
+        expected[col] = [name.lower()[:4] for name in expected[col]]
+
+    result = DataCorrection(installer=True, funder=True).transform(X)
+    pd.testing.assert_frame_equal(result, expected)
+    # government names are grouped and the input is left untouched (copy=True)
+    assert (result.installer == 'gove').any() and not X.installer.equals(result.installer)
+
+    # missing names stay missing
+    missing = DataCorrection(installer=True).transform(pd.DataFrame({'installer': ['Central Gov', None, 'DWE']}))
+    assert missing.installer.tolist()[::2] == ['gove', 'dwe'] and pd.isna(missing.installer[1])
+
+
+@pytest.mark.parametrize('radius', [None, 20])
+def test_neighborhood_equals_brute_force(data, labels, radius):
+    # distinct coordinates: no ties among the nearest waterpoints
+    X = data.iloc[:600].drop_duplicates(['latitude', 'longitude'])
+    y = labels.iloc[:600][X.index]
+    train, test = X.iloc[:400], X.iloc[400:]
+    neighborhood = NeighborhoodFeatures(radius=radius, n_neighbors=5, batch_size=64, n_jobs=2)
+
+    km = haversine_distances(np.radians(test.loc[:, ['latitude', 'longitude']]),
+                             np.radians(train.loc[:, ['latitude', 'longitude']])) * EARTH_RADIUS_KM
+    neighbors = km <= radius if radius is not None else km <= np.sort(km, axis=1)[:, [4]]
+    population = train.population.mask(train.population.isin([0, 1])).to_numpy()
+    functional = (y.iloc[:400] == 'functional').to_numpy()
+
+    result = neighborhood.fit(train, y.iloc[:400]).transform(test)
+    if radius is None:
+        np.testing.assert_allclose(result.neighbors_distance, np.sort(km, axis=1)[:, :5].mean(axis=1))
+    else:
+        np.testing.assert_array_equal(result.neighbors_count, neighbors.sum(axis=1))
+    with np.errstate(invalid='ignore'):
+        known = neighbors & ~np.isnan(population)
+        np.testing.assert_allclose(result.neighbors_population,
+                                   np.where(known, population, 0).sum(axis=1) / known.sum(axis=1))
+        np.testing.assert_allclose(result.neighbors_target,
+                                   (neighbors & functional).sum(axis=1) / neighbors.sum(axis=1))
+
+    # on the training data a waterpoint is not its own neighbor
+    km = haversine_distances(np.radians(train.loc[:, ['latitude', 'longitude']])) * EARTH_RADIUS_KM
+    np.fill_diagonal(km, np.inf)
+    result = neighborhood.fit_transform(train, y.iloc[:400])
+    if radius is None:
+        np.testing.assert_allclose(result.neighbors_distance, np.sort(km, axis=1)[:, :5].mean(axis=1))
+    else:
+        np.testing.assert_array_equal(result.neighbors_count, (km <= radius).sum(axis=1))
+
+
+def test_other_features_equals_row_wise(data):
+    X = data.iloc[:2000]
+    # former implementation: dates parsed and features computed row by row
+    expected = X.copy()
+    expected['type_wpt_name'] = [name.split(' ')[0].strip() for name in X.wpt_name]
+    expected['type_wpt_name'] = expected.type_wpt_name.replace('Zahanati-Misssion', 'Zahanati')
+    expected['water_per_capita'] = X.amount_tsh / (X.population + 1)
+    expected['date_recorded'] = pd.to_datetime(X.date_recorded)
+    expected['dry_season'] = expected.date_recorded.dt.month.map({1: 1, 2: 1, 3: 0, 4: 0, 5: 0, 6: 1, 7: 1, 8: 1,
+                                                                  9: 1, 10: 1, 11: 0, 12: 0})
+    expected['num_private'] = X.num_private.ne(0).astype(int)
+    expected['age'] = expected.date_recorded.dt.year - X.construction_year
+
+    for date_format in ['%Y-%m-%d', None]:
+        result = OtherFeatures(date_format=date_format).transform(X)
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+    # missing dates give missing features
+    result = OtherFeatures(type_wpt_name=False).transform(X.iloc[:3].assign(date_recorded=[None, '2011-03-14', None]))
+    assert result.dry_season.isna().tolist() == [True, False, True] and result.age.isna().sum() == 2
+
+
+def test_instrumented_pipeline_records_steps(data, labels, pipelines, tmp_path):
+    expected = pipelines.make_transformation().fit_transform(data, labels)
+    steps = pipelines.make_transformation().steps
+    # nested pipelines are instrumented step by step
+    nested = Pipeline([('preprocessing', Pipeline(steps[:2])), ('features', Pipeline(steps[2:]))])
+    profiled = InstrumentedPipeline(nested)
+
+    pd.testing.assert_frame_equal(profiled.fit_transform(data, labels), expected)
+    pd.testing.assert_frame_equal(profiled.transform(data), expected)
+
+    trace = profiled.trace()
+    names = ['preprocessing.' + name for name, _ in steps[:2]] + ['features.' + name for name, _ in steps[2:]]
+    assert [record['step'] for record in trace] == names * 2
+    assert [record['call'] for record in trace] == ['fit_transform'] * len(steps) + ['transform'] * len(steps)
+
+    records = {record['step']: record for record in trace[len(steps):]}
+    assert records['features.geo_clusters']['columns_added'] == ['cluster']
+    assert records['features.geo_clusters']['frame_copies'] == 1
+    assert records['features.drop']['columns_dropped'] == ['date_recorded', 'longitude', 'latitude', 'num_private']
+    assert (trace[-1]['rows_out'], trace[-1]['columns_out']) == expected.shape
+    assert all(0 < record['new_bytes'] <= record['output_bytes'] for record in trace)
+
+    summary = profiled.summary()
+    assert summary.loc[('transform', 'features.drop'), 'columns_out'] == expected.shape[1]
+    np.testing.assert_allclose(summary.groupby(level='call').wall_share.sum(), 1)
+
+    profiled.to_json(str(tmp_path / 'trace.jsonl'))
+    assert pd.read_json(str(tmp_path / 'trace.jsonl'), lines=True).step.tolist() == names * 2
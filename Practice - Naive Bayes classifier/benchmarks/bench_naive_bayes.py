@@ -0,0 +1,128 @@
+""" Throughput of the Naive Bayes classifier (naive_bayes.py) against the notebook, in tweets per second
+
+Scores a batch of tweets sampled from data/appWords.txt and data/otherWords.txt with
+NaiveBayesTextClassifier (fit on data/appFreqs.csv and data/otherFreqs.csv), at once and by chunks,
+and a few of them with the approach of the notebook (one scan of the frequency table per word,
+tweets one at a time, with Laplace smoothing so that both give the same scores). The scores are
+checked against the notebook and an exact dictionary implementation on the tweets without words sharing
+a hash bucket, and the share of all tweets with the same prediction as the exact implementation is
+reported.
+
+Usage (from the practice folder):
+    python benchmarks/bench_naive_bayes.py --tweets 1000000 --chunk 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+PRACTICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PRACTICE_DIR)
+
+from naive_bayes import NaiveBayesTextClassifier, read_counts, read_labeled_tweets
+
+DATA_DIR = os.path.join(PRACTICE_DIR, 'data')
+
+
+def make_tweets(n_tweets, seed=289):
+    """ Tweets of data/appWords.txt (APP) and data/otherWords.txt (OTHER) sampled with replacement """
+    tweets, labels = [], []
+    for label, file_name in [('APP', 'appWords.txt'), ('OTHER', 'otherWords.txt')]:
+        with open(os.path.join(DATA_DIR, file_name), encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        tweets.extend(lines)
+        labels.extend([label] * len(lines))
+    rows = np.random.RandomState(seed).randint(len(tweets), size=n_tweets)
+    return np.array(tweets, dtype=object)[rows], np.array(labels, dtype=object)[rows]
+
+
+def notebook_scores(tweets, tables, alpha=1.0):
+    """ Scores of the notebook: the frequency table is scanned for each word of each tweet """
+    vocabulary_size = len(set(tables['APP']['word']) | set(tables['OTHER']['word']))
+
+    def freq(word, df):
+        values = df.loc[df['word'] == word, 'count'].values
+        count = values[0] if len(values) else 0
+        return np.log((count + alpha) / (df['count'].sum() + alpha * vocabulary_size))
+
+    def prob_tweet(tweet):
+        words = tweet.split()
+        return [sum([freq(word, tables[label]) for word in words]) + np.log(0.5) for label in ['APP', 'OTHER']]
+
+    return np.array(pd.Series(tweets).apply(prob_tweet).tolist())
+
+
+def exact_scores(tweets, counts, alpha=1.0):
+    """ Same model on an exact vocabulary (dictionaries), to check the hashed one """
+    vocabulary_size = len(set(counts['APP'].index) | set(counts['OTHER'].index))
+    scores = []
+    for label in ['APP', 'OTHER']:
+        log_prob = dict(np.log((counts[label] + alpha) / (counts[label].sum() + alpha * vocabulary_size)))
+        unknown = np.log(alpha / (counts[label].sum() + alpha * vocabulary_size))
+        scores.append([sum(log_prob.get(word, unknown) for word in tweet.split()) + np.log(0.5) for tweet in tweets])
+    return np.array(scores).T
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tweets', type=int, default=1000000)
+    parser.add_argument('--chunk', type=int, default=100000, help='tweets per chunk of the chunked run')
+    parser.add_argument('--notebook-tweets', type=int, default=200, help='tweets scored with the notebook')
+    args = parser.parse_args()
+
+    counts = {'APP': read_counts(os.path.join(DATA_DIR, 'appFreqs.csv')),
+              'OTHER': read_counts(os.path.join(DATA_DIR, 'otherFreqs.csv'))}
+    classifier = NaiveBayesTextClassifier().fit_counts(counts)
+    tweets, labels = make_tweets(args.tweets)
+
+    # tweets with a word sharing its bucket with another word of the vocabulary score differently
+    words = pd.Index(counts['APP'].index).union(counts['OTHER'].index).astype(str)
+    buckets = pd.Series(classifier.hash_words(words).indices, index=words)
+    collided = set(buckets[buckets.duplicated(keep=False)].index)
+    exact = np.array([not collided.intersection(tweet.split()) for tweet in tweets])
+
+    sample = tweets[:args.notebook_tweets]
+    tables = {label: count.rename('count').rename_axis('word').reset_index() for label, count in counts.items()}
+    start = time.perf_counter()
+    expected = notebook_scores(sample, tables)
+    notebook_time = time.perf_counter() - start
+    np.testing.assert_allclose(classifier.decision_function(sample)[exact[:len(sample)]],
+                               expected[exact[:len(sample)]], rtol=1e-12)
+
+    check = tweets[:20000]
+    expected = exact_scores(check, counts)
+    np.testing.assert_allclose(classifier.decision_function(check)[exact[:len(check)]],
+                               expected[exact[:len(check)]], rtol=1e-12)
+    agreement = np.mean(classifier.predict(check) == classifier.classes_.take(np.argmax(expected, axis=1)))
+    test = read_labeled_tweets(os.path.join(DATA_DIR, 'test.csv'))
+    print('%d collisions (%.2f%% of the tweets), other tweets: scores equal to the notebook (%d tweets) and to an '
+          'exact vocabulary (%d tweets)' % (classifier.collisions_, 100 * (1 - exact.mean()), len(sample), len(check)))
+    print('same prediction as the exact vocabulary: %.2f%% of the tweets, test.csv accuracy: %.2f'
+          % (100 * agreement, classifier.score(test['tweet'], test['label'])))
+
+    start = time.perf_counter()
+    X = classifier.vectorize(tweets)
+    vectorize_time = time.perf_counter() - start
+    start = time.perf_counter()
+    predictions = classifier.predict(X)
+    score_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    chunked = np.concatenate([classifier.predict(tweets[i:i + args.chunk]) for i in range(0, len(tweets), args.chunk)])
+    chunked_time = time.perf_counter() - start
+    assert np.array_equal(chunked, predictions)
+
+    print('%d tweets, accuracy on the corpora: %.3f' % (len(tweets), np.mean(predictions == labels)))
+    print('%-40s %10s %14s' % ('', 'seconds', 'tweets / s'))
+    print('%-40s %10.3f %14.0f' % ('notebook (%d tweets)' % len(sample), notebook_time, len(sample) / notebook_time))
+    for label, seconds in [('vectorize (hashing)', vectorize_time), ('score (sparse product)', score_time),
+                           ('vectorize + score', vectorize_time + score_time),
+                           ('vectorize + score, chunks of %d' % args.chunk, chunked_time)]:
+        print('%-40s %10.3f %14.0f' % (label, seconds, len(tweets) / seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+""" Streaming word counts (WordCounter, NaiveBayesTextClassifier.fit_files / partial_fit) on a large corpus
+
+Writes a corpus of tweets sampled from data/appWords.txt with, in each tweet, a word drawn from a Zipf
+distribution over --distinct words (so that the vocabulary keeps growing, as in a real stream), then
+counts it by batches: exactly, with a process pool, and with max_words (count-min pruning), reporting
+the time, the words kept and the peak memory of each (tracemalloc, in a separate run). Checks that the
+exact counts are the ones of collections.Counter, that the most frequent words survive the pruning,
+and that fit_files and partial_fit on the raw practice files give the classifier of fit_counts.
+
+Usage (from the practice folder):
+    python benchmarks/bench_streaming.py --tweets 1000000 --max-words 10000 --n-jobs 2
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+PRACTICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PRACTICE_DIR)
+sys.path.insert(0, os.path.join(PRACTICE_DIR, 'benchmarks'))
+
+from bench_naive_bayes import DATA_DIR, make_tweets
+from naive_bayes import NaiveBayesTextClassifier, WordCounter, count_words, read_batches
+
+
+def write_corpus(path, n_tweets, n_distinct, seed=289):
+    tweets, _ = make_tweets(n_tweets, seed)
+    words = np.random.RandomState(seed).zipf(1.05, size=n_tweets) % n_distinct
+    with open(path, 'w', encoding='utf-8') as f:
+        for tweet, word in zip(tweets, words):
+            f.write('%s w%d\n' % (tweet, word))
+
+
+def check_classifier():
+    paths = {'APP': os.path.join(DATA_DIR, 'appWords.txt'), 'OTHER': os.path.join(DATA_DIR, 'otherWords.txt')}
+    expected = {}
+    for label, path in paths.items():
+        with open(path, encoding='utf-8') as f:
+            expected[label] = count_words(f.read().splitlines())
+    reference = NaiveBayesTextClassifier().fit_counts(expected)
+
+    streamed = NaiveBayesTextClassifier().fit_files(paths, batch_size=1000, n_jobs=2)
+    incremental = NaiveBayesTextClassifier()
+    for label, path in paths.items():
+        for batch in read_batches(path, 1000):
+            incremental.partial_fit(batch, [label] * len(batch))
+
+    tweets, _ = make_tweets(20000)
+    for classifier in [streamed, incremental]:
+        assert {label: dict(counter.counts_) for label, counter in classifier.counters_.items()} == expected
+        np.testing.assert_array_equal(classifier.decision_function(tweets), reference.decision_function(tweets))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tweets', type=int, default=1000000)
+    parser.add_argument('--distinct', type=int, default=1000000, help='distinct words added to the tweets')
+    parser.add_argument('--max-words', type=int, default=10000)
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--n-jobs', type=int, default=2)
+    args = parser.parse_args()
+
+    check_classifier()
+    print('fit_files and partial_fit on the practice files: same counts and scores as fit_counts')
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'tweets.txt')
+        write_corpus(path, args.tweets, args.distinct)
+        with open(path, encoding='utf-8') as f:
+            expected = count_words(f)
+
+        versions = [('exact', lambda: WordCounter()),
+                    ('exact, %d processes' % args.n_jobs, lambda: WordCounter(n_jobs=args.n_jobs)),
+                    ('max_words=%d' % args.max_words, lambda: WordCounter(max_words=args.max_words)),
+                    ('max_words=%d, %d processes' % (args.max_words, args.n_jobs),
+                     lambda: WordCounter(max_words=args.max_words, n_jobs=args.n_jobs))]
+        print('%d tweets, %d distinct words' % (args.tweets, len(expected)))
+        print('%-34s %10s %12s %10s %12s' % ('', 'seconds', 'tweets / s', 'words', 'peak (MB)'))
+        for label, make_counter in versions:
+            start = time.perf_counter()
+            counter = make_counter().fit_file(path, args.batch_size)
+            seconds = time.perf_counter() - start
+
+            if counter.max_words is None:
+                assert counter.counts_ == expected
+            else:
+                top = [word for word, _ in expected.most_common(args.max_words // 10)]
+                assert all(word in counter.counts_ and counter.counts_[word] >= expected[word] for word in top)
+
+            tracemalloc.start()
+            make_counter().fit_file(path, args.batch_size)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print('%-34s %10.2f %12.0f %10d %12.1f' % (label, seconds, args.tweets / seconds, len(counter.counts_),
+                                                      peak / 2**20))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,348 @@
+""" Naive Bayes text classifier of naive_bayes_text_classifier.ipynb, on a hashed vocabulary
+
+The word counts of each class (data/appFreqs.csv, data/otherFreqs.csv) are compiled into one array of
+log-probabilities indexed by the hash of the words (n_features buckets x n_classes), with Laplace
+smoothing. Tweets are vectorized into a sparse matrix of word counts with the same hashing, and a batch
+of tweets is scored with a single sparse matrix product, instead of one scan of the frequency table per
+word of each tweet.
+
+    from naive_bayes import NaiveBayesTextClassifier, read_counts, read_labeled_tweets
+
+    classifier = NaiveBayesTextClassifier().fit_counts({'APP': read_counts('data/appFreqs.csv'),
+                                                        'OTHER': read_counts('data/otherFreqs.csv')})
+    test = read_labeled_tweets('data/test.csv')
+    pd.crosstab(test['label'], classifier.predict(test['tweet']))
+
+The counts can also be built from the raw tweets (data/appWords.txt, data/otherWords.txt, one tweet per
+line), streamed by batches and counted in a process pool, and updated with new labeled tweets:
+
+    classifier = NaiveBayesTextClassifier(max_words=100000, n_jobs=4).fit_files({'APP': 'data/appWords.txt',
+                                                                                 'OTHER': 'data/otherWords.txt'})
+    classifier.partial_fit(new_tweets, new_labels)
+"""
+import collections
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.utils import murmurhash3_32
+
+# the words of a tweet are the ones of tweet.split(), as in the notebook
+TOKEN_PATTERN = r'(?u)\S+'
+
+
+def read_counts(path):
+    """ Reads a frequency file (word,count per line, no header) as in the notebook
+
+    Returns:
+        pd.Series: count of each word
+    """
+    # na_filter=False: words like "null" or "nan" are words
+    counts = pd.read_csv(path, header=None, names=['word', 'count'], na_filter=False)
+    return counts.set_index('word')['count']
+
+
+def read_labeled_tweets(path):
+    """ Reads a file of labeled tweets (label, tweet per line, the tweet may contain commas)
+
+    Returns:
+        pd.DataFrame: label and tweet columns
+    """
+    with open(path, encoding='utf-8') as f:
+        rows = [line.rstrip('\n').split(',', 1) for line in f if line.strip()]
+    return pd.DataFrame(rows, columns=['label', 'tweet'])
+
+
+def read_batches(path, batch_size=10000):
+    """ Tweets of a text file (one per line) by batches of batch_size, the file is never read at once
+
+    Returns:
+        generator of List[str]
+    """
+    with open(path, encoding='utf-8') as f:
+        lines = (line.rstrip('\n') for line in f)
+        while True:
+            batch = list(itertools.islice(lines, batch_size))
+            if not batch:
+                return
+            yield batch
+
+
+def count_words(tweets):
+    """ Word counts of tweets (tweet.split(), as the vectorizer)
+
+    Returns:
+        collections.Counter: word -> count
+    """
+    counts = collections.Counter()
+    for tweet in tweets:
+        counts.update(tweet.split())
+    return counts
+
+
+def _imap(function, iterable, n_jobs=None):
+    """ map in a process pool with at most 2 * n_jobs items in flight, results in order """
+    if n_jobs is None or n_jobs == 1:
+        for item in iterable:
+            yield function(item)
+        return
+
+    n_jobs = os.cpu_count() if n_jobs == -1 else n_jobs
+    with ProcessPoolExecutor(n_jobs) as executor:
+        pending = collections.deque()
+        for item in iterable:
+            pending.append(executor.submit(function, item))
+            if len(pending) >= 2 * n_jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+class WordCounter(object):
+    """ Word counts of a stream of tweets, in bounded memory
+
+    Batches of tweets are counted (in a process pool with n_jobs) into Counters merged into counts_. With
+    max_words, only the max_words most frequent words are kept after each merge; every occurrence is also
+    added to a count-min sketch (depth rows of width counters), so that a word pruned earlier and seen
+    again comes back with the estimate of its total count (the minimum of its counters, never below the
+    true count) instead of restarting from 0. Without max_words the counts are exact.
+
+    Args:
+        max_words (int): maximum number of words kept, default None (no limit)
+        width (int): counters per row of the count-min sketch, default 2**16
+        depth (int): rows of the count-min sketch, default 4
+        n_jobs (int): processes counting the batches, -1 for all the CPUs, default None (no pool)
+    """
+
+    def __init__(self, max_words=None, width=2**16, depth=4, n_jobs=None):
+        self.max_words = max_words
+        self.width = width
+        self.depth = depth
+        self.n_jobs = n_jobs
+        self.counts_ = collections.Counter()
+        self.sketch_ = None if max_words is None else np.zeros((depth, width), dtype=np.int64)
+
+    def _sketch_columns(self, words):
+        """ Counter of each word in each row of the sketch (double hashing), depth x n_words """
+        h1 = np.array([murmurhash3_32(word, seed=0, positive=True) for word in words], dtype=np.int64)
+        h2 = np.array([murmurhash3_32(word, seed=1, positive=True) for word in words], dtype=np.int64)
+        return (h1 + np.arange(self.depth)[:, None] * h2) % self.width
+
+    def update(self, counts):
+        """ Adds word counts (e.g. a Counter of a worker, or a frequency file read with read_counts)
+
+        Args:
+            counts: dict or pd.Series, word -> count
+
+        Returns:
+            WordCounter: self
+        """
+        if self.max_words is None:
+            self.counts_.update(dict(counts))
+            return self
+
+        words = list(counts.keys())
+        values = np.array([counts[word] for word in words], dtype=np.int64)
+        rows = np.arange(self.depth)[:, None]
+        columns = self._sketch_columns(words)
+        np.add.at(self.sketch_, (rows, columns), values)
+        estimates = self.sketch_[rows, columns].min(axis=0)
+
+        for word, value, estimate in zip(words, values, estimates):
+            if word in self.counts_:
+                self.counts_[word] += int(value)
+            else:
+                self.counts_[word] = int(estimate)
+        if len(self.counts_) > self.max_words:
+            self.counts_ = collections.Counter(dict(self.counts_.most_common(self.max_words)))
+        return self
+
+    def partial_fit(self, tweets):
+        """ Adds the words of a batch of tweets """
+        return self.update(count_words(tweets))
+
+    def fit_batches(self, batches):
+        """ Adds the words of batches of tweets, counted in the process pool
+
+        Args:
+            batches: iterable of lists of tweets (e.g. read_batches)
+
+        Returns:
+            WordCounter: self
+        """
+        for counts in _imap(count_words, batches, self.n_jobs):
+            self.update(counts)
+        return self
+
+    def fit_file(self, path, batch_size=10000):
+        """ Adds the words of a text file, one tweet per line, read by batches of batch_size tweets """
+        return self.fit_batches(read_batches(path, batch_size))
+
+    def counts(self):
+        """ Word counts, most frequent first
+
+        Returns:
+            pd.Series: count of each word
+        """
+        words, counts = zip(*self.counts_.most_common()) if self.counts_ else ((), ())
+        return pd.Series(counts, index=pd.Index(words, dtype=object, name='word'), name='count', dtype=np.int64)
+
+    def to_csv(self, path):
+        """ Writes the counts as a frequency file (word,count per line, no header), as data/appFreqs.csv """
+        self.counts().to_csv(path, header=False)
+
+
+class NaiveBayesTextClassifier(object):
+    """ Multinomial Naive Bayes on hashed word counts
+
+    Words are mapped to n_features buckets by a hash (murmurhash3, HashingVectorizer), so the vocabulary
+    needs no dictionary: the fitted state is an array of counts (n_classes x n_features) compiled into
+    log-probabilities (n_features x n_classes). Words sharing a bucket share their counts: about
+    n_words**2 / (2 * n_features) collisions are expected (collisions_ after fitting), 4 for the 1 616
+    words of the practice data with 2**20 buckets.
+
+    log P(word | class) = log((count(word, class) + alpha) / (total(class) + alpha * V)), V being the number
+    of distinct words fit (vocabulary_size_), as in the notebook. Words never seen have count 0.
+
+    The word counts of each class are kept (counters_, WordCounter), so that partial_fit adds new labeled
+    tweets to them without the tweets seen before (each call compiles the log-probabilities again, in a time
+    proportional to the vocabulary, so batches should not be too small); max_words bounds the memory they take,
+    width and depth set the count-min sketch of the pruned words.
+
+    Args:
+        alpha (float): Laplace (additive) smoothing, default 1.0
+        n_features (int): number of hash buckets, default 2**20
+        priors (dict): prior probability of each class, default uniform (the frequency files do not give
+            numbers of tweets)
+        max_words (int): maximum number of words kept per class (WordCounter), default None (no limit)
+        width (int): counters per row of the count-min sketch of each class (with max_words), default 2**16
+        depth (int): rows of the count-min sketch of each class (with max_words), default 4
+        n_jobs (int): processes counting the batches of fit_files, -1 for all the CPUs, default None (no pool)
+    """
+
+    def __init__(self, alpha=1.0, n_features=2**20, priors=None, max_words=None, width=2**16, depth=4, n_jobs=None):
+        self.alpha = alpha
+        self.n_features = n_features
+        self.priors = priors
+        self.max_words = max_words
+        self.width = width
+        self.depth = depth
+        self.n_jobs = n_jobs
+        self.vectorizer = HashingVectorizer(n_features=n_features, token_pattern=TOKEN_PATTERN, lowercase=False,
+                                            alternate_sign=False, norm=None, dtype=np.float64)
+        # hash of whole words (the vectorizer hashes the words of each tweet with the same function)
+        self.hasher = FeatureHasher(n_features=n_features, input_type='string', alternate_sign=False,
+                                    dtype=np.float64)
+
+    def vectorize(self, tweets):
+        """ Sparse matrix of word counts (n_tweets x n_features, CSR) """
+        return self.vectorizer.transform(tweets)
+
+    def hash_words(self, words):
+        """ Sparse matrix with one row per word, 1 in the bucket of the word """
+        return self.hasher.transform([word] for word in words)
+
+    def _counter(self, n_jobs=None):
+        return WordCounter(self.max_words, width=self.width, depth=self.depth, n_jobs=n_jobs)
+
+    def fit_counts(self, counts):
+        """ Fits the classifier on word counts
+
+        Args:
+            counts (dict): class label -> word counts (pd.Series or dict word -> count)
+
+        Returns:
+            NaiveBayesTextClassifier: self
+        """
+        self.counters_ = {label: self._counter().update(pd.Series(counts[label]).rename(str))
+                          for label in counts}
+        return self._fit_counters()
+
+    def fit_files(self, paths, batch_size=10000, n_jobs=None):
+        """ Fits the classifier on raw tweets, one text file per class read by batches (data/appWords.txt)
+
+        Args:
+            paths (dict): class label -> path of a text file, one tweet per line
+            batch_size (int): tweets per batch, default 10000
+            n_jobs (int): processes counting the batches, -1 for all the CPUs, default None (n_jobs of the classifier)
+
+        Returns:
+            NaiveBayesTextClassifier: self
+        """
+        n_jobs = self.n_jobs if n_jobs is None else n_jobs
+        self.counters_ = {label: self._counter(n_jobs).fit_file(path, batch_size)
+                          for label, path in paths.items()}
+        return self._fit_counters()
+
+    def partial_fit(self, tweets, labels):
+        """ Adds a batch of labeled tweets to the counts of the classifier (fitted or not), new labels add classes
+
+        Args:
+            tweets: iterable of tweets
+            labels: class label of each tweet
+
+        Returns:
+            NaiveBayesTextClassifier: self
+        """
+        if not hasattr(self, 'counters_'):
+            self.counters_ = {}
+        tweets, labels = pd.Series(list(tweets), dtype=object), np.asarray(labels, dtype=object)
+        for label in pd.unique(labels):
+            if label not in self.counters_:
+                self.counters_[label] = self._counter()
+            self.counters_[label].partial_fit(tweets[labels == label])
+        return self._fit_counters()
+
+    def _fit_counters(self):
+        self.classes_ = np.array(list(self.counters_), dtype=object)
+        self.class_count_ = np.zeros((len(self.classes_), self.n_features))
+        vocabulary = set()
+        for i, label in enumerate(self.classes_):
+            words = self.counters_[label].counts()
+            self.class_count_[i] += self.hash_words(words.index).T @ words.to_numpy(dtype=np.float64)
+            vocabulary.update(words.index)
+
+        self.vocabulary_size_ = len(vocabulary)
+        self.collisions_ = len(vocabulary) - len(np.unique(self.hash_words(vocabulary).indices))
+        return self._compile()
+
+    def _compile(self):
+        """ Log-probability array (n_features x n_classes, row-major for the sparse product) and log priors """
+        totals = self.class_count_.sum(axis=1, keepdims=True)
+        log_prob = np.log(self.class_count_ + self.alpha) - np.log(totals + self.alpha * self.vocabulary_size_)
+        self.feature_log_prob_ = np.ascontiguousarray(log_prob.T)
+
+        if self.priors is None:
+            priors = np.full(len(self.classes_), 1 / len(self.classes_))
+        else:
+            priors = np.array([self.priors[label] for label in self.classes_], dtype=np.float64)
+        self.class_log_prior_ = np.log(priors)
+        return self
+
+    def decision_function(self, tweets):
+        """ Joint log-likelihood of each tweet and class: log P(class) + sum of log P(word | class)
+
+        Args:
+            tweets: iterable of tweets, or their sparse matrix of counts (vectorize)
+
+        Returns:
+            np.ndarray: n_tweets x n_classes
+        """
+        X = tweets if hasattr(tweets, 'tocsr') else self.vectorize(tweets)
+        return X @ self.feature_log_prob_ + self.class_log_prior_
+
+    def predict(self, tweets):
+        """ Most likely class of each tweet
+
+        Returns:
+            np.ndarray: class labels
+        """
+        return self.classes_.take(np.argmax(self.decision_function(tweets), axis=1))
+
+    def score(self, tweets, labels):
+        """ Accuracy on labeled tweets """
+        return np.mean(self.predict(tweets) == np.asarray(labels))
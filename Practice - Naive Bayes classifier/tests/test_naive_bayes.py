@@ -0,0 +1,94 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+PRACTICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PRACTICE_DIR)
+
+from naive_bayes import NaiveBayesTextClassifier, WordCounter, count_words, read_batches, read_counts
+from naive_bayes import read_labeled_tweets
+
+DATA_DIR = os.path.join(PRACTICE_DIR, 'data')
+PATHS = {'APP': os.path.join(DATA_DIR, 'appWords.txt'), 'OTHER': os.path.join(DATA_DIR, 'otherWords.txt')}
+
+
+@pytest.fixture(scope='module')
+def tweets():
+    lines = {}
+    for label, path in PATHS.items():
+        with open(path, encoding='utf-8') as f:
+            lines[label] = f.read().splitlines()
+    return lines
+
+
+@pytest.fixture(scope='module')
+def reference(tweets):
+    return NaiveBayesTextClassifier().fit_counts({label: count_words(lines) for label, lines in tweets.items()})
+
+
+def test_streamed_fits_equal_fit_counts(tweets, reference):
+    incremental = NaiveBayesTextClassifier()
+    for label, path in PATHS.items():
+        for batch in read_batches(path, 1000):
+            incremental.partial_fit(batch, [label] * len(batch))
+    streamed = NaiveBayesTextClassifier(n_jobs=2).fit_files(PATHS, batch_size=1000)
+
+    batch = tweets['APP'][:500] + tweets['OTHER'][:500]
+    for classifier in [incremental, streamed]:
+        np.testing.assert_array_equal(classifier.class_count_, reference.class_count_)
+        np.testing.assert_array_equal(classifier.decision_function(batch), reference.decision_function(batch))
+
+
+def test_word_counter_keeps_top_words():
+    random_state = np.random.RandomState(289)
+    tweets = [' '.join('w%d' % word for word in random_state.zipf(1.3, size=5)) for _ in range(20000)]
+    expected = count_words(tweets)
+    assert len(expected) > 1000
+
+    counter = WordCounter(max_words=200, width=2**10, depth=3)
+    for start in range(0, len(tweets), 500):
+        counter.partial_fit(tweets[start:start + 500])
+
+    assert len(counter.counts_) <= 200
+    # the count-min estimates never undercount
+    assert all(count >= expected[word] for word, count in counter.counts_.items())
+    assert all(word in counter.counts_ for word, _ in expected.most_common(20))
+
+
+def test_sketch_parameters_reach_the_counters():
+    classifier = NaiveBayesTextClassifier(max_words=50, width=2**8, depth=2)
+    classifier.partial_fit(['a b c', 'a d'], ['APP', 'OTHER'])
+
+    for counter in classifier.counters_.values():
+        assert counter.sketch_.shape == (2, 2**8)
+
+
+def test_batch_scores_equal_dictionary_scores():
+    counts = {'APP': read_counts(os.path.join(DATA_DIR, 'appFreqs.csv')),
+              'OTHER': read_counts(os.path.join(DATA_DIR, 'otherFreqs.csv'))}
+    classifier = NaiveBayesTextClassifier().fit_counts(counts)
+    test = read_labeled_tweets(os.path.join(DATA_DIR, 'test.csv'))
+    # and a tweet of unseen words, an empty tweet
+    tweets = test.tweet.tolist() + ['unseen words only', '']
+
+    # scores of the notebook on an exact vocabulary: log P(word | class) looked up in dictionaries
+    vocabulary_size = len(set(counts['APP'].index) | set(counts['OTHER'].index))
+    log_prob = {label: np.log((count + 1) / (count.sum() + vocabulary_size)) for label, count in counts.items()}
+    unknown = {label: np.log(1 / (count.sum() + vocabulary_size)) for label, count in counts.items()}
+    expected = np.array([[sum(log_prob[label].get(word, unknown[label]) for word in tweet.split()) + np.log(0.5)
+                          for label in ['APP', 'OTHER']] for tweet in tweets])
+
+    buckets = classifier.hash_words(log_prob['APP'].index.union(log_prob['OTHER'].index)).indices
+    assert classifier.vocabulary_size_ == vocabulary_size
+    assert classifier.collisions_ == vocabulary_size - len(np.unique(buckets))
+
+    # the words sharing their bucket with another word (collisions_) score differently
+    collided = set(np.flatnonzero(np.bincount(buckets) > 1))
+    exact = [not collided.intersection(classifier.vectorize([tweet]).indices) for tweet in tweets]
+    assert sum(exact) > 0.9 * len(tweets)
+    np.testing.assert_allclose(classifier.decision_function(tweets)[exact], expected[exact])
+    np.testing.assert_allclose(classifier.decision_function(classifier.vectorize(tweets)[exact]), expected[exact])
+    np.testing.assert_array_equal(classifier.predict(tweets)[exact],
+                                  np.array(['APP', 'OTHER'])[expected[exact].argmax(axis=1)])
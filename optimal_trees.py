@@ -0,0 +1,233 @@
+""" Optimal number of trees of a random forest, with early stopping
+
+Generalizes "Optimal number of trees in RF Classifier.ipynb": the score of the forest made of its first
+k trees, for each k, but computed from a running sum of the tree predictions instead of the stack of
+all of them (n_trees x n_samples x n_classes), trees evaluated in parallel, and stopping once the
+score has not improved for a number of trees.
+
+    from optimal_trees import TreeCountSearch
+
+    search = TreeCountSearch(tol=0.001, patience=50).evaluate(rf, X_val, y_val)     # fitted forest
+    search = TreeCountSearch().fit(RandomForestClassifier(max_depth=4, n_jobs=-1),  # grows the forest
+                                   X_train, y_train, X_val, y_val)
+    search.n_trees_, search.best_score_, plt.plot(search.scores_)
+
+Usage (demo on synthetic data, against the notebook):
+    python optimal_trees.py --samples 100000 --trees 500
+"""
+import argparse
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+from scipy import sparse
+from sklearn.metrics import r2_score
+from sklearn.utils import check_array
+
+
+def _predict(tree, X, classification):
+    if classification:
+        return tree.predict_proba(X, check_input=False)
+    return tree.predict(X, check_input=False)
+
+
+class TreeCountSearch(object):
+    """ Score of a random forest (classifier or regressor) for each number of trees, with early stopping
+
+    The trees are evaluated on the validation data by batches of batch_size trees (in parallel with
+    n_jobs threads), each batch added to a running sum of the predictions, so that the memory used is
+    batch_size x n_samples x n_classes instead of n_trees x n_samples x n_classes. The scores are the
+    ones of the notebook: score of the mean of the predictions of the first k trees (accuracy of the
+    argmax of the probabilities, or scoring).
+
+    Evaluation stops when no score has improved by more than tol on the score of the last improvement for
+    patience trees. The optimal number of trees is then the smallest one whose score is within tol of the
+    best score.
+
+    Args:
+        tol (float): improvement of the score below which the curve is considered flat, default 0.001
+        patience (int): number of trees without improvement before stopping, None to evaluate all trees,
+            default 50
+        batch_size (int): number of trees evaluated at once, default 25
+        n_jobs (int): number of threads evaluating the trees of a batch, default None (1)
+        scoring (callable): score(y_true, y_pred), higher is better. Default: accuracy for classifiers,
+            r2 for regressors
+
+    Attributes:
+        scores_ (np.ndarray): score for each number of trees evaluated (scores_[k - 1]: first k trees)
+        n_trees_ (int): optimal number of trees
+        best_score_ (float): best score
+        stopped_ (bool): True if the evaluation stopped before the last tree
+    """
+
+    def __init__(self, tol=0.001, patience=50, batch_size=25, n_jobs=None, scoring=None):
+        self.tol = tol
+        self.patience = patience
+        self.batch_size = batch_size
+        self.n_jobs = n_jobs
+        self.scoring = scoring
+
+    def _start(self, forest, X, y):
+        self._classification = hasattr(forest, 'classes_')
+        # validated once (the trees work on float32) instead of once per tree
+        self._X = check_array(X, dtype=np.float32, accept_sparse='csr')
+        if sparse.issparse(self._X):
+            self._X.sort_indices()
+        self._y = np.asarray(y)
+        self._classes = getattr(forest, 'classes_', None)
+        self._sum = None
+        self._scores = []
+        self._best, self._best_tree = -np.inf, 0
+        self.stopped_ = False
+
+    def _score(self, mean):
+        if self._classification:
+            prediction = self._classes.take(np.argmax(mean, axis=1))
+            if self.scoring is None:
+                return np.mean(prediction == self._y)
+        else:
+            prediction = mean
+            if self.scoring is None:
+                return r2_score(self._y, prediction)
+        return self.scoring(self._y, prediction)
+
+    def _update(self, trees):
+        """ Adds trees to the running sum and scores, returns False once the curve is flat """
+        with Parallel(n_jobs=self.n_jobs, prefer='threads') as parallel:
+            for start in range(0, len(trees), self.batch_size):
+                predictions = parallel(delayed(_predict)(tree, self._X, self._classification)
+                                       for tree in trees[start:start + self.batch_size])
+                for prediction in predictions:
+                    if self._sum is None:
+                        self._sum = np.zeros(prediction.shape, dtype=np.float64)
+                    self._sum += prediction
+                    n_trees = len(self._scores) + 1
+                    score = self._score(self._sum / n_trees)
+                    self._scores.append(score)
+
+                    # as min_delta of Keras: the reference only moves on an improvement of more than tol, so a
+                    # slow but steady rise is not taken for a flat curve
+                    if score > self._best + self.tol:
+                        self._best, self._best_tree = score, n_trees
+                    if self.patience is not None and n_trees - self._best_tree >= self.patience:
+                        self.stopped_ = True
+                        return False
+        return True
+
+    def _finish(self):
+        self.scores_ = np.array(self._scores)
+        self.best_score_ = self.scores_.max()
+        self.n_trees_ = int(np.argmax(self.scores_ >= self.best_score_ - self.tol)) + 1
+        del self._X, self._y, self._sum
+        return self
+
+    def evaluate(self, forest, X, y):
+        """ Scores a fitted forest on validation data for each number of trees, stopping early
+
+        Args:
+            forest: fitted RandomForestClassifier / RandomForestRegressor (or ExtraTrees)
+            X: validation features
+            y: validation target
+
+        Returns:
+            TreeCountSearch: self
+        """
+        self._start(forest, X, y)
+        self._update(forest.estimators_)
+        return self._finish()
+
+    def fit(self, forest, X_train, y_train, X_val, y_val, step=25, max_estimators=1000):
+        """ Grows a forest by step trees (warm_start) until the validation score is flat or max_estimators
+
+        With the same random_state, the trees are the ones of a forest fit at once with the same number
+        of trees. The forest is left with the trees grown (self.forest_); forest.set_params(n_estimators=
+        n_trees_) and forest.estimators_[:n_trees_] give the optimal forest.
+
+        Args:
+            forest: RandomForestClassifier / RandomForestRegressor, not fitted
+            X_train, y_train: training data
+            X_val, y_val: validation data
+            step (int): number of trees grown at once, default 25
+            max_estimators (int): maximum number of trees, default 1000
+
+        Returns:
+            TreeCountSearch: self
+        """
+        forest.set_params(warm_start=True, n_estimators=min(step, max_estimators))
+        forest.fit(X_train, y_train)
+        self._start(forest, X_val, y_val)
+
+        grown = 0
+        while True:
+            if not self._update(forest.estimators_[grown:]) or len(forest.estimators_) >= max_estimators:
+                break
+            grown = len(forest.estimators_)
+            forest.set_params(n_estimators=min(grown + step, max_estimators))
+            forest.fit(X_train, y_train)
+
+        self.forest_ = forest
+        return self._finish()
+
+
+def notebook_scores(forest, X_val, y_val):
+    """ Scores of the notebook: stack of all the tree predictions, then cumulative mean """
+    predictions = []
+    for tree in forest.estimators_:
+        predictions.append(tree.predict_proba(X_val)[None, :])
+    predictions = np.vstack(predictions)
+    cum_mean = np.cumsum(predictions, axis=0) / np.arange(1, predictions.shape[0] + 1)[:, None, None]
+    return np.array([np.mean(forest.classes_.take(np.argmax(pred, axis=1)) == y_val) for pred in cum_mean]), \
+        predictions.nbytes + cum_mean.nbytes
+
+
+def main():
+    from sklearn.datasets import make_classification
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.model_selection import train_test_split
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--samples', type=int, default=100000)
+    parser.add_argument('--trees', type=int, default=500)
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    args = parser.parse_args()
+
+    X, y = make_classification(n_samples=args.samples, n_features=20, n_informative=8, n_classes=3, random_state=0)
+    X_train, X_val, y_train, y_val = train_test_split(X, y, random_state=0)
+
+    rf = RandomForestClassifier(n_estimators=args.trees, max_depth=4, n_jobs=args.n_jobs, random_state=0)
+    rf.fit(X_train, y_train)
+
+    start = time.perf_counter()
+    expected, stack_bytes = notebook_scores(rf, X_val, y_val)
+    notebook_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    full = TreeCountSearch(patience=None, n_jobs=args.n_jobs).evaluate(rf, X_val, y_val)
+    full_time = time.perf_counter() - start
+    np.testing.assert_allclose(full.scores_, expected)
+
+    start = time.perf_counter()
+    early = TreeCountSearch(n_jobs=args.n_jobs).evaluate(rf, X_val, y_val)
+    early_time = time.perf_counter() - start
+    np.testing.assert_allclose(early.scores_, expected[:len(early.scores_)])
+
+    start = time.perf_counter()
+    grown = TreeCountSearch(n_jobs=args.n_jobs).fit(
+        RandomForestClassifier(max_depth=4, n_jobs=args.n_jobs, random_state=0), X_train, y_train, X_val, y_val,
+        max_estimators=args.trees)
+    grow_time = time.perf_counter() - start
+    np.testing.assert_allclose(grown.scores_, expected[:len(grown.scores_)])
+
+    print('validation samples: %d, trees: %d, scores equal to the notebook' % (len(y_val), args.trees))
+    print('notebook stack: %.1f MB, running sum: %.1f MB' % (stack_bytes / 2**20, len(y_val) * 3 * 8 / 2**20))
+    print('%-38s %8s %8s %8s %8s' % ('', 'seconds', 'trees', 'optimal', 'score'))
+    print('%-38s %8.2f %8d %8s %8.4f' % ('notebook (all trees)', notebook_time, len(expected), '', expected[-1]))
+    for label, seconds, search in [('running sum (all trees)', full_time, full),
+                                   ('running sum, early stopping', early_time, early),
+                                   ('growing the forest, early stopping', grow_time, grown)]:
+        print('%-38s %8.2f %8d %8d %8.4f' % (label, seconds, len(search.scores_), search.n_trees_,
+                                             search.best_score_))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from optimal_trees import TreeCountSearch, notebook_scores
+
+
+@pytest.fixture(scope='module')
+def split():
+    X, y = make_classification(n_samples=2000, n_features=10, n_informative=5, n_classes=3, random_state=0)
+    return train_test_split(X, y, random_state=0)
+
+
+class _Tree(object):
+    def predict(self, X, check_input=True):
+        return np.zeros(X.shape[0])
+
+
+class _Forest(object):
+    """ Fitted regressor stand-in whose trees predict nothing, the scores come from the curve """
+
+    def __init__(self, n_trees):
+        self.estimators_ = [_Tree() for _ in range(n_trees)]
+
+
+def search_curve(curve, **kwargs):
+    search = TreeCountSearch(**kwargs)
+    scores = iter(curve)
+    search._score = lambda mean: next(scores)
+    return search.evaluate(_Forest(len(curve)), np.zeros((5, 2)), np.zeros(5))
+
+
+def test_slow_rise_does_not_stop():
+    # 0.0005 per tree: less than tol from one tree to the next, 25 x tol over 50 trees
+    search = search_curve(0.5 + 0.0005 * np.arange(300), tol=0.001, patience=50)
+
+    assert not search.stopped_
+    assert len(search.scores_) == 300
+
+
+@pytest.mark.parametrize('batch_size', [1, 25])
+def test_flat_curve_stops_after_patience(batch_size):
+    search = search_curve(np.full(300, 0.8), tol=0.001, patience=50, batch_size=batch_size)
+
+    assert search.stopped_
+    assert len(search.scores_) == 51
+    assert search.n_trees_ == 1
+
+
+@pytest.mark.parametrize('n_jobs', [None, 2])
+def test_scores_equal_notebook(split, n_jobs):
+    X_train, X_val, y_train, y_val = split
+    forest = RandomForestClassifier(n_estimators=60, max_depth=3, random_state=0).fit(X_train, y_train)
+
+    search = TreeCountSearch(patience=None, batch_size=7, n_jobs=n_jobs).evaluate(forest, X_val, y_val)
+    np.testing.assert_allclose(search.scores_, notebook_scores(forest, X_val, y_val)[0])
+    assert not search.stopped_
+
+
+def test_fit_grows_until_flat(split):
+    X_train, X_val, y_train, y_val = split
+    search = TreeCountSearch(tol=0.01, patience=20).fit(RandomForestClassifier(max_depth=3, random_state=0),
+                                                        X_train, y_train, X_val, y_val, step=10, max_estimators=500)
+
+    grown = len(search.forest_.estimators_)
+    assert search.stopped_
+    assert grown < 500
+    assert search.n_trees_ <= len(search.scores_) <= grown
+    # the trees grown by warm start are the ones of the notebook forest
+    np.testing.assert_allclose(search.scores_, notebook_scores(search.forest_, X_val, y_val)[0][:len(search.scores_)])
@@ -0,0 +1,19 @@
+""" The modules shared by the custom_transformers packages of both assignments are kept as identical copies,
+each assignment folder being used on its own (notebook, benchmarks). Any change has to be made in both """
+import filecmp
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ASSIGNMENTS = ['Assignment 1 - Regression feature engineering', 'Assignment 2 - Multiclass classification']
+SHARED_FILES = ['custom_transformers/base.py', 'custom_transformers/parallel.py', 'custom_transformers/artifacts.py',
+                'custom_transformers/profiling.py', 'custom_transformers/columns.py', 'benchmarks/harness.py',
+                'tests/conftest.py']
+
+
+@pytest.mark.parametrize('path', SHARED_FILES)
+def test_shared_file_is_identical(path):
+    first, second = [os.path.join(ROOT, assignment, path) for assignment in ASSIGNMENTS]
+
+    assert filecmp.cmp(first, second, shallow=False), '%s differs between the assignments' % path